@@ -0,0 +1,106 @@
+"""
+Cube Engine Benchmark
+File: benchmarks/bench_cube_engines.py
+
+Compares the pandas groupby cube (olap_cubing.create_olap_cube) with the
+NumPy integer-coded engine (olap_numpy_engine.create_olap_cube_numpy) on
+synthetic sales data with the same dimensions as the production cube.
+
+Usage:
+    python benchmarks/bench_cube_engines.py --rows 1000000 --customers 50000
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import CUBE_DIMENSIONS, CUBE_METRICS, create_olap_cube  # noqa: E402
+from scripts.olap.olap_numpy_engine import create_olap_cube_numpy  # noqa: E402
+
+DAY_NAMES = np.array(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"])
+REGIONS = np.array(["East", "North", "South", "West"])
+PAYMENT_TYPES = np.array(["Cash", "CreditCard", "DebitCard", "ApplePay"])
+
+
+def make_sales(rows: int, customers: int, products: int, seed: int = 42) -> pd.DataFrame:
+    """Build a synthetic, already-prepared sales frame with the cube dimensions."""
+    rng = np.random.default_rng(seed)
+    month = rng.integers(1, 13, rows)
+    sale_amount = rng.gamma(2.0, 100.0, rows).round(2)
+    discount = sale_amount * rng.choice([0, 5, 10, 15], rows) / 100
+    return pd.DataFrame({
+        "TransactionID": np.arange(rows),
+        "DayOfWeek": DAY_NAMES[rng.integers(0, 7, rows)],
+        "Year": rng.integers(2023, 2025, rows),
+        "Month": month,
+        "Quarter": (month - 1) // 3 + 1,
+        "Region": REGIONS[rng.integers(0, len(REGIONS), rows)],
+        "ProductID": rng.integers(100, 100 + products, rows),
+        "CustomerID": rng.integers(1000, 1000 + customers, rows),
+        "CampaignID": rng.integers(0, 4, rows),
+        "PaymentType": PAYMENT_TYPES[rng.integers(0, len(PAYMENT_TYPES), rows)],
+        "StoreID": rng.integers(401, 407, rows),
+        "SaleAmount": sale_amount,
+        "DiscountAmount": discount,
+        "NetSaleAmount": sale_amount - discount,
+    })
+
+
+def time_call(func, repeat: int) -> tuple:
+    """Return (best seconds, result) over `repeat` runs."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """Run the engine comparison and print a results table."""
+    parser = argparse.ArgumentParser(description="Benchmark the pandas and NumPy cube engines.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=20_000)
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sales_df = make_sales(args.rows, args.customers, args.products)
+    cases = {
+        "pandas groupby": lambda: create_olap_cube(sales_df, CUBE_DIMENSIONS, CUBE_METRICS),
+        "numpy": lambda: create_olap_cube_numpy(sales_df, CUBE_DIMENSIONS, CUBE_METRICS),
+        "numpy (no TransactionIDs)": lambda: create_olap_cube_numpy(
+            sales_df, CUBE_DIMENSIONS, CUBE_METRICS, traceability=False
+        ),
+        "numpy sparse": lambda: create_olap_cube_numpy(sales_df, CUBE_DIMENSIONS, CUBE_METRICS, dense_limit=0),
+    }
+
+    timings, cubes = {}, {}
+    for name, func in cases.items():
+        timings[name], cubes[name] = time_call(func, args.repeat)
+
+    reference = cubes["pandas groupby"]
+    for name, cube in cubes.items():
+        measures = ["SaleAmount_sum", "SaleAmount_mean", "TransactionID_count"]
+        pd.testing.assert_frame_equal(
+            cube[CUBE_DIMENSIONS + measures], reference[CUBE_DIMENSIONS + measures], check_dtype=False
+        )
+
+    baseline = timings["pandas groupby"]
+    print(f"\n{args.rows:,} rows, {len(reference):,} cells (best of {args.repeat})")
+    print(f"{'engine':<28}{'seconds':>10}{'speedup':>10}")
+    for name, seconds in timings.items():
+        print(f"{name:<28}{seconds:>10.3f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
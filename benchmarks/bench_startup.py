@@ -0,0 +1,95 @@
+"""
+Startup Benchmark
+File: benchmarks/bench_startup.py
+
+Measures how long it takes to import the pipeline's entry-point modules in a
+fresh interpreter, with the lazy imports of utils/lazy_import.py and with
+every import made eagerly (SMART_STORE_EAGER_IMPORTS=1), and reports the time
+saved. Each measurement runs in its own subprocess so nothing is cached.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 7
+    python benchmarks/bench_startup.py --modules scripts.olap.olap_report_runner
+"""
+
+import argparse
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.lazy_import import EAGER_IMPORTS_ENV_VAR  # noqa: E402
+
+MODULES = [
+    "utils.logger",
+    "utils.instrumentation",
+    "scripts.data_scrubber",
+    "scripts.data_prep",
+    "scripts.etl_to_dw",
+    "scripts.olap.olap_cubing",
+    "scripts.olap.olap_rendering",
+    "scripts.olap.olap_goal_sales_by_day",
+    "scripts.olap.olap_goal_top_product_by_day",
+    "scripts.olap.olap_report_runner",
+]
+
+# Prints the import time of one module and whether the heavy libraries were loaded
+PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(seconds, "pandas" in sys.modules, "matplotlib" in sys.modules)
+"""
+
+
+def time_import(module: str, eager: bool) -> tuple:
+    """Return (seconds, pandas loaded, matplotlib loaded) for one import in a fresh interpreter."""
+    env = dict(os.environ)
+    env.pop(EAGER_IMPORTS_ENV_VAR, None)
+    if eager:
+        env[EAGER_IMPORTS_ENV_VAR] = "1"
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(root=str(PROJECT_ROOT), module=module)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(output[0]), output[1] == "True", output[2] == "True"
+
+
+def interpreter_startup(repeat: int) -> float:
+    """Average seconds to start and stop a bare interpreter."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    """Measure lazy and eager import times of the entry points and print a results table."""
+    parser = argparse.ArgumentParser(description="Benchmark module import times with and without lazy imports.")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement (median kept).")
+    args = parser.parse_args()
+
+    print(f"\nBare interpreter startup: {interpreter_startup(args.repeat) * 1000:.0f} ms")
+    print(f"Import times, median of {args.repeat} fresh interpreters:")
+    print(f"{'module':<44}{'eager ms':>10}{'lazy ms':>10}{'saved ms':>10}  loaded (lazy)")
+    for module in args.modules:
+        eager = statistics.median(time_import(module, eager=True)[0] for _ in range(args.repeat))
+        lazy_runs = [time_import(module, eager=False) for _ in range(args.repeat)]
+        lazy = statistics.median(run[0] for run in lazy_runs)
+        loaded = [name for name, flag in zip(["pandas", "matplotlib"], lazy_runs[0][1:]) if flag]
+        print(f"{module:<44}{eager * 1000:>10.0f}{lazy * 1000:>10.0f}{(eager - lazy) * 1000:>10.0f}  "
+              f"{', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
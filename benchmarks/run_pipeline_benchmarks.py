@@ -0,0 +1,285 @@
+"""
+Pipeline Benchmark Suite
+File: benchmarks/run_pipeline_benchmarks.py
+
+Runs the pipeline stages (data_prep, etl_to_dw, olap_cubing and the analysis
+scripts through olap_report_runner) end to end at several data scales and
+records, per stage and scale:
+
+- wall time and CPU time (user + system) in seconds;
+- peak resident set size in MiB;
+- sales rows per second of wall time.
+
+Each scale gets its own workspace under data/benchmarks/ with synthetic raw
+files from scripts/generate_synthetic_data.py (generated once per scale and
+seed, then reused). Every stage runs in a child process with the workspace as
+its working directory, so the stages read and write their usual data/...
+paths without touching the project's data, and the CPU time and peak RSS of
+each child are measured on their own (os.wait4; not available on Windows,
+where only wall time is recorded). Stage output goes to <workspace>/logs/.
+
+Results are written as JSON. With --baseline, every stage is compared with
+the baseline run and reported as a regression when its wall time or peak RSS
+grows by more than --threshold (default 10%); the script then exits with
+status 1, so it can gate CI. --save-baseline stores the current run as the
+new baseline.
+
+Usage:
+    python benchmarks/run_pipeline_benchmarks.py --scales 10000 1000000 10000000
+    python benchmarks/run_pipeline_benchmarks.py --scales 10000 --save-baseline
+    python benchmarks/run_pipeline_benchmarks.py --scales 10000 --stages olap_cubing --threshold 0.2
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import os
+import pathlib
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+# Constants
+BENCHMARK_DIR: pathlib.Path = PROJECT_ROOT.joinpath("data", "benchmarks")
+RESULTS_FILE: pathlib.Path = BENCHMARK_DIR.joinpath("results.json")
+BASELINE_FILE: pathlib.Path = PROJECT_ROOT.joinpath("benchmarks", "baseline.json")
+DEFAULT_SCALES: list = [10_000, 1_000_000, 10_000_000]
+DEFAULT_THRESHOLD: float = 0.10
+# Wall-time increases below this many seconds are treated as noise
+MIN_REGRESSION_SECONDS: float = 0.25
+
+# Stage name -> (module, entry point, command-line arguments), in pipeline order
+STAGES: dict = {
+    "data_prep": ("scripts.data_prep", "main", []),
+    "etl_to_dw": ("scripts.etl_to_dw", "load_data_to_db", []),
+    "olap_cubing": ("scripts.olap.olap_cubing", "main", []),
+    "analysis": ("scripts.olap.olap_report_runner", "main", ["--no-cache"]),
+}
+# Outputs removed before each pipeline pass, so caches and chart fingerprints
+# from the previous pass cannot shortcut the work being measured
+DERIVED_DIRS: list = ["prepared", "dw", "olap_cubing_outputs", "results", "cache"]
+GENERATOR_SETTINGS_FILE: str = "generator.json"
+
+
+def customers_for(scale: int) -> int:
+    """Customer count used with a given number of sales (about 20 sales per customer)."""
+    return max(100, scale // 20)
+
+
+def products_for(scale: int) -> int:
+    """Product count used with a given number of sales."""
+    return max(20, min(5_000, scale // 2_000))
+
+
+def prepare_workspace(scale: int, seed: int) -> pathlib.Path:
+    """
+    Create the workspace for a scale, generating the raw files unless they exist for the same settings.
+
+    Returns:
+        pathlib.Path: The workspace directory.
+    """
+    workspace = BENCHMARK_DIR.joinpath(f"sales_{scale}")
+    raw_dir = workspace.joinpath("data", "raw")
+    settings = {"sales": scale, "customers": customers_for(scale), "products": products_for(scale), "seed": seed}
+    settings_file = workspace.joinpath(GENERATOR_SETTINGS_FILE)
+    if settings_file.exists() and json.loads(settings_file.read_text()) == settings:
+        print(f"Reusing synthetic data in {raw_dir}")
+        return workspace
+
+    print(f"Generating {scale:,} synthetic sales in {raw_dir} ...")
+    workspace.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        [
+            sys.executable, str(PROJECT_ROOT.joinpath("scripts", "generate_synthetic_data.py")),
+            "--sales", str(scale), "--customers", str(settings["customers"]),
+            "--products", str(settings["products"]), "--seed", str(seed), "--output-dir", str(raw_dir),
+        ],
+        cwd=workspace, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+    )
+    settings_file.write_text(json.dumps(settings))
+    return workspace
+
+
+def reset_workspace(workspace: pathlib.Path) -> None:
+    """Remove the outputs of a previous pipeline pass, keeping the raw files."""
+    for name in DERIVED_DIRS:
+        shutil.rmtree(workspace.joinpath("data", name), ignore_errors=True)
+    # etl_to_dw expects the warehouse directory to exist
+    workspace.joinpath("data", "dw").mkdir(parents=True)
+
+
+def run_stage(stage: str, workspace: pathlib.Path) -> dict:
+    """
+    Run one stage in a child process and measure it.
+
+    Returns:
+        dict: wall_seconds, cpu_seconds and peak_rss_mib (None where not measurable).
+    """
+    log_dir = workspace.joinpath("logs")
+    log_dir.mkdir(exist_ok=True)
+    command = [sys.executable, str(pathlib.Path(__file__).resolve()), "--run-stage", stage]
+    with open(log_dir.joinpath(f"{stage}.log"), "w") as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=workspace, stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            wall = time.perf_counter() - start
+            returncode = os.waitstatus_to_exitcode(status)
+            process.returncode = returncode
+            cpu = usage.ru_utime + usage.ru_stime
+            # ru_maxrss is in KiB on Linux and in bytes on macOS
+            peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:
+            returncode = process.wait()
+            wall = time.perf_counter() - start
+            cpu, peak_rss = None, None
+    if returncode != 0:
+        raise RuntimeError(f"Stage {stage} failed with exit code {returncode}; see {log_dir.joinpath(stage + '.log')}")
+    return {"wall_seconds": wall, "cpu_seconds": cpu, "peak_rss_mib": peak_rss}
+
+
+def run_stage_in_workspace(stage: str) -> None:
+    """
+    Child-process entry point: run a stage against the data/ directory of the working directory.
+
+    Module-level paths pointing into the project's data/ directory (data_prep
+    builds them from PROJECT_ROOT) are rebased onto the working directory first.
+    """
+    module_name, entry_point, stage_args = STAGES[stage]
+    module = importlib.import_module(module_name)
+    project_data = PROJECT_ROOT.joinpath("data")
+    for name, value in list(vars(module).items()):
+        if isinstance(value, pathlib.Path) and value.is_absolute() and value.is_relative_to(project_data):
+            setattr(module, name, value.relative_to(PROJECT_ROOT))
+    sys.argv = [module.__file__] + stage_args
+    getattr(module, entry_point)()
+
+
+def run_benchmarks(scales: list, stages: list, repeat: int, seed: int) -> list:
+    """
+    Run the selected stages at every scale.
+
+    Stages always run in pipeline order, from data_prep, because each one reads
+    the previous one's outputs; only the selected stages are recorded. With
+    repeat > 1, the pass with the best wall time is kept for each stage.
+
+    Returns:
+        list: One result dict per (scale, stage).
+    """
+    results = []
+    last_stage = max(list(STAGES).index(stage) for stage in stages)
+    for scale in scales:
+        workspace = prepare_workspace(scale, seed)
+        best = {}
+        for _ in range(repeat):
+            reset_workspace(workspace)
+            for stage in list(STAGES)[: last_stage + 1]:
+                measured = run_stage(stage, workspace)
+                print(f"  {scale:>12,} sales  {stage:<12} {measured['wall_seconds']:>9.2f}s")
+                if stage in stages and (stage not in best or measured["wall_seconds"] < best[stage]["wall_seconds"]):
+                    best[stage] = measured
+        for stage in stages:
+            measured = best[stage]
+            results.append({
+                "scale": scale,
+                "stage": stage,
+                **measured,
+                "rows_per_second": scale / measured["wall_seconds"] if measured["wall_seconds"] else None,
+            })
+    return results
+
+
+def compare_with_baseline(results: list, baseline: list, threshold: float) -> pd.DataFrame:
+    """
+    Compare results with a baseline run.
+
+    Returns:
+        pd.DataFrame: One row per (scale, stage) present in both runs, with the
+            relative wall-time and peak-RSS changes and a Regression flag.
+    """
+    current = pd.DataFrame(results).set_index(["scale", "stage"])
+    previous = pd.DataFrame(baseline).set_index(["scale", "stage"])
+    common = current.index.intersection(previous.index)
+    comparison = pd.DataFrame(index=common)
+    comparison["baseline_wall"] = previous.loc[common, "wall_seconds"]
+    comparison["wall"] = current.loc[common, "wall_seconds"]
+    comparison["wall_change"] = comparison["wall"] / comparison["baseline_wall"] - 1
+    comparison["rss_change"] = (
+        current.loc[common, "peak_rss_mib"].astype(float) / previous.loc[common, "peak_rss_mib"].astype(float) - 1
+    )
+    slower = (comparison["wall_change"] > threshold) & (
+        comparison["wall"] - comparison["baseline_wall"] > MIN_REGRESSION_SECONDS
+    )
+    comparison["Regression"] = slower | (comparison["rss_change"] > threshold)
+    return comparison.reset_index()
+
+
+def write_json(path: pathlib.Path, results: list) -> None:
+    """Write a run, with the environment it ran in, as JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+    print(f"Results written to {path}")
+
+
+def print_results(results: list) -> None:
+    table = pd.DataFrame(results)
+    print()
+    print(table.to_string(index=False, float_format=lambda value: f"{value:,.2f}"))
+
+
+def main():
+    """Run the pipeline benchmarks, write the results and compare them with the baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages at several data scales.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="Numbers of sales rows.")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=1, help="Pipeline passes per scale (best wall time is kept).")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic data.")
+    parser.add_argument("--output", type=pathlib.Path, default=RESULTS_FILE)
+    parser.add_argument("--baseline", type=pathlib.Path, default=None,
+                        help=f"Baseline to compare with (e.g. {BASELINE_FILE.relative_to(PROJECT_ROOT)}).")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative increase in wall time or peak RSS reported as a regression.")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write the results to {BASELINE_FILE}.")
+    parser.add_argument("--run-stage", choices=list(STAGES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_stage_in_workspace(args.run_stage)
+        return
+
+    results = run_benchmarks(args.scales, args.stages, args.repeat, args.seed)
+    print_results(results)
+    write_json(args.output, results)
+    if args.save_baseline:
+        write_json(BASELINE_FILE, results)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        comparison = compare_with_baseline(results, baseline, args.threshold)
+        print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}):")
+        print(comparison.to_string(index=False, float_format=lambda value: f"{value:,.3f}"))
+        regressions = comparison[comparison["Regression"]]
+        if not regressions.empty:
+            print(f"\n{len(regressions)} regression(s) found.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ if str(PROJECT_ROOT) not in sys.path:
 # Now we can import local modules
 from utils.logger import logger  # Correctly importing logger
 from scripts.data_scrubber import DataScrubber  # noqa: E402
+from utils.instrumentation import stage, summarize_stages, timed  # noqa: E402
 
 # Constants
 DATA_DIR: pathlib.Path = PROJECT_ROOT.joinpath("data")
@@ -17,6 +18,7 @@ RAW_DATA_DIR: pathlib.Path = DATA_DIR.joinpath("raw")
 PREPARED_DATA_DIR: pathlib.Path = DATA_DIR.joinpath("prepared")
 
 
+@timed("read {file_name}")
 def read_raw_data(file_name: str) -> pd.DataFrame:
     """Read raw data from CSV."""
     file_path: pathlib.Path = RAW_DATA_DIR.joinpath(file_name)
@@ -24,6 +26,7 @@ def read_raw_data(file_name: str) -> pd.DataFrame:
     return pd.read_csv(file_path)
 
 
+@timed("save {file_name}")
 def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
     """Save cleaned data to CSV."""
     PREPARED_DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -32,6 +35,7 @@ def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
     logger.info(f"Data saved to {file_path}")
 
 
+@timed("outlier filter {column}")
 def remove_outliers(df: pd.DataFrame, column: str) -> pd.DataFrame:
     """
     Remove outliers in a specified column where the value is greater than 1.5 times the average.
@@ -61,15 +65,20 @@ def prepare_customers_data():
 
     df_customers = read_raw_data("customers_data.csv")
     df_customers.columns = df_customers.columns.str.strip()  # Clean column names
-    df_customers = df_customers.drop_duplicates()  # Remove duplicates
-    df_customers['Name'] = df_customers['Name'].str.strip()  # Trim whitespace
-    df_customers = df_customers.dropna(subset=['CustomerID', 'Name'])  # Drop rows missing critical info
+    with stage("customers: dedupe", rows_in=len(df_customers)) as timing:
+        df_customers = df_customers.drop_duplicates()  # Remove duplicates
+        timing.rows_out = len(df_customers)
 
-    scrubber_customers = DataScrubber(df_customers)
-    scrubber_customers.check_data_consistency_before_cleaning()
-    scrubber_customers.inspect_data()
-    df_customers = scrubber_customers.handle_missing_data(fill_value="N/A")
-    df_customers = scrubber_customers.parse_dates_to_add_standard_datetime('JoinDate')
+    with stage("customers: clean", rows_in=len(df_customers)) as timing:
+        df_customers['Name'] = df_customers['Name'].str.strip()  # Trim whitespace
+        df_customers = df_customers.dropna(subset=['CustomerID', 'Name'])  # Drop rows missing critical info
+
+        scrubber_customers = DataScrubber(df_customers)
+        scrubber_customers.check_data_consistency_before_cleaning()
+        scrubber_customers.inspect_data()
+        df_customers = scrubber_customers.handle_missing_data(fill_value="N/A")
+        df_customers = scrubber_customers.parse_dates_to_add_standard_datetime('JoinDate')
+        timing.rows_out = len(df_customers)
 
     # Remove outliers for specific numeric columns if applicable
     df_customers = remove_outliers(df_customers, "CustomerID")
@@ -87,13 +96,18 @@ def prepare_products_data():
 
     df_products = read_raw_data("products_data.csv")
     df_products.columns = df_products.columns.str.strip()  # Clean column names
-    df_products = df_products.drop_duplicates()  # Remove duplicates
-    df_products['ProductName'] = df_products['ProductName'].str.strip()  # Trim whitespace
+    with stage("products: dedupe", rows_in=len(df_products)) as timing:
+        df_products = df_products.drop_duplicates()  # Remove duplicates
+        timing.rows_out = len(df_products)
+
+    with stage("products: clean", rows_in=len(df_products)) as timing:
+        df_products['ProductName'] = df_products['ProductName'].str.strip()  # Trim whitespace
 
-    scrubber_products = DataScrubber(df_products)
-    scrubber_products.check_data_consistency_before_cleaning()
-    scrubber_products.inspect_data()
-    scrubber_products.check_data_consistency_after_cleaning()
+        scrubber_products = DataScrubber(df_products)
+        scrubber_products.check_data_consistency_before_cleaning()
+        scrubber_products.inspect_data()
+        scrubber_products.check_data_consistency_after_cleaning()
+        timing.rows_out = len(df_products)
 
     # Remove outliers for specific numeric columns if applicable
     df_products = remove_outliers(df_products, "UnitPrice")
@@ -110,14 +124,23 @@ def prepare_sales_data():
 
     df_sales = read_raw_data("sales_data.csv")
     df_sales.columns = df_sales.columns.str.strip()  # Clean column names
-    df_sales = df_sales.drop_duplicates()  # Remove duplicates
-    df_sales['SaleDate'] = pd.to_datetime(df_sales['SaleDate'], errors='coerce')  # Parse dates
-    df_sales = df_sales.dropna(subset=['TransactionID', 'SaleDate'])  # Drop rows missing critical info
-
-    scrubber_sales = DataScrubber(df_sales)
-    scrubber_sales.check_data_consistency_before_cleaning()
-    scrubber_sales.inspect_data()
-    df_sales = scrubber_sales.handle_missing_data(fill_value="Unknown")
+    with stage("sales: dedupe", rows_in=len(df_sales)) as timing:
+        df_sales = df_sales.drop_duplicates()  # Remove duplicates
+        timing.rows_out = len(df_sales)
+
+    with stage("sales: clean", rows_in=len(df_sales)) as timing:
+        df_sales['SaleDate'] = pd.to_datetime(df_sales['SaleDate'], errors='coerce')  # Parse dates
+        df_sales = df_sales.dropna(subset=['TransactionID', 'SaleDate'])  # Drop rows missing critical info
+
+        scrubber_sales = DataScrubber(df_sales)
+        scrubber_sales.check_data_consistency_before_cleaning()
+        scrubber_sales.inspect_data()
+        # Discounts arrive as text like "5%"; a sale without a recorded discount had none
+        df_sales = scrubber_sales.parse_percent_column('DiscountPercent')
+        # Kept as float: fractional discounts such as 12.5% must not be truncated
+        df_sales['DiscountPercent'] = df_sales['DiscountPercent'].astype(float).fillna(0.0)
+        df_sales = scrubber_sales.handle_missing_data(fill_value="Unknown")
+        timing.rows_out = len(df_sales)
 
     # Remove outliers for specific numeric columns if applicable
     df_sales = remove_outliers(df_sales, "SaleAmount")
@@ -127,6 +150,7 @@ def prepare_sales_data():
     save_prepared_data(df_sales, "sales_data_prepared.csv")
 
 
+@summarize_stages("data_prep")
 def main():
     """Main function for processing customer, product, and sales data."""
     logger.info("======================")
@@ -1,7 +1,20 @@
+from __future__ import annotations
+
 import io
-import pandas as pd
+import pathlib
+import sys
 from typing import Dict, Tuple, Union, List
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.lazy_import import lazy_import  # noqa: E402
+
+# pandas is loaded when a DataScrubber first touches a DataFrame
+pd = lazy_import("pandas")
+
 class DataScrubber:
     def __init__(self, df: pd.DataFrame):
         """
@@ -195,6 +208,26 @@ class DataScrubber:
         except KeyError:
             raise ValueError(f"Column name '{column}' not found in the DataFrame.")
 
+    def parse_percent_column(self, column: str) -> pd.DataFrame:
+        """
+        Parse a column of percentages such as "5%" into numbers (5.0); unparseable values become NaN.
+        
+        Parameters:
+            column (str): Name of the column to parse.
+        
+        Returns:
+            pd.DataFrame: Updated DataFrame with the column as numbers.
+
+        Raises:
+            ValueError: If the specified column not found in the DataFrame.
+        """
+        try:
+            text = self.df[column].astype("string").str.strip().str.rstrip("%")
+            self.df[column] = pd.to_numeric(text, errors="coerce")
+            return self.df
+        except KeyError:
+            raise ValueError(f"Column name '{column}' not found in the DataFrame.")
+
     def remove_duplicate_records(self) -> pd.DataFrame:
         """
         Remove duplicate rows from the DataFrame.
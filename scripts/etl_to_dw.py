@@ -8,10 +8,16 @@ PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
+from utils.logger import logger, log_dataframe_preview  # noqa: E402
+from utils.instrumentation import stage, summarize_stages, timed  # noqa: E402
+from utils.memory_budget import chunk_rows_for_budget, estimate_csv_frame_bytes, memory_budget_bytes  # noqa: E402
+
 # Constants
 DW_DIR = pathlib.Path("data").joinpath("dw")
 DB_PATH = DW_DIR.joinpath("smart_sales.db")
 PREPARED_DATA_DIR = pathlib.Path("data").joinpath("prepared")
+# Rough ratio of the peak memory of inserting a table to the size of its DataFrame
+ETL_WORKING_SET_FACTOR = 2.0
 
 def drop_unwanted_tables(cursor: sqlite3.Cursor) -> None:
     """Drop all tables except 'customer', 'product', and 'sales'."""
@@ -20,7 +26,7 @@ def drop_unwanted_tables(cursor: sqlite3.Cursor) -> None:
     for table in tables:
         table_name = table[0]
         if table_name not in ['customer', 'product', 'sales']:
-            print(f"Dropping table: {table_name}")
+            logger.info(f"Dropping table: {table_name}")
             cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
 
 def create_schema(cursor: sqlite3.Cursor) -> None:
@@ -63,7 +69,7 @@ def create_schema(cursor: sqlite3.Cursor) -> None:
             SaleAmount REAL,
             SaleDate DATE,
             CampaignID INTEGER,
-            DiscountPercent INTEGER,
+            DiscountPercent REAL,
             PaymentType TEXT,
             StoreID TEXT,
             FOREIGN KEY (CustomerID) REFERENCES customer (CustomerID),
@@ -77,66 +83,107 @@ def delete_existing_records(cursor: sqlite3.Cursor) -> None:
     cursor.execute("DELETE FROM product")
     cursor.execute("DELETE FROM sales")
 
+@timed("insert customers")
 def insert_customers(customers_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
     """Insert customer data into the customer table."""
     # Drop the 'StandardDateTime' column if it exists
     if "StandardDateTime" in customers_df.columns:
-        print("Dropping 'StandardDateTime' column from Customers DataFrame...")
+        logger.info("Dropping 'StandardDateTime' column from Customers DataFrame...")
         customers_df = customers_df.drop(columns=["StandardDateTime"])
 
-    print(f"Inserting into 'customer' table: {customers_df.head()}")
+    log_dataframe_preview(customers_df, "Inserting into 'customer' table")
     customers_df.to_sql("customer", cursor.connection, if_exists="append", index=False)
 
+@timed("insert products")
 def insert_products(products_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
     """Insert product data into the product table."""
-    print(f"Inserting into 'product' table: {products_df.head()}")
+    log_dataframe_preview(products_df, "Inserting into 'product' table")
     products_df.to_sql("product", cursor.connection, if_exists="append", index=False)
 
+@timed("insert sales")
 def insert_sales(sales_df: pd.DataFrame, cursor: sqlite3.Cursor) -> None:
     """Insert sales data into the sales table."""
-    print(f"Inserting into 'sales' table: {sales_df.head()}")
+    log_dataframe_preview(sales_df, "Inserting into 'sales' table")
     sales_df.to_sql("sales", cursor.connection, if_exists="append", index=False)
 
-def load_data_to_db() -> None:
+@timed("read {file_name}")
+def read_prepared_data(file_name: str) -> pd.DataFrame:
+    """Read a prepared CSV file."""
+    return pd.read_csv(PREPARED_DATA_DIR.joinpath(file_name))
+
+def read_prepared_chunks(file_name: str, chunk_rows: int):
+    """Read a prepared CSV file chunk_rows rows at a time."""
+    for chunk in pd.read_csv(PREPARED_DATA_DIR.joinpath(file_name), chunksize=chunk_rows):
+        yield chunk
+
+def prepared_chunk_rows(file_name: str, budget: int) -> int:
+    """Return the rows per chunk needed to load a prepared file within the memory budget, or None if it fits."""
+    if budget is None:
+        return None
+    estimate, bytes_per_row = estimate_csv_frame_bytes(PREPARED_DATA_DIR.joinpath(file_name))
+    if estimate * ETL_WORKING_SET_FACTOR <= budget:
+        return None
+    chunk_rows = chunk_rows_for_budget(bytes_per_row, budget, ETL_WORKING_SET_FACTOR)
+    logger.warning(
+        f"{file_name} needs about {estimate * ETL_WORKING_SET_FACTOR / 2**20:.0f} MiB, over the "
+        f"{budget / 2**20:.0f} MiB budget; inserting it in chunks of {chunk_rows} rows."
+    )
+    return chunk_rows
+
+@summarize_stages("etl_to_dw")
+def load_data_to_db(memory_budget_mib: float = None) -> None:
+    """
+    Load the prepared CSV files into the data warehouse.
+
+    The tables are loaded one at a time. A table whose estimated working set
+    exceeds the memory budget is read and inserted in chunks, so the warehouse
+    itself holds the rows already loaded.
+
+    Args:
+        memory_budget_mib (float, optional): Memory budget in MiB (default: SMART_STORE_MEMORY_BUDGET_MB).
+    """
     try:
         # Connect to SQLite – will create the file if it doesn't exist
-        print("Connecting to the database...")
+        logger.info("Connecting to the database...")
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
 
         # Drop any unnecessary tables
-        print("Dropping unwanted tables...")
+        logger.info("Dropping unwanted tables...")
         drop_unwanted_tables(cursor)
 
         # Create schema and clear existing records
-        print("Creating schema...")
-        create_schema(cursor)
+        logger.info("Creating schema...")
+        with stage("create schema"):
+            create_schema(cursor)
 
-        print("Deleting existing records...")
+        logger.info("Deleting existing records...")
         delete_existing_records(cursor)
 
-        # Load prepared data using pandas
-        print("Loading prepared data...")
-        customers_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("customers_data_prepared.csv"))
-        products_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("products_data_prepared.csv"))
-        sales_df = pd.read_csv(PREPARED_DATA_DIR.joinpath("sales_data_prepared.csv"))
-
-        # Insert data into the database
-        print("Inserting customers...")
-        insert_customers(customers_df, cursor)
-
-        print("Inserting products...")
-        insert_products(products_df, cursor)
-
-        print("Inserting sales...")
-        insert_sales(sales_df, cursor)
-
-        conn.commit()
-        print("Data successfully loaded into the database!")
+        # Load prepared data using pandas and insert it into the database, one table at a time
+        logger.info("Loading prepared data...")
+        budget = memory_budget_bytes(memory_budget_mib)
+        tables = [
+            ("customers", "customers_data_prepared.csv", insert_customers),
+            ("products", "products_data_prepared.csv", insert_products),
+            ("sales", "sales_data_prepared.csv", insert_sales),
+        ]
+        for label, file_name, insert in tables:
+            chunk_rows = prepared_chunk_rows(file_name, budget)
+            logger.info(f"Inserting {label}...")
+            if chunk_rows is None:
+                insert(read_prepared_data(file_name), cursor)
+            else:
+                for chunk in read_prepared_chunks(file_name, chunk_rows):
+                    insert(chunk, cursor)
+
+        with stage("commit"):
+            conn.commit()
+        logger.info("Data successfully loaded into the database!")
     finally:
         if conn:
             conn.close()
-            print("Database connection closed.")
+            logger.info("Database connection closed.")
 
 if __name__ == "__main__":
     load_data_to_db()
\ No newline at end of file
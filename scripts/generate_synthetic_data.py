@@ -0,0 +1,302 @@
+"""
+Synthetic Data Generator
+File: scripts/generate_synthetic_data.py
+
+Writes customers_data.csv, products_data.csv and sales_data.csv in the exact
+schema of data/raw, at any size, for reproducing performance problems that
+the bundled hundred-row files cannot show.
+
+The output keeps the quirks of the raw files that data_prep.py has to handle:
+
+- dates as M/D/YYYY, discounts as "5%" strings;
+- exact duplicate rows, and customers whose names differ by a typo;
+- blank (null) cells in the non-key columns data_prep.py fills in (customers'
+  Age and PreferredContactMethod; sales' StoreID, DiscountPercent and PaymentType);
+- SaleAmount and UnitPrice outliers far above the usual values.
+
+Skew is configurable: customers are spread over the regions and sales over
+the products with Zipf weights (exponent 0 = uniform). Sale dates increase
+with TransactionID, as in the raw sales file.
+
+Rows are generated and appended in fixed blocks of GENERATION_BLOCK_ROWS, each
+with its own random stream derived from (seed, table, block number), so memory
+stays constant at any row count and the same seed always produces the same
+files. Only the product price list (one float per product) is held in memory.
+
+Usage:
+    python scripts/generate_synthetic_data.py --sales 1000000
+    python scripts/generate_synthetic_data.py --customers 1000000 --products 5000 --sales 100000000 \\
+        --region-skew 1.2 --product-skew 1.1 --seed 7 --output-dir data/synthetic
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+
+# Constants
+SYNTHETIC_DATA_DIR: pathlib.Path = pathlib.Path("data").joinpath("synthetic")
+GENERATION_BLOCK_ROWS: int = 250_000
+
+# Raw file schemas, as in data/raw
+CUSTOMER_COLUMNS: list = ["CustomerID", "Name", "Region", "JoinDate", "Age", "PreferredContactMethod"]
+PRODUCT_COLUMNS: list = ["ProductID", "ProductName", "Category", "UnitPrice", "StockQuantity", "StoreSection"]
+SALES_COLUMNS: list = [
+    "TransactionID", "SaleDate", "CustomerID", "ProductID", "StoreID",
+    "CampaignID", "SaleAmount", "DiscountPercent", "PaymentType",
+]
+
+# First IDs, continuing the numbering of the raw files
+FIRST_CUSTOMER_ID: int = 1001
+FIRST_PRODUCT_ID: int = 101
+FIRST_TRANSACTION_ID: int = 550
+
+REGIONS: list = ["East", "West", "North", "South"]
+CONTACT_METHODS: list = ["Email", "Phone", "Text", "Mail"]
+PAYMENT_TYPES: list = ["Cash", "CreditCard", "DebitCard", "ApplePay"]
+STORE_IDS: list = [401, 402, 403, 404, 405, 406]
+CAMPAIGN_WEIGHTS: list = [0.7, 0.1, 0.1, 0.1]  # CampaignID 0 (none) to 3
+DISCOUNT_PERCENTS: list = list(range(0, 60, 5))
+FIRST_NAMES: list = [
+    "William", "Susan", "Tony", "Hermione", "Jason", "Tiffany", "Dan", "Maria", "Omar", "Aiko",
+    "Priya", "Lucas", "Fatima", "Chen", "Olga", "Kwame", "Sofia", "Mateo", "Ingrid", "Ravi",
+]
+LAST_NAMES: list = [
+    "White", "Johnson", "Stark", "Granger", "Bourne", "James", "Brown", "Garcia", "Haddad", "Tanaka",
+    "Patel", "Silva", "Khan", "Wei", "Ivanova", "Mensah", "Rossi", "Lopez", "Larsen", "Rao",
+]
+# Product name -> (Category, StoreSection, typical UnitPrice)
+PRODUCT_TYPES: dict = {
+    "laptop": ("Electronics", "Computer", 793.12),
+    "hoodie": ("Clothing", "MensClothing", 39.10),
+    "cable": ("Electronics", "Televisions", 22.76),
+    "hat": ("Clothing", "SportingGoods", 43.10),
+    "football": ("Sports", "SportingGoods", 19.78),
+    "controller": ("Electronics", "VideoGames", 88.98),
+    "jacket": ("Clothing", "MensClothing", 67.02),
+    "protector": ("Electronics", "CellPhones", 12.56),
+}
+
+# Seed offsets keeping the random streams of the three tables apart
+TABLE_STREAMS: dict = {"customers": 1, "products": 2, "sales": 3}
+
+
+def zipf_weights(count: int, exponent: float) -> np.ndarray:
+    """Return normalized weights proportional to 1 / rank^exponent (uniform for exponent 0)."""
+    weights = 1.0 / np.arange(1, count + 1, dtype=np.float64) ** exponent
+    return weights / weights.sum()
+
+
+def block_rng(seed: int, table: str, block: int) -> np.random.Generator:
+    """Independent, reproducible random stream for one block of one table."""
+    return np.random.default_rng([seed, TABLE_STREAMS[table], block])
+
+
+def format_dates(day_offsets: np.ndarray, start: pd.Timestamp) -> np.ndarray:
+    """Format day offsets from start as M/D/YYYY strings, like the raw files."""
+    dates = start + pd.to_timedelta(day_offsets, unit="D")
+    return (dates.month.astype(str) + "/" + dates.day.astype(str) + "/" + dates.year.astype(str)).to_numpy()
+
+
+def blank_out(df: pd.DataFrame, columns: list, rate: float, rng: np.random.Generator) -> pd.DataFrame:
+    """Set a random fraction of the cells of columns to null."""
+    if rate <= 0:
+        return df
+    for column in columns:
+        mask = rng.random(len(df)) < rate
+        if mask.any():
+            if pd.api.types.is_integer_dtype(df[column]):
+                df[column] = df[column].astype("Int64")
+            df.loc[mask, column] = None
+    return df
+
+
+def duplicate_rows(df: pd.DataFrame, rate: float, rng: np.random.Generator) -> pd.DataFrame:
+    """Repeat a random fraction of rows right after themselves, as exact duplicates."""
+    if rate <= 0:
+        return df
+    repeats = 1 + (rng.random(len(df)) < rate)
+    return df.loc[df.index.repeat(repeats)]
+
+
+def customers_block(start: int, rows: int, options: argparse.Namespace) -> pd.DataFrame:
+    """Generate customers start .. start + rows - 1 (0-based positions)."""
+    rng = block_rng(options.seed, "customers", start // GENERATION_BLOCK_ROWS)
+    names = rng.choice(FIRST_NAMES, rows).astype(object) + " " + rng.choice(LAST_NAMES, rows).astype(object)
+    # A few customers are entered twice with a one-letter typo in the name
+    typos = rng.random(rows) < options.duplicate_rate
+    names[typos] = [name[:-1] for name in names[typos]]
+    df = pd.DataFrame({
+        "CustomerID": np.arange(start, start + rows) + FIRST_CUSTOMER_ID,
+        "Name": names,
+        "Region": rng.choice(REGIONS, rows, p=zipf_weights(len(REGIONS), options.region_skew)),
+        "JoinDate": format_dates(rng.integers(0, 5 * 365, rows), pd.Timestamp("2019-01-01")),
+        "Age": rng.integers(18, 86, rows),
+        "PreferredContactMethod": rng.choice(CONTACT_METHODS, rows),
+    })
+    df = blank_out(df, ["Age", "PreferredContactMethod"], options.null_rate, rng)
+    return duplicate_rows(df, options.duplicate_rate, rng)
+
+
+def product_prices(options: argparse.Namespace) -> np.ndarray:
+    """Unit price of every product, in ProductID order (needed to price the sales)."""
+    rng = block_rng(options.seed, "products", 0)
+    base = np.array([price for _, _, price in PRODUCT_TYPES.values()])
+    types = np.arange(options.products) % len(PRODUCT_TYPES)
+    prices = base[types] * rng.lognormal(0.0, 0.25, options.products)
+    # Outliers, like a mispriced catalog entry
+    outliers = rng.random(options.products) < options.outlier_rate
+    prices[outliers] *= rng.uniform(10, 50, outliers.sum())
+    return np.round(prices, 2)
+
+
+def products_block(start: int, rows: int, options: argparse.Namespace, prices: np.ndarray) -> pd.DataFrame:
+    """Generate products start .. start + rows - 1 (0-based positions)."""
+    rng = block_rng(options.seed, "products", 1 + start // GENERATION_BLOCK_ROWS)
+    names = list(PRODUCT_TYPES)
+    positions = np.arange(start, start + rows)
+    types = positions % len(names)
+    # Later products are variants of the base product types: "laptop 2", "laptop 3", ...
+    variants = positions // len(names)
+    product_names = np.array(names, dtype=object)[types]
+    product_names = np.where(variants > 0, product_names + " " + (variants + 1).astype(str), product_names)
+    df = pd.DataFrame({
+        "ProductID": positions + FIRST_PRODUCT_ID,
+        "ProductName": product_names,
+        "Category": np.array([PRODUCT_TYPES[name][0] for name in names])[types],
+        "UnitPrice": prices[positions],
+        "StockQuantity": rng.integers(0, 100, rows),
+        "StoreSection": np.array([PRODUCT_TYPES[name][1] for name in names])[types],
+    })
+    return duplicate_rows(df, options.duplicate_rate, rng)
+
+
+def sales_block(start: int, rows: int, options: argparse.Namespace, prices: np.ndarray) -> pd.DataFrame:
+    """Generate sales start .. start + rows - 1 (0-based positions)."""
+    rng = block_rng(options.seed, "sales", start // GENERATION_BLOCK_ROWS)
+    positions = np.arange(start, start + rows)
+    product_index = rng.choice(options.products, rows, p=options.product_weights)
+    quantity = rng.integers(1, 11, rows)
+    amount = np.round(prices[product_index] * quantity, 2)
+    outliers = rng.random(rows) < options.outlier_rate
+    amount[outliers] = np.round(amount[outliers] * rng.uniform(10, 50, outliers.sum()), 2)
+
+    # Dates increase with the TransactionID over the requested span of days
+    day_offsets = positions * options.days // max(options.sales, 1)
+    df = pd.DataFrame({
+        "TransactionID": positions + FIRST_TRANSACTION_ID,
+        "SaleDate": format_dates(day_offsets, options.start_date),
+        "CustomerID": rng.integers(0, options.customers, rows) + FIRST_CUSTOMER_ID,
+        "ProductID": product_index + FIRST_PRODUCT_ID,
+        "StoreID": rng.choice(STORE_IDS, rows),
+        "CampaignID": rng.choice(len(CAMPAIGN_WEIGHTS), rows, p=CAMPAIGN_WEIGHTS),
+        "SaleAmount": amount,
+        "DiscountPercent": np.char.add(rng.choice(DISCOUNT_PERCENTS, rows).astype(str), "%"),
+        "PaymentType": rng.choice(PAYMENT_TYPES, rows),
+    })
+    df = blank_out(df, ["StoreID", "DiscountPercent", "PaymentType"], options.null_rate, rng)
+    return duplicate_rows(df, options.duplicate_rate, rng)
+
+
+def write_table(path: pathlib.Path, columns: list, total_rows: int, make_block) -> int:
+    """
+    Stream a table to CSV block by block.
+
+    The file is written under a temporary name and renamed when complete.
+
+    Returns:
+        int: Rows written, duplicates included.
+    """
+    tmp_path = path.with_suffix(".csv.tmp")
+    written = 0
+    start_time = time.perf_counter()
+    try:
+        with open(tmp_path, "w", newline="") as f:
+            f.write(",".join(columns) + "\n")
+            for start in range(0, total_rows, GENERATION_BLOCK_ROWS):
+                block = make_block(start, min(GENERATION_BLOCK_ROWS, total_rows - start))
+                block[columns].to_csv(f, header=False, index=False, lineterminator="\n")
+                written += len(block)
+                logger.info(f"{path.name}: {min(start + GENERATION_BLOCK_ROWS, total_rows)}/{total_rows} rows generated")
+        tmp_path.replace(path)
+        seconds = time.perf_counter() - start_time
+        logger.info(f"Wrote {written} rows to {path} in {seconds:.1f}s ({written / max(seconds, 1e-9):,.0f} rows/s).")
+        return written
+    except Exception as e:
+        logger.error(f"Error writing synthetic data to {path}: {e}")
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def generate(options: argparse.Namespace) -> dict:
+    """
+    Generate the three raw files into options.output_dir.
+
+    Returns:
+        dict: File name -> rows written.
+    """
+    if min(options.customers, options.products) < 1:
+        raise ValueError("At least one customer and one product are needed.")
+    options.start_date = pd.Timestamp(options.start_date)
+    options.product_weights = zipf_weights(options.products, options.product_skew)
+    output_dir = pathlib.Path(options.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    prices = product_prices(options)
+
+    return {
+        "customers_data.csv": write_table(
+            output_dir.joinpath("customers_data.csv"), CUSTOMER_COLUMNS, options.customers,
+            lambda start, rows: customers_block(start, rows, options),
+        ),
+        "products_data.csv": write_table(
+            output_dir.joinpath("products_data.csv"), PRODUCT_COLUMNS, options.products,
+            lambda start, rows: products_block(start, rows, options, prices),
+        ),
+        "sales_data.csv": write_table(
+            output_dir.joinpath("sales_data.csv"), SALES_COLUMNS, options.sales,
+            lambda start, rows: sales_block(start, rows, options, prices),
+        ),
+    }
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate raw customers, products and sales CSVs at scale.")
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--sales", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--region-skew", type=float, default=1.0,
+                        help="Zipf exponent of customers over regions (0 = uniform).")
+    parser.add_argument("--product-skew", type=float, default=1.0,
+                        help="Zipf exponent of sales over products (0 = uniform).")
+    parser.add_argument("--duplicate-rate", type=float, default=0.01, help="Fraction of rows written twice.")
+    parser.add_argument("--null-rate", type=float, default=0.005, help="Fraction of blank cells in nullable columns.")
+    parser.add_argument("--outlier-rate", type=float, default=0.002, help="Fraction of prices and amounts inflated.")
+    parser.add_argument("--start-date", default="2024-01-01")
+    parser.add_argument("--days", type=int, default=366, help="Number of days the sales span.")
+    parser.add_argument("--output-dir", type=pathlib.Path, default=SYNTHETIC_DATA_DIR)
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function for generating synthetic raw data."""
+    logger.info("Starting synthetic data generation...")
+    options = parse_args()
+    written = generate(options)
+    for file_name, rows in written.items():
+        logger.info(f"{file_name}: {rows} rows")
+    logger.info(f"Synthetic data written to {options.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
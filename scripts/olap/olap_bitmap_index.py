@@ -0,0 +1,363 @@
+"""
+Bitmap Indexes
+File: scripts/olap/olap_bitmap_index.py
+
+Bitmap indexes over the low-cardinality dimensions of the sales facts and the
+OLAP cube (Region, ProductID, Month, DayOfWeek, PaymentType, StoreID), so
+multi-predicate filters such as
+
+    Region = East AND Month IN (1, 2, 3) AND ProductID = 105
+
+are answered by combining bitmaps before any row is touched.
+
+Every value of an indexed column has one compressed bitmap, stored in one of
+two forms, whichever is smaller:
+
+- rare values (at most one row in 32) as the sorted positions of their rows
+  (uint32, so 32 bits per matching row);
+- common values as a bitmap with a bit per row, packed eight rows to a byte
+  with np.packbits. A column has at most 32 of these.
+
+An index therefore takes about 4 bytes per row per column, however many
+values the column has. It is built with one stable sort of each column's
+value codes, which lists the rows of every value in order.
+
+A filter ORs the bitmaps of the values listed for a column and ANDs the
+columns together, starting with the most selective one and stopping early
+once nothing matches. Row position lists are intersected directly and
+checked against packed bitmaps bit by bit, so a packed bitmap is only
+expanded when every predicate of a query matches common values. Only the
+matching rows are then read from the DataFrame.
+
+    index = BitmapIndex.build(sales_df)
+    rows = index.filter(sales_df, {"Region": "East", "Month": [1, 2, 3], "ProductID": 105})
+
+Indexes are saved as compressed .npz files. refresh_index() brings a saved
+index up to date with its data. When the rows it indexed are unchanged and
+new rows were appended (an incremental load), only the new rows are indexed;
+otherwise it is rebuilt. The bitmap_index stage of run_pipeline.py runs this
+script after every warehouse load or cube rebuild, so the saved indexes
+follow the data.
+
+Usage:
+    python scripts/olap/olap_bitmap_index.py                      # build or refresh both indexes
+    python scripts/olap/olap_bitmap_index.py --query Region=East Month=1,2,3 ProductID=105
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import sys
+
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from utils.content_hash import hash_dataframe  # noqa: E402
+from scripts.olap.olap_cubing import (  # noqa: E402
+    CUSTOMERS_FILE,
+    OLAP_OUTPUT_DIR,
+    ingest_customers_data,
+    ingest_sales_data_from_dw,
+    prepare_sales_for_cube,
+)
+
+# Constants
+BITMAP_COLUMNS: list = ["Region", "ProductID", "Month", "DayOfWeek", "PaymentType", "StoreID"]
+# A row position takes 32 bits and a packed bitmap 1 bit per row, so values matching
+# more than one row in DENSE_ROWS_PER_MATCH are stored packed
+DENSE_ROWS_PER_MATCH: int = 32
+CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.csv")
+SALES_INDEX_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("sales_bitmap_index.npz")
+CUBE_INDEX_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("cube_bitmap_index.npz")
+
+
+def _append_bits(packed: np.ndarray, n_bits: int, new_bits: np.ndarray) -> np.ndarray:
+    """Append bits to a packed bitmap holding n_bits bits, repacking only its last byte."""
+    used = n_bits % 8
+    if used == 0:
+        return np.concatenate([packed, np.packbits(new_bits)])
+    head = np.unpackbits(packed[-1:])[:used].astype(bool)
+    return np.concatenate([packed[:-1], np.packbits(np.concatenate([head, new_bits]))])
+
+
+def _is_packed(stored: np.ndarray) -> bool:
+    """Whether a stored bitmap is packed bits (uint8) rather than row positions (uint32)."""
+    return stored.dtype == np.uint8
+
+
+def _encode(rows: np.ndarray, n_rows: int) -> np.ndarray:
+    """Store sorted row positions as they are, or as a packed bitmap when that is smaller."""
+    if len(rows) * DENSE_ROWS_PER_MATCH <= n_rows:
+        return rows.astype(np.uint32)
+    bits = np.zeros(n_rows, dtype=bool)
+    bits[rows] = True
+    return np.packbits(bits)
+
+
+def _test_bits(packed: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Whether each of the given rows is set in a packed bitmap."""
+    return ((packed[rows >> 3] >> (7 - (rows & 7))) & 1).astype(bool)
+
+
+class BitmapIndex:
+    """Compressed bitmaps per value of some columns of a DataFrame, answering AND/OR filters."""
+
+    def __init__(self, n_rows: int = 0, bitmaps: dict = None, source_hash: str = None):
+        self.n_rows = n_rows
+        # column -> {value: sorted uint32 row positions, or uint8 packed bitmap of ceil(n_rows / 8) bytes}
+        self.bitmaps = bitmaps or {}
+        # Hash of the indexed columns of the rows indexed so far, to detect changed data
+        self.source_hash = source_hash
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, columns: list = None) -> "BitmapIndex":
+        """
+        Index the given columns of a DataFrame.
+
+        Args:
+            df (pd.DataFrame): The data, e.g. prepared sales facts or the cube.
+            columns (list, optional): Columns to index (default: the BITMAP_COLUMNS present in df).
+
+        Returns:
+            BitmapIndex: The index.
+        """
+        columns = columns or [column for column in BITMAP_COLUMNS if column in df.columns]
+        index = cls(bitmaps={column: {} for column in columns})
+        index.append(df)
+        return index
+
+    @property
+    def columns(self) -> list:
+        return list(self.bitmaps)
+
+    def append(self, df: pd.DataFrame) -> None:
+        """Index rows appended to the data after the rows already indexed."""
+        missing = [column for column in self.columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"Columns {missing} are indexed but missing from the data.")
+        n_rows = self.n_rows + len(df)
+        for column, value_bitmaps in self.bitmaps.items():
+            codes, uniques = pd.factorize(df[column])  # nulls get code -1 and no bitmap
+            # One stable sort groups the rows of every value, each group in row order
+            order = np.argsort(codes, kind="stable").astype(np.uint32) + np.uint32(self.n_rows)
+            bounds = np.cumsum(np.bincount(codes + 1, minlength=len(uniques) + 1))
+            new_rows = {value: order[bounds[code]:bounds[code + 1]] for code, value in enumerate(uniques.tolist())}
+
+            # Packed bitmaps grow with every row; row position lists only when the value occurs
+            packed_values = [value for value, stored in value_bitmaps.items() if _is_packed(stored)]
+            for value in set(new_rows) | set(packed_values):
+                stored = value_bitmaps.get(value)
+                rows = new_rows.get(value, np.empty(0, dtype=np.uint32))
+                if stored is None:
+                    value_bitmaps[value] = _encode(rows, n_rows)
+                elif not _is_packed(stored):
+                    value_bitmaps[value] = _encode(np.concatenate([stored, rows]), n_rows)
+                else:
+                    bits = np.zeros(len(df), dtype=bool)
+                    bits[rows - self.n_rows] = True
+                    packed = _append_bits(stored, self.n_rows, bits)
+                    rows = np.flatnonzero(np.unpackbits(packed, count=n_rows))
+                    if len(rows) * DENSE_ROWS_PER_MATCH <= n_rows:
+                        packed = _encode(rows, n_rows)
+                    value_bitmaps[value] = packed
+        self.n_rows = n_rows
+
+    def values(self, column: str) -> list:
+        """The indexed values of a column."""
+        return list(self._column(column))
+
+    def _column(self, column: str) -> dict:
+        if column not in self.bitmaps:
+            raise ValueError(f"Column '{column}' is not indexed. Indexed columns: {self.columns}")
+        return self.bitmaps[column]
+
+    def _match(self, column: str, values) -> np.ndarray:
+        """Rows whose column holds any of the values, as row positions or, if any value is common, a packed bitmap."""
+        value_bitmaps = self._column(column)
+        values = values if isinstance(values, (list, tuple, set, np.ndarray, pd.Index)) else [values]
+        stored = [value_bitmaps[value] for value in values if value in value_bitmaps]
+        packed = [bitmap for bitmap in stored if _is_packed(bitmap)]
+        rows = [bitmap for bitmap in stored if not _is_packed(bitmap)]
+        if not packed:
+            # The values of a column never share a row, so the union needs no deduplication
+            return np.sort(np.concatenate(rows)) if len(rows) > 1 else (rows[0] if rows else np.empty(0, np.uint32))
+        result = np.bitwise_or.reduce(packed) if len(packed) > 1 else packed[0].copy()
+        for positions in rows:
+            np.bitwise_or.at(result, positions >> 3, (np.uint8(128) >> (positions & 7)).astype(np.uint8))
+        return result
+
+    def rows(self, column: str, values) -> np.ndarray:
+        """Sorted positions of the rows whose column holds the value, or any of a list of values (OR)."""
+        match = self._match(column, values)
+        if _is_packed(match):
+            return np.flatnonzero(np.unpackbits(match, count=self.n_rows))
+        return match.astype(np.int64)
+
+    def query(self, predicates: dict) -> np.ndarray:
+        """
+        Positions of the rows matching every predicate (AND across columns, OR within a column).
+
+        Args:
+            predicates (dict): Column -> value or list of values, e.g. {"Region": "East", "Month": [1, 2, 3]}.
+
+        Returns:
+            np.ndarray: Sorted positions of the matching rows.
+        """
+        if not predicates:
+            return np.arange(self.n_rows)
+        matches = [self._match(column, values) for column, values in predicates.items()]
+        positions = sorted((match for match in matches if not _is_packed(match)), key=len)
+        packed = [match for match in matches if _is_packed(match)]
+
+        if not positions:
+            result = np.bitwise_and.reduce(packed) if len(packed) > 1 else packed[0]
+            return np.flatnonzero(np.unpackbits(result, count=self.n_rows))
+
+        # Start from the shortest row list and narrow it down
+        result = positions[0]
+        for other in positions[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        for bitmap in packed:
+            if not len(result):
+                break
+            result = result[_test_bits(bitmap, result)]
+        return result.astype(np.int64)
+
+    def count(self, predicates: dict) -> int:
+        """Number of rows matching the predicates (see query)."""
+        return len(self.query(predicates))
+
+    def filter(self, df: pd.DataFrame, predicates: dict) -> pd.DataFrame:
+        """Return the rows of the indexed DataFrame matching the predicates (see query)."""
+        if len(df) != self.n_rows:
+            raise ValueError(f"The index covers {self.n_rows} rows but the data has {len(df)}; refresh it first.")
+        return df.iloc[self.query(predicates)]
+
+    def nbytes(self) -> int:
+        """Memory taken by the stored bitmaps."""
+        return sum(bitmap.nbytes for value_bitmaps in self.bitmaps.values() for bitmap in value_bitmaps.values())
+
+    def save(self, path: pathlib.Path) -> None:
+        """Write the index to a compressed .npz file, atomically."""
+        path = pathlib.Path(path)
+        arrays, values = {}, {}
+        for column_number, (column, value_bitmaps) in enumerate(self.bitmaps.items()):
+            values[column] = list(value_bitmaps)
+            for value_number, bitmap in enumerate(value_bitmaps.values()):
+                arrays[f"bitmap_{column_number}_{value_number}"] = bitmap
+        meta = {"n_rows": self.n_rows, "source_hash": self.source_hash, "values": values}
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez_compressed(tmp_path, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "BitmapIndex":
+        """Read an index written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            bitmaps = {
+                column: {
+                    value: data[f"bitmap_{column_number}_{value_number}"]
+                    for value_number, value in enumerate(values)
+                }
+                for column_number, (column, values) in enumerate(meta["values"].items())
+            }
+        return cls(meta["n_rows"], bitmaps, meta["source_hash"])
+
+
+def _prefix_hash(df: pd.DataFrame, columns: list, n_rows: int) -> str:
+    """Hash the indexed columns of the first n_rows rows, whatever the DataFrame's index labels."""
+    return hash_dataframe(df[columns].iloc[:n_rows].reset_index(drop=True))
+
+
+def refresh_index(path: pathlib.Path, df: pd.DataFrame, columns: list = None) -> BitmapIndex:
+    """
+    Bring the index saved at path up to date with the data, and save it.
+
+    Rows appended since the index was saved are indexed incrementally, as long
+    as the rows it already covers are unchanged; otherwise it is rebuilt.
+
+    Args:
+        path (pathlib.Path): The index file.
+        df (pd.DataFrame): The current data.
+        columns (list, optional): Columns to index when building (default: the BITMAP_COLUMNS present).
+
+    Returns:
+        BitmapIndex: The up-to-date index.
+    """
+    path = pathlib.Path(path)
+    index = BitmapIndex.load(path) if path.exists() else None
+    if (
+        index is not None
+        and (columns is None or columns == index.columns)
+        and all(column in df.columns for column in index.columns)
+        and index.n_rows <= len(df)
+        and index.source_hash == _prefix_hash(df, index.columns, index.n_rows)
+    ):
+        if index.n_rows == len(df):
+            logger.info(f"Bitmap index {path} is up to date ({index.n_rows} rows).")
+            return index
+        logger.info(f"Indexing {len(df) - index.n_rows} appended rows in {path}.")
+        index.append(df.iloc[index.n_rows:])
+    else:
+        logger.info(f"Building bitmap index {path} over {len(df)} rows.")
+        index = BitmapIndex.build(df, columns)
+
+    index.source_hash = _prefix_hash(df, index.columns, index.n_rows)
+    index.save(path)
+    return index
+
+
+def load_sales_facts() -> pd.DataFrame:
+    """Load the sales facts with Region and the time dimensions, as the cube is built from them."""
+    sales_df = ingest_sales_data_from_dw()
+    customers_df = ingest_customers_data(CUSTOMERS_FILE)
+    return prepare_sales_for_cube(sales_df, customers_df)
+
+
+def parse_predicates(arguments: list, index: BitmapIndex) -> dict:
+    """Parse COLUMN=VALUE[,VALUE...] arguments, matching each value to the indexed value it spells."""
+    predicates = {}
+    for argument in arguments:
+        column, _, values = argument.partition("=")
+        if not values:
+            raise ValueError(f"Expected COLUMN=VALUE[,VALUE...], got '{argument}'.")
+        spelled = {str(value): value for value in index.values(column)}
+        predicates[column] = [spelled.get(value, value) for value in values.split(",")]
+    return predicates
+
+
+def main():
+    """Main function for building the bitmap indexes and running a filter."""
+    parser = argparse.ArgumentParser(description="Build or refresh the bitmap indexes of the sales facts and cube.")
+    parser.add_argument("--query", nargs="*", default=None, metavar="COLUMN=VALUES",
+                        help="Filter to run on both indexes, e.g. Region=East Month=1,2,3 ProductID=105.")
+    args = parser.parse_args()
+
+    sales_df = load_sales_facts()
+    sales_index = refresh_index(SALES_INDEX_FILE, sales_df)
+    cube_df = pd.read_csv(CUBED_FILE)
+    cube_index = refresh_index(CUBE_INDEX_FILE, cube_df)
+
+    if args.query:
+        predicates = parse_predicates(args.query, sales_index)
+        sales = sales_index.filter(sales_df, predicates)
+        logger.info(f"Filter {predicates}: {len(sales)} sales totalling {sales['SaleAmount'].sum():.2f}")
+        if all(column in cube_index.columns for column in predicates):
+            cells = cube_index.filter(cube_df, predicates)
+            logger.info(f"Filter {predicates}: {len(cells)} cube cells totalling {cells['SaleAmount_sum'].sum():.2f}")
+
+
+if __name__ == "__main__":
+    main()
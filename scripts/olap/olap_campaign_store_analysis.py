@@ -0,0 +1,138 @@
+"""
+OLAP Campaign and Store Analysis
+File: scripts/olap/olap_campaign_store_analysis.py
+
+Gross versus net sales by marketing campaign, and by store and payment type.
+
+The cube carries CampaignID, PaymentType and StoreID as dimensions and the
+DiscountAmount and NetSaleAmount measures derived from DiscountPercent
+(SaleAmount is the gross amount), so these reports are rollups of the cube
+with olap_cubing.rollup_cube() rather than scans of the warehouse.
+
+Usage:
+    python scripts/olap/olap_campaign_store_analysis.py
+    python scripts/olap/olap_campaign_store_analysis.py --by Region CampaignID
+"""
+
+import argparse
+import pathlib
+import sys
+
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from scripts.olap.olap_cubing import OLAP_OUTPUT_DIR, rollup_cube  # noqa: E402
+from scripts.olap.olap_rendering import render_chart  # noqa: E402
+
+# Constants
+CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.csv")
+RESULTS_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("results")
+DISCOUNT_MEASURES: dict = {
+    "SaleAmount_sum": "GrossSales",
+    "DiscountAmount_sum": "Discounts",
+    "NetSaleAmount_sum": "NetSales",
+    "TransactionID_count": "TransactionCount",
+}
+
+
+def discount_report(cube: pd.DataFrame, dimensions: list) -> pd.DataFrame:
+    """
+    Gross sales, discounts, net sales and transactions for each combination of dimensions.
+
+    Args:
+        cube (pd.DataFrame): The cube, built with the discount measures.
+        dimensions (list): Dimensions to report by, e.g. ["CampaignID"] or ["StoreID", "PaymentType"].
+
+    Returns:
+        pd.DataFrame: The dimensions, GrossSales, Discounts, NetSales, TransactionCount,
+            DiscountRatePct (discounts as a percentage of gross sales) and AverageNetSale.
+    """
+    try:
+        missing = [col for col in list(dimensions) + list(DISCOUNT_MEASURES) if col not in cube.columns]
+        if missing:
+            raise ValueError(f"The cube has no {missing} columns; rebuild it with olap_cubing.py.")
+
+        report = rollup_cube(cube, list(dimensions))[list(dimensions) + list(DISCOUNT_MEASURES)]
+        report = report.rename(columns=DISCOUNT_MEASURES)
+        report["DiscountRatePct"] = report["Discounts"] / report["GrossSales"] * 100
+        report["AverageNetSale"] = report["NetSales"] / report["TransactionCount"]
+        logger.info(f"Discount report by {dimensions} computed with {len(report)} rows.")
+        return report
+    except Exception as e:
+        logger.error(f"Error computing the discount report: {e}")
+        raise
+
+
+def save_results_to_csv(results_df: pd.DataFrame, filename: str) -> None:
+    """Save the results to a CSV file."""
+    try:
+        RESULTS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = RESULTS_OUTPUT_DIR.joinpath(filename)
+        results_df.to_csv(output_path, index=False)
+        logger.info(f"Results saved to {output_path}.")
+    except Exception as e:
+        logger.error(f"Error saving results to CSV file: {e}")
+        raise
+
+
+def plot_gross_and_net_by_campaign(fig, ax, report: pd.DataFrame) -> None:
+    """Draw gross and net sales side by side for each campaign."""
+    labels = report["CampaignID"].astype(str)
+    positions = range(len(report))
+    width = 0.4
+    ax.bar([p - width / 2 for p in positions], report["GrossSales"], width, label="Gross", color="skyblue")
+    ax.bar([p + width / 2 for p in positions], report["NetSales"], width, label="Net", color="steelblue")
+    ax.set_xticks(list(positions), labels)
+    ax.set_title("Gross and Net Sales by Campaign", fontsize=16)
+    ax.set_xlabel("Campaign ID", fontsize=12)
+    ax.set_ylabel("Sales (USD)", fontsize=12)
+    ax.legend()
+
+
+def visualize_gross_and_net_by_campaign(report: pd.DataFrame) -> None:
+    """Save a bar chart of gross and net sales by campaign."""
+    try:
+        output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_campaign.png")
+        if render_chart(plot_gross_and_net_by_campaign, report, output_path, figsize=(10, 6)):
+            logger.info(f"Bar chart saved to {output_path}.")
+        else:
+            logger.info(f"Bar chart at {output_path} is up to date.")
+    except Exception as e:
+        logger.error(f"Error visualizing sales by campaign: {e}")
+        raise
+
+
+def main():
+    """Main function for the campaign and store discount reports."""
+    parser = argparse.ArgumentParser(description="Report gross versus net sales by campaign and by store.")
+    parser.add_argument("--by", nargs="*", default=[], help="Report by these dimensions instead, e.g. Region.")
+    args = parser.parse_args()
+
+    logger.info("Starting CAMPAIGN_STORE analysis...")
+    cube_df = pd.read_csv(CUBED_FILE)
+    logger.info(f"OLAP cube data successfully loaded from {CUBED_FILE}.")
+
+    if args.by:
+        report = discount_report(cube_df, args.by)
+        print(report)
+        save_results_to_csv(report, "sales_by_" + "_".join(dim.lower() for dim in args.by) + ".csv")
+    else:
+        by_campaign = discount_report(cube_df, ["CampaignID"])
+        print(by_campaign)
+        save_results_to_csv(by_campaign, "sales_by_campaign.csv")
+        visualize_gross_and_net_by_campaign(by_campaign)
+
+        by_store = discount_report(cube_df, ["StoreID", "PaymentType"])
+        print(by_store)
+        save_results_to_csv(by_store, "sales_by_store_and_payment_type.csv")
+
+    logger.info("Campaign and store analysis completed successfully.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
+import argparse
+import itertools
+import math
+import os
+import numpy as np
 import pandas as pd
 import sqlite3
 import pathlib
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
 
 # For local imports, temporarily add project root to Python sys.path
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
@@ -9,17 +16,106 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from utils.logger import logger  # noqa: E402
+from utils.instrumentation import stage, summarize_stages, timed  # noqa: E402
+from utils.profiling import enable_profiling, profile_dir  # noqa: E402
+from utils.memory_budget import (  # noqa: E402
+    SAMPLE_ROWS,
+    SpillDirectory,
+    chunk_rows_for_budget,
+    frame_bytes_per_row,
+    memory_budget_bytes,
+)
+from scripts.olap.olap_numpy_engine import create_olap_cube_numpy  # noqa: E402
+from scripts.olap.olap_sketches import (  # noqa: E402
+    DEFAULT_PRECISION,
+    SKETCH_SUFFIX,
+    add_distinct_sketches,
+    merge_sketch_groups,
+    sketches_from_value_lists,
+)
 
 # Constants
 DW_DIR: pathlib.Path = pathlib.Path("data").joinpath("dw")
 DB_PATH: pathlib.Path = DW_DIR.joinpath("smart_sales.db")
 CUSTOMERS_FILE: pathlib.Path = pathlib.Path("data").joinpath("prepared").joinpath("customers_data_prepared.csv")
+PRODUCTS_FILE: pathlib.Path = pathlib.Path("data").joinpath("prepared").joinpath("products_data_prepared.csv")
 OLAP_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("olap_cubing_outputs")
 
+# Dimension attributes stored in the cube, mapped to the dimension key they describe
+DIMENSION_ATTRIBUTES: dict = {
+    "ProductName": "ProductID",
+    "Category": "ProductID",
+    "StoreSection": "ProductID",
+    "PreferredContactMethod": "CustomerID",
+}
+
+# Time hierarchy, coarsest level first; Day is the sale date as YYYY-MM-DD.
+# ISO weeks form a parallel hierarchy (ISOYear -> ISOWeek -> Day), since weeks straddle months and years.
+TIME_HIERARCHY: list = ["Year", "Quarter", "Month", "Day"]
+ISO_WEEK_HIERARCHY: list = ["ISOYear", "ISOWeek", "Day"]
+
+# Default cube layout; TIME_GRAINS selects how far down the time hierarchy the cube is stored
+CUBE_DIMENSIONS: list = [
+    "DayOfWeek", "Year", "Quarter", "Month", "Region", "ProductID", "CustomerID", "CampaignID", "PaymentType", "StoreID"
+]
+TIME_GRAINS: dict = {"month": [], "day": ["Day"]}
+# SaleAmount is the gross amount; DiscountAmount and NetSaleAmount are derived from DiscountPercent
+CUBE_METRICS: dict = {
+    "SaleAmount": ["sum", "mean"],
+    "DiscountAmount": "sum",
+    "NetSaleAmount": "sum",
+    "TransactionID": "count"
+}
+# Columns whose distinct values are kept as HyperLogLog sketches ({column}_hll) in each cell
+CUBE_DISTINCT_SKETCHES: list = ["CustomerID"]
+
+# SQL expressions for building the cube inside SQLite (s = sales, c = customer, p = product)
+SQL_DAY_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+# Discounts are numbers once data_prep has parsed them, text like '5%' in older warehouses; missing means none
+SQL_DISCOUNT_PERCENT: str = "COALESCE(CAST(REPLACE(s.DiscountPercent, '%', '') AS REAL), 0)"
+SQL_COLUMN_EXPRESSIONS: dict = {
+    "DayOfWeek": "CASE CAST(strftime('%w', s.SaleDate) AS INTEGER) "
+    + " ".join(f"WHEN {number} THEN '{name}'" for number, name in enumerate(SQL_DAY_NAMES))
+    + " END",
+    "Month": "CAST(strftime('%m', s.SaleDate) AS INTEGER)",
+    "Year": "CAST(strftime('%Y', s.SaleDate) AS INTEGER)",
+    "Quarter": "(CAST(strftime('%m', s.SaleDate) AS INTEGER) + 2) / 3",
+    "Day": "date(s.SaleDate)",
+    "Region": "c.Region",
+    "ProductID": "s.ProductID",
+    "CustomerID": "s.CustomerID",
+    "ProductName": "p.ProductName",
+    "Category": "p.Category",
+    "StoreSection": "p.StoreSection",
+    "PreferredContactMethod": "c.PreferredContactMethod",
+    "CampaignID": "s.CampaignID",
+    "PaymentType": "s.PaymentType",
+    "StoreID": "s.StoreID",
+    "SaleAmount": "s.SaleAmount",
+    "DiscountAmount": f"s.SaleAmount * {SQL_DISCOUNT_PERCENT} / 100.0",
+    "NetSaleAmount": f"s.SaleAmount * (1 - {SQL_DISCOUNT_PERCENT} / 100.0)",
+    "TransactionID": "s.TransactionID",
+}
+SQL_AGGREGATES: dict = {"sum": "SUM", "mean": "AVG", "count": "COUNT", "min": "MIN", "max": "MAX"}
+# Joins onto sales s, keyed by the table alias the SQL expressions use
+SQL_JOINS: dict = {
+    "c.": "LEFT JOIN customer c ON c.CustomerID = s.CustomerID",
+    "p.": "LEFT JOIN product p ON p.ProductID = s.ProductID",
+}
+
+# Partial aggregates needed to merge each metric across partitions, and how to merge them
+PARTIAL_AGGREGATES: dict = {"sum": ["sum"], "count": ["count"], "min": ["min"], "max": ["max"], "mean": ["sum", "count"]}
+PARTIAL_MERGE: dict = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+# Rough ratio of the peak memory of an in-memory cube build to the size of the
+# prepared sales (the sales, their merged copy and the cube with its Transaction ID lists)
+CUBE_WORKING_SET_FACTOR: float = 4.0
+
 # Create output directory if it does not exist
 OLAP_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
+@timed("read sales from dw")
 def ingest_sales_data_from_dw() -> pd.DataFrame:
     """Ingest sales data from SQLite data warehouse."""
     try:
@@ -33,6 +129,7 @@ def ingest_sales_data_from_dw() -> pd.DataFrame:
         raise
 
 
+@timed("read {file_path}")
 def ingest_customers_data(file_path: pathlib.Path) -> pd.DataFrame:
     """Ingest customer data from the prepared CSV file."""
     try:
@@ -44,8 +141,66 @@ def ingest_customers_data(file_path: pathlib.Path) -> pd.DataFrame:
         raise
 
 
+@timed("read {file_path}")
+def ingest_products_data(file_path: pathlib.Path) -> pd.DataFrame:
+    """Ingest product data from the prepared CSV file."""
+    try:
+        products_df = pd.read_csv(file_path)
+        logger.info(f"Product data successfully loaded from {file_path}.")
+        return products_df
+    except Exception as e:
+        logger.error(f"Error loading product data: {e}")
+        raise
+
+
+def add_dimension_attributes(
+    df: pd.DataFrame,
+    attributes: list,
+    customers_df: pd.DataFrame = None,
+    products_df: pd.DataFrame = None,
+) -> pd.DataFrame:
+    """
+    Add dimension attributes to a fact table or cube as dictionary-encoded columns.
+
+    Attributes already present in the DataFrame are not joined again, so analyses
+    running on a cube built with attributes never need the dimension tables.
+
+    Args:
+        df (pd.DataFrame): Sales data or OLAP cube with ProductID/CustomerID columns.
+        attributes (list): Attribute names from DIMENSION_ATTRIBUTES.
+        customers_df (pd.DataFrame, optional): Customer dimension table.
+        products_df (pd.DataFrame, optional): Product dimension table.
+
+    Returns:
+        pd.DataFrame: The DataFrame with the attributes as categorical columns.
+
+    Raises:
+        ValueError: If an attribute is unknown, or missing with no table to join it from.
+    """
+    unknown = [attr for attr in attributes if attr not in DIMENSION_ATTRIBUTES]
+    if unknown:
+        raise ValueError(f"Unknown dimension attributes: {unknown}")
+
+    sources = {"CustomerID": customers_df, "ProductID": products_df}
+    for key, source in sources.items():
+        missing = [attr for attr in attributes if DIMENSION_ATTRIBUTES[attr] == key and attr not in df.columns]
+        if not missing:
+            continue
+        if source is None:
+            raise ValueError(f"Attributes {missing} are not in the data and no {key} dimension table was provided.")
+        lookup = source[[key] + missing].drop_duplicates(subset=key)
+        df = df.merge(lookup, on=key, how="left")
+
+    encoded = {
+        attr: df[attr].astype("category")
+        for attr in attributes
+        if not isinstance(df[attr].dtype, pd.CategoricalDtype)
+    }
+    return df.assign(**encoded) if encoded else df
+
+
 def create_olap_cube(
-    sales_df: pd.DataFrame, dimensions: list, metrics: dict
+    sales_df: pd.DataFrame, dimensions: list, metrics: dict, attributes: list = None
 ) -> pd.DataFrame:
     """
     Create an OLAP cube by aggregating data across multiple dimensions.
@@ -54,25 +209,32 @@ def create_olap_cube(
         sales_df (pd.DataFrame): The sales data.
         dimensions (list): List of column names to group by.
         metrics (dict): Dictionary of aggregation functions for metrics.
+        attributes (list, optional): Dimension attribute columns to carry into the
+            cube. They are functionally dependent on the dimensions, so they do
+            not change the cells.
 
     Returns:
         pd.DataFrame: The multidimensional OLAP cube.
     """
     try:
+        attributes = attributes or []
+
         # Group by the specified dimensions and aggregate metrics
         grouped = sales_df.groupby(dimensions)
 
         # Perform the aggregations
         cube = grouped.agg(metrics).reset_index()
 
+        # Generate explicit column names
+        cube.columns = generate_column_names(dimensions, metrics)
+
+        # Store the dimension attributes right after the dimensions
+        for position, attr in enumerate(attributes, start=len(dimensions)):
+            cube.insert(position, attr, grouped[attr].first().reset_index(drop=True))
+
         # Add a list of Transaction IDs for traceability
         cube["TransactionIDs"] = grouped["TransactionID"].apply(list).reset_index(drop=True)
 
-        # Generate explicit column names
-        explicit_columns = generate_column_names(dimensions, metrics)
-        explicit_columns.append("TransactionIDs")  # Include the traceability column
-        cube.columns = explicit_columns
-
         logger.info(f"OLAP cube created with dimensions: {dimensions}")
         return cube
     except Exception as e:
@@ -80,6 +242,517 @@ def create_olap_cube(
         raise
 
 
+def prepare_sales_for_cube(
+    sales_df: pd.DataFrame,
+    customers_df: pd.DataFrame,
+    products_df: pd.DataFrame = None,
+    attributes: list = None,
+) -> pd.DataFrame:
+    """
+    Join Region and dimension attributes onto the sales data and derive the time dimensions.
+
+    Args:
+        sales_df (pd.DataFrame): Sales fact rows from the data warehouse.
+        customers_df (pd.DataFrame): Customer dimension table.
+        products_df (pd.DataFrame, optional): Product dimension table.
+        attributes (list, optional): Dimension attributes to denormalize.
+
+    Returns:
+        pd.DataFrame: Sales data ready to be cubed.
+    """
+    # Merge sales data with customer data to include Region
+    sales_df = sales_df.merge(customers_df[["CustomerID", "Region"]], on="CustomerID", how="left")
+
+    # Denormalize product and customer attributes into the cube
+    if attributes:
+        sales_df = add_dimension_attributes(sales_df, attributes, customers_df, products_df)
+
+    # Derive the discount measures
+    if "DiscountPercent" in sales_df.columns:
+        sales_df = add_discount_measures(sales_df)
+
+    # Add additional columns for time-based dimensions
+    sales_df["SaleDate"] = pd.to_datetime(sales_df["SaleDate"])
+    sales_df["DayOfWeek"] = sales_df["SaleDate"].dt.day_name()
+    return add_time_dimensions(sales_df, "SaleDate")
+
+
+def add_discount_measures(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derive DiscountAmount and NetSaleAmount from the gross SaleAmount and DiscountPercent.
+
+    DiscountPercent may still be text like "5%" in a warehouse loaded before
+    data_prep parsed it; a missing or unparseable discount counts as none.
+
+    Args:
+        df (pd.DataFrame): Sales rows with SaleAmount and DiscountPercent.
+
+    Returns:
+        pd.DataFrame: The sales with DiscountPercent as a number and the two measures added.
+    """
+    percent = df["DiscountPercent"]
+    if not pd.api.types.is_numeric_dtype(percent):
+        percent = pd.to_numeric(percent.astype("string").str.strip().str.rstrip("%"), errors="coerce")
+    percent = percent.astype("float64").fillna(0.0)
+    discount = df["SaleAmount"] * percent / 100
+    return df.assign(DiscountPercent=percent, DiscountAmount=discount, NetSaleAmount=df["SaleAmount"] - discount)
+
+
+def add_time_dimensions(df: pd.DataFrame, date_column: str) -> pd.DataFrame:
+    """
+    Derive every level of the time hierarchies from a date column.
+
+    Args:
+        df (pd.DataFrame): Data with a datetime (or date string) column.
+        date_column (str): Name of the date column.
+
+    Returns:
+        pd.DataFrame: The data with Year, Quarter, Month, Day, ISOYear and ISOWeek columns.
+    """
+    dates = pd.to_datetime(df[date_column])
+    iso = dates.dt.isocalendar()
+    return df.assign(
+        Year=dates.dt.year,
+        Quarter=dates.dt.quarter,
+        Month=dates.dt.month,
+        Day=dates.dt.strftime("%Y-%m-%d"),
+        ISOYear=iso["year"].astype("int64"),
+        ISOWeek=iso["week"].astype("int64"),
+    )
+
+
+def cube_dimensions(time_grain: str = "month") -> list:
+    """Return the cube dimensions with the time hierarchy stored down to time_grain ("month" or "day")."""
+    if time_grain not in TIME_GRAINS:
+        raise ValueError(f"Unknown time grain '{time_grain}'. Choose from {list(TIME_GRAINS)}.")
+    month_position = CUBE_DIMENSIONS.index("Month") + 1
+    return CUBE_DIMENSIONS[:month_position] + TIME_GRAINS[time_grain] + CUBE_DIMENSIONS[month_position:]
+
+
+def sql_joins(columns: list) -> str:
+    """
+    Return the joins onto sales s that the SQL expressions of columns need.
+
+    Shared by every query built from SQL_COLUMN_EXPRESSIONS (the cube and the
+    sampled cube), so they join the dimension tables the same way.
+
+    Raises:
+        ValueError: If a column has no SQL expression.
+    """
+    unknown = [col for col in columns if col not in SQL_COLUMN_EXPRESSIONS]
+    if unknown:
+        raise ValueError(f"Columns {unknown} cannot be computed in SQL.")
+    expressions = " ".join(SQL_COLUMN_EXPRESSIONS[col] for col in columns)
+    return "".join(f" {join}" for alias, join in SQL_JOINS.items() if alias in expressions)
+
+
+def build_cube_query(
+    dimensions: list, metrics: dict, attributes: list = None, traceability: bool = True, distinct_columns: list = None
+) -> str:
+    """
+    Generate a single GROUP BY query that builds the cube inside SQLite.
+
+    The query joins sales with customer (and product, when attributes need it),
+    derives the time dimensions with strftime() and aggregates in the database,
+    so only the aggregated rows are returned to Python. Cells with a missing
+    dimension value are excluded, matching the pandas groupby.
+
+    Args:
+        dimensions (list): Dimension columns to group by.
+        metrics (dict): Dictionary of aggregation functions for metrics.
+        attributes (list, optional): Dimension attributes to carry into the cube.
+        traceability (bool): Whether to include the TransactionIDs column.
+        distinct_columns (list, optional): Columns whose distinct values per cell are
+            returned comma-separated as {column}_values, for building sketches.
+
+    Returns:
+        str: The SQL query.
+    """
+    attributes = attributes or []
+    distinct_columns = distinct_columns or []
+    joins = sql_joins(dimensions + attributes + list(metrics) + distinct_columns)
+
+    select = [f"{SQL_COLUMN_EXPRESSIONS[dim]} AS {dim}" for dim in dimensions]
+    # Attributes are functionally dependent on the dimensions, so any value per cell will do
+    select += [f"MIN({SQL_COLUMN_EXPRESSIONS[attr]}) AS {attr}" for attr in attributes]
+    for column, agg_funcs in metrics.items():
+        for func in agg_funcs if isinstance(agg_funcs, list) else [agg_funcs]:
+            if func not in SQL_AGGREGATES:
+                raise ValueError(f"Aggregation '{func}' is not supported in SQL.")
+            select.append(f"{SQL_AGGREGATES[func]}({SQL_COLUMN_EXPRESSIONS[column]}) AS {column}_{func}")
+    if traceability:
+        select.append("GROUP_CONCAT(s.TransactionID) AS TransactionIDs")
+    select += [f"GROUP_CONCAT(DISTINCT {SQL_COLUMN_EXPRESSIONS[col]}) AS {col}_values" for col in distinct_columns]
+
+    where = " AND ".join(f"{SQL_COLUMN_EXPRESSIONS[dim]} IS NOT NULL" for dim in dimensions)
+    # Group by position: aliases such as ProductID would be ambiguous across the joined tables
+    group_by = ", ".join(str(position) for position in range(1, len(dimensions) + 1))
+    return (
+        f"SELECT {', '.join(select)} FROM sales s{joins}"
+        + (f" WHERE {where}" if where else "")
+        + (f" GROUP BY {group_by} ORDER BY {group_by}" if dimensions else "")
+    )
+
+
+def create_olap_cube_in_dw(
+    db_path: pathlib.Path,
+    dimensions: list,
+    metrics: dict,
+    attributes: list = None,
+    chunk_size: int = 50_000,
+    distinct_columns: list = None,
+    precision: int = DEFAULT_PRECISION,
+) -> pd.DataFrame:
+    """
+    Create the OLAP cube with a push-down GROUP BY query inside SQLite.
+
+    Only aggregated rows are streamed back, chunk by chunk, so the full fact
+    table is never resident in Python.
+
+    Args:
+        db_path (pathlib.Path): Path to the SQLite data warehouse.
+        dimensions (list): List of column names to group by.
+        metrics (dict): Dictionary of aggregation functions for metrics.
+        attributes (list, optional): Dimension attributes to carry into the cube.
+        chunk_size (int): Number of aggregated rows fetched per round trip.
+        distinct_columns (list, optional): Columns to keep distinct-count sketches of.
+        precision (int): Sketch precision (log2 of the registers per sketch).
+
+    Returns:
+        pd.DataFrame: The multidimensional OLAP cube.
+    """
+    distinct_columns = distinct_columns or []
+    query = build_cube_query(dimensions, metrics, attributes, distinct_columns=distinct_columns)
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            cursor = conn.execute(query)
+            columns = [description[0] for description in cursor.description]
+            chunks = []
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                chunks.append(pd.DataFrame.from_records(rows, columns=columns))
+        finally:
+            conn.close()
+
+        cube = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+        cube["TransactionIDs"] = cube["TransactionIDs"].map(
+            lambda ids: sorted(int(transaction_id) for transaction_id in ids.split(","))
+        )
+        for attr in attributes or []:
+            cube[attr] = cube[attr].astype("category")
+        for column in distinct_columns:
+            cube[column + SKETCH_SUFFIX] = sketches_from_value_lists(cube.pop(f"{column}_values"), precision)
+
+        logger.info(f"OLAP cube created in the data warehouse with dimensions: {dimensions}")
+        return cube
+    except Exception as e:
+        logger.error(f"Error creating OLAP cube in the data warehouse: {e}")
+        raise
+
+
+def _metric_functions(metrics: dict) -> list:
+    """Flatten a metrics dictionary into (column, function) pairs."""
+    return [
+        (column, func)
+        for column, agg_funcs in metrics.items()
+        for func in (agg_funcs if isinstance(agg_funcs, list) else [agg_funcs])
+    ]
+
+
+def _aggregate_partition(
+    partition: pd.DataFrame, dimensions: list, metrics: dict, attributes: list
+) -> pd.DataFrame:
+    """Aggregate one partition of the sales data into a partial cube of mergeable aggregates."""
+    named_aggs = {}
+    for column, func in _metric_functions(metrics):
+        if func not in PARTIAL_AGGREGATES:
+            raise ValueError(f"Aggregation '{func}' cannot be merged across partitions.")
+        for partial in PARTIAL_AGGREGATES[func]:
+            named_aggs[f"{column}__{partial}"] = (column, partial)
+    for attr in attributes:
+        named_aggs[attr] = (attr, "first")
+
+    grouped = partition.groupby(dimensions)
+    partial_cube = grouped.agg(**named_aggs)
+    partial_cube["TransactionIDs"] = grouped["TransactionID"].apply(list)
+    return partial_cube.reset_index()
+
+
+def merge_partial_cubes(
+    partials: list, dimensions: list, metrics: dict, attributes: list = None, disjoint: bool = False
+) -> pd.DataFrame:
+    """
+    Merge partial cubes into the final cube.
+
+    Args:
+        partials (list): Partial cubes from _aggregate_partition(), in partition order.
+        dimensions (list): List of column names the partials were grouped by.
+        metrics (dict): Dictionary of aggregation functions for metrics.
+        attributes (list, optional): Dimension attribute columns carried by the partials.
+        disjoint (bool): True when no cell spans two partitions (hash partitioning on
+            a dimension), so the partials only need to be concatenated and sorted.
+
+    Distinct-count sketch columns ({column}_hll) of the partials are merged too.
+
+    Returns:
+        pd.DataFrame: The multidimensional OLAP cube.
+    """
+    attributes = attributes or []
+    combined = pd.concat(partials, ignore_index=True)
+    sketch_columns = [column for column in combined.columns if column.endswith(SKETCH_SUFFIX)]
+
+    if disjoint:
+        merged = combined.sort_values(dimensions, kind="stable").reset_index(drop=True)
+    else:
+        merge_aggs = {
+            column: PARTIAL_MERGE[column.rsplit("__", 1)[1]]
+            for column in combined.columns
+            if "__" in column
+        }
+        merge_aggs.update({attr: "first" for attr in attributes})
+        grouped = combined.groupby(dimensions)
+        merged = grouped.agg(merge_aggs)
+        # Partials are in partition order, so concatenating keeps the original row order
+        merged["TransactionIDs"] = grouped["TransactionIDs"].agg(lambda ids: list(itertools.chain.from_iterable(ids)))
+        merged = merged.reset_index()
+        for column in sketch_columns:
+            merged[column] = merge_sketch_groups(grouped.ngroup().to_numpy(), len(merged), combined[column])
+
+    cube = merged[dimensions + attributes].copy()
+    for column, func in _metric_functions(metrics):
+        if func == "mean":
+            cube[f"{column}_mean"] = merged[f"{column}__sum"] / merged[f"{column}__count"]
+        else:
+            cube[f"{column}_{func}"] = merged[f"{column}__{func}"]
+    cube["TransactionIDs"] = merged["TransactionIDs"]
+    for column in sketch_columns:
+        cube[column] = merged[column]
+    return cube
+
+
+def partition_sales(sales_df: pd.DataFrame, partitions: int, partition_by: str = None) -> list:
+    """
+    Split the sales data into partitions by row range or by a hash of one column.
+
+    Args:
+        sales_df (pd.DataFrame): The sales data.
+        partitions (int): Number of partitions.
+        partition_by (str, optional): Column to hash-partition on. Row ranges are used if omitted.
+
+    Returns:
+        list: List of DataFrames.
+    """
+    if partition_by is None:
+        bounds = np.linspace(0, len(sales_df), partitions + 1).astype(int)
+        return [sales_df.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    buckets = pd.util.hash_pandas_object(sales_df[partition_by], index=False).to_numpy() % partitions
+    return [sales_df[buckets == bucket] for bucket in range(partitions)]
+
+
+def create_olap_cube_parallel(
+    sales_df: pd.DataFrame,
+    dimensions: list,
+    metrics: dict,
+    attributes: list = None,
+    workers: int = None,
+    partition_by: str = None,
+) -> pd.DataFrame:
+    """
+    Create an OLAP cube by aggregating partitions of the sales data in worker processes.
+
+    Each worker builds a partial cube of sums, counts, minimums, maximums and
+    Transaction ID lists; the partials are then merged. The result matches
+    create_olap_cube().
+
+    Args:
+        sales_df (pd.DataFrame): The sales data.
+        dimensions (list): List of column names to group by.
+        metrics (dict): Dictionary of aggregation functions for metrics.
+        attributes (list, optional): Dimension attribute columns to carry into the cube.
+        workers (int, optional): Number of worker processes (default: CPU count).
+        partition_by (str, optional): Column to hash-partition on (default: row ranges).
+
+    Returns:
+        pd.DataFrame: The multidimensional OLAP cube.
+    """
+    try:
+        attributes = attributes or []
+        workers = workers or os.cpu_count() or 1
+        partitions = partition_sales(sales_df, workers, partition_by)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(
+                _aggregate_partition,
+                partitions,
+                itertools.repeat(dimensions),
+                itertools.repeat(metrics),
+                itertools.repeat(attributes),
+            ))
+
+        cube = merge_partial_cubes(
+            partials, dimensions, metrics, attributes, disjoint=partition_by in dimensions
+        )
+        logger.info(f"OLAP cube created with dimensions: {dimensions} using {workers} worker processes")
+        return cube
+    except Exception as e:
+        logger.error(f"Error creating OLAP cube in parallel: {e}")
+        raise
+
+
+def estimate_cube_working_set(
+    db_path: pathlib.Path,
+    customers_df: pd.DataFrame,
+    products_df: pd.DataFrame,
+    attributes: list = None,
+    sample_rows: int = SAMPLE_ROWS,
+) -> tuple:
+    """
+    Estimate the memory an in-memory cube build needs, from a sample of the sales.
+
+    Args:
+        db_path (pathlib.Path): Path to the SQLite data warehouse.
+        customers_df (pd.DataFrame): Customer dimension table.
+        products_df (pd.DataFrame): Product dimension table.
+        attributes (list, optional): Dimension attributes to denormalize.
+        sample_rows (int): Sales rows to sample.
+
+    Returns:
+        tuple: (estimated bytes, bytes per prepared sales row).
+    """
+    with closing(sqlite3.connect(db_path)) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM sales").fetchone()[0]
+        sample = pd.read_sql_query(f"SELECT * FROM sales LIMIT {int(sample_rows)}", conn)
+    bytes_per_row = frame_bytes_per_row(prepare_sales_for_cube(sample, customers_df, products_df, attributes))
+    return int(rows * bytes_per_row * CUBE_WORKING_SET_FACTOR), bytes_per_row
+
+
+def cube_spill_plan(budget: int, customers_df: pd.DataFrame, products_df: pd.DataFrame, attributes: list) -> tuple:
+    """
+    Decide whether an in-memory cube build fits the memory budget.
+
+    Args:
+        budget (int): Memory budget in bytes, or None for no budget.
+        customers_df (pd.DataFrame): Customer dimension table.
+        products_df (pd.DataFrame): Product dimension table.
+        attributes (list): Dimension attributes to denormalize.
+
+    Returns:
+        tuple: (chunk rows, spill partitions) for create_olap_cube_spilled(), or None if the build fits.
+    """
+    if budget is None:
+        return None
+    estimate, bytes_per_row = estimate_cube_working_set(DB_PATH, customers_df, products_df, attributes)
+    if estimate <= budget:
+        logger.info(f"Estimated cube working set {estimate / 2**20:.0f} MiB fits the {budget / 2**20:.0f} MiB budget.")
+        return None
+    chunk_rows = chunk_rows_for_budget(bytes_per_row, budget, CUBE_WORKING_SET_FACTOR)
+    partitions = math.ceil(estimate / budget)
+    logger.warning(
+        f"Estimated cube working set {estimate / 2**20:.0f} MiB exceeds the {budget / 2**20:.0f} MiB budget; "
+        f"building the cube in chunks of {chunk_rows} rows spilled to {partitions} partitions."
+    )
+    return chunk_rows, partitions
+
+
+def spill_buckets(partial: pd.DataFrame, dimensions: list, partitions: int) -> np.ndarray:
+    """
+    Assign the cells of a partial cube to spill partitions by hashing their dimension values.
+
+    Each chunk read from the warehouse gets its own inferred dtypes, so the same
+    key can be int64 in one chunk, float64 in a chunk with a NULL and object in a
+    chunk with a text value. Numbers are therefore hashed as float64 and other
+    values as strings, so equal keys land in the same partition whatever the
+    dtype of their chunk.
+
+    Args:
+        partial (pd.DataFrame): Partial cube of one chunk.
+        dimensions (list): Dimension columns to partition on.
+        partitions (int): Number of spill partitions.
+
+    Returns:
+        np.ndarray: Partition number of each row of partial.
+    """
+    keys = {}
+    for dim in dimensions:
+        values = partial[dim].astype(object)
+        numbers = pd.to_numeric(values, errors="coerce").astype("float64")
+        keys[dim] = numbers.astype(str).where(numbers.notna(), values.astype(str))
+    return pd.util.hash_pandas_object(pd.DataFrame(keys), index=False).to_numpy() % partitions
+
+
+def create_olap_cube_spilled(
+    db_path: pathlib.Path,
+    customers_df: pd.DataFrame,
+    products_df: pd.DataFrame,
+    dimensions: list,
+    metrics: dict,
+    attributes: list = None,
+    chunk_rows: int = 100_000,
+    partitions: int = 8,
+    distinct_columns: list = None,
+) -> pd.DataFrame:
+    """
+    Create an OLAP cube within a memory budget by aggregating the sales in chunks
+    and spilling the partial cubes to disk.
+
+    The sales are streamed from the data warehouse chunk_rows at a time. Each
+    chunk is prepared (Region, attributes, time dimensions) and aggregated into
+    a partial cube, which is hash-partitioned on the dimensions (see
+    spill_buckets()) and spilled to temporary files. Every partition then holds whole cells, so the partitions
+    are merged one at a time. Only one chunk of sales or one partition of
+    partial cubes is in memory at once, plus the finished cube. The result
+    matches create_olap_cube() followed by add_distinct_sketches().
+
+    Args:
+        db_path (pathlib.Path): Path to the SQLite data warehouse.
+        customers_df (pd.DataFrame): Customer dimension table.
+        products_df (pd.DataFrame): Product dimension table.
+        dimensions (list): List of column names to group by.
+        metrics (dict): Dictionary of aggregation functions for metrics.
+        attributes (list, optional): Dimension attribute columns to carry into the cube.
+        chunk_rows (int): Sales rows per chunk.
+        partitions (int): Number of spill partitions.
+        distinct_columns (list, optional): Columns to keep distinct-count sketches of.
+
+    Returns:
+        pd.DataFrame: The multidimensional OLAP cube.
+    """
+    try:
+        attributes = attributes or []
+        with SpillDirectory("cube") as spill, closing(sqlite3.connect(db_path)) as conn:
+            for chunk in pd.read_sql_query("SELECT * FROM sales", conn, chunksize=chunk_rows):
+                prepared = prepare_sales_for_cube(chunk, customers_df, products_df, attributes)
+                partial = _aggregate_partition(prepared, dimensions, metrics, attributes)
+                partial = add_distinct_sketches(partial, prepared, dimensions, distinct_columns)
+                buckets = spill_buckets(partial, dimensions, partitions)
+                for bucket in np.unique(buckets):
+                    spill.write(int(bucket), partial[buckets == bucket])
+                del prepared, partial
+
+            cubes = [
+                merge_partial_cubes(list(spill.read(partition)), dimensions, metrics, attributes)
+                for partition in spill.partitions()
+            ]
+
+        cube = pd.concat(cubes, ignore_index=True)
+        cubes.clear()
+        cube.sort_values(dimensions, kind="stable", inplace=True, ignore_index=True)
+        # Attribute categories differ between chunks, so concatenating them decoded the attributes
+        cube = cube.assign(**{attr: cube[attr].astype("category") for attr in attributes})
+        logger.info(
+            f"OLAP cube created with dimensions: {dimensions} in chunks of {chunk_rows} rows "
+            f"spilled to {partitions} partitions"
+        )
+        return cube
+    except Exception as e:
+        logger.error(f"Error creating OLAP cube with spilling: {e}")
+        raise
+
+
 def generate_column_names(dimensions: list, metrics: dict) -> list:
     """
     Generate explicit column names for OLAP cube, ensuring no trailing underscores.
@@ -108,6 +781,76 @@ def generate_column_names(dimensions: list, metrics: dict) -> list:
     return column_names
 
 
+def rollup_cube(
+    cube: pd.DataFrame, dimensions: list, count_column: str = "TransactionID_count", sketches: bool = False
+) -> pd.DataFrame:
+    """
+    Roll up a cube (or any finer cuboid) to a coarser set of dimensions.
+
+    Sum, count, min and max columns are re-aggregated directly. Mean columns are
+    recomputed from the matching sum column and the row count so they stay exact.
+    Variance columns of an approximate cube (e.g. SaleAmount_sum_var) are summed,
+    since its cells are estimated independently. Distinct-count sketches
+    (e.g. CustomerID_hll) are merged register by register when sketches is set,
+    and dropped otherwise: merging decodes every cell, which costs far more
+    than the rest of the rollup.
+    The TransactionIDs column is concatenated only when it holds Python lists.
+
+    Args:
+        cube (pd.DataFrame): The cube to roll up.
+        dimensions (list): Dimensions to keep. Must be a subset of the cube's dimensions.
+        count_column (str): Column holding the number of fact rows per cell.
+        sketches (bool): Merge the distinct-count sketches, for callers that estimate distinct counts.
+
+    Returns:
+        pd.DataFrame: The rolled-up cuboid.
+    """
+    rollup_funcs = {"sum": "sum", "count": "sum", "min": "min", "max": "max", "var": "sum"}
+    aggregations = {}
+    mean_columns = []
+    sketch_columns = []
+    for column in cube.columns:
+        if column in dimensions:
+            continue
+        suffix = column.rsplit("_", 1)[-1]
+        if suffix in rollup_funcs:
+            aggregations[column] = rollup_funcs[suffix]
+        elif suffix == "mean":
+            mean_columns.append(column)
+        elif column.endswith(SKETCH_SUFFIX):
+            if sketches:
+                sketch_columns.append(column)
+        elif DIMENSION_ATTRIBUTES.get(column) in dimensions:
+            aggregations[column] = "first"
+
+    if not dimensions:
+        rolled = cube[list(aggregations)].agg(aggregations).to_frame().T
+    else:
+        rolled = cube.groupby(dimensions, sort=True).agg(aggregations).reset_index()
+
+    for column in mean_columns:
+        sum_column = column[: -len("mean")] + "sum"
+        if sum_column in rolled.columns and count_column in rolled.columns:
+            rolled[column] = rolled[sum_column] / rolled[count_column]
+
+    if "TransactionIDs" in cube.columns and len(cube) and isinstance(cube["TransactionIDs"].iloc[0], list):
+        if dimensions:
+            ids = cube.groupby(dimensions, sort=True)["TransactionIDs"].sum()
+            rolled["TransactionIDs"] = ids.reset_index(drop=True)
+        else:
+            rolled["TransactionIDs"] = [cube["TransactionIDs"].sum()]
+
+    if sketch_columns:
+        codes = cube.groupby(dimensions, sort=True).ngroup().to_numpy() if dimensions else np.zeros(len(cube), np.int64)
+        for column in sketch_columns:
+            rolled[column] = merge_sketch_groups(codes, len(rolled), cube[column])
+
+    # Keep the column order of the source cube
+    ordered = [col for col in cube.columns if col in rolled.columns]
+    return rolled[ordered]
+
+
+@timed("save {filename}")
 def write_cube_to_csv(cube: pd.DataFrame, filename: str) -> None:
     """Write the OLAP cube to a CSV file."""
     try:
@@ -119,34 +862,122 @@ def write_cube_to_csv(cube: pd.DataFrame, filename: str) -> None:
         raise
 
 
+@summarize_stages("olap_cubing")
 def main():
     """Main function for OLAP cubing."""
-    logger.info("Starting OLAP Cubing process...")
+    parser = argparse.ArgumentParser(description="Build the multidimensional OLAP cube.")
+    parser.add_argument(
+        "--engine",
+        choices=["pandas", "numpy", "parallel", "sql"],
+        default="pandas",
+        help="pandas aggregates in memory; numpy uses integer-coded dimensions and "
+        "bincount; parallel aggregates partitions in worker processes; sql pushes "
+        "the GROUP BY down into SQLite.",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for the parallel engine.")
+    parser.add_argument(
+        "--time-grain",
+        choices=list(TIME_GRAINS),
+        default="month",
+        help="Finest stored time level; day keeps the sale date so weeks and days can be rolled up.",
+    )
+    parser.add_argument(
+        "--partition-by",
+        default=None,
+        help="Hash-partition the parallel engine on this column instead of by row range.",
+    )
+    parser.add_argument(
+        "--sketch-columns",
+        nargs="*",
+        default=CUBE_DISTINCT_SKETCHES,
+        help="Columns to keep HyperLogLog distinct-count sketches of in each cell (none to disable).",
+    )
+    parser.add_argument(
+        "--approximate",
+        action="store_true",
+        help="Estimate the cube from a stratified sample of the sales, with confidence intervals "
+        "(written to a separate file; see olap_sampling).",
+    )
+    parser.add_argument("--error-bound", type=float, default=0.05,
+                        help="Relative error allowed on each Region x Month sales total in approximate mode.")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level in approximate mode.")
+    parser.add_argument("--memory-budget", type=float, default=None,
+                        help="Memory budget in MiB (default: SMART_STORE_MEMORY_BUDGET_MB). When the sales "
+                        "would not fit, the cube is built in chunks with partial cubes spilled to disk.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile each stage with cProfile (see utils/profiling.py).")
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling(profile_dir())
 
-    # Step 1: Ingest sales data
-    sales_df = ingest_sales_data_from_dw()
-
-    # Step 2: Ingest customer data
-    customers_df = ingest_customers_data(CUSTOMERS_FILE)
-
-    # Step 3: Merge sales data with customer data to include Region
-    sales_df = sales_df.merge(customers_df[["CustomerID", "Region"]], on="CustomerID", how="left")
-
-    # Step 4: Add additional columns for time-based dimensions
-    sales_df["SaleDate"] = pd.to_datetime(sales_df["SaleDate"])
-    sales_df["DayOfWeek"] = sales_df["SaleDate"].dt.day_name()
-    sales_df["Month"] = sales_df["SaleDate"].dt.month  # Add Month column
-    sales_df["Year"] = sales_df["SaleDate"].dt.year
-
-    # Step 5: Define dimensions and metrics for the cube
-    dimensions = ["DayOfWeek", "Month", "Region", "ProductID", "CustomerID"]  # Include Region
-    metrics = {
-        "SaleAmount": ["sum", "mean"],
-        "TransactionID": "count"
-    }
+    logger.info("Starting OLAP Cubing process...")
 
-    # Step 6: Create the cube
-    olap_cube = create_olap_cube(sales_df, dimensions, metrics)
+    # Define dimensions, attributes and metrics for the cube
+    dimensions = cube_dimensions(args.time_grain)
+    metrics = CUBE_METRICS
+    attributes = list(DIMENSION_ATTRIBUTES)
+
+    if args.approximate:
+        # olap_sampling builds on this module, so it is imported only when needed
+        from scripts.olap import olap_sampling
+
+        with stage("approximate cube build") as timing:
+            olap_cube = olap_sampling.create_olap_cube_approximate(
+                DB_PATH, dimensions, metrics, attributes, args.error_bound, args.confidence
+            )
+            timing.rows_out = len(olap_cube)
+        write_cube_to_csv(olap_cube, olap_sampling.APPROX_CUBE_FILENAME)
+        logger.info("Approximate OLAP Cubing process completed successfully.")
+        return
+
+    spill_plan = None
+    if args.engine != "sql":
+        # Step 1: Ingest customer and product data (small; needed to size a chunked build)
+        customers_df = ingest_customers_data(CUSTOMERS_FILE)
+        products_df = ingest_products_data(PRODUCTS_FILE)
+        spill_plan = cube_spill_plan(memory_budget_bytes(args.memory_budget), customers_df, products_df, attributes)
+
+    if args.engine == "sql":
+        # Steps 1-6 in one query: join, derive time parts and aggregate inside SQLite
+        with stage("cube build (sql)") as timing:
+            olap_cube = create_olap_cube_in_dw(
+                DB_PATH, dimensions, metrics, attributes, distinct_columns=args.sketch_columns
+            )
+            timing.rows_out = len(olap_cube)
+    elif spill_plan is not None:
+        # Steps 2-6 chunk by chunk, with the partial cubes spilled to disk
+        chunk_rows, partitions = spill_plan
+        with stage("cube build (spill)") as timing:
+            olap_cube = create_olap_cube_spilled(
+                DB_PATH, customers_df, products_df, dimensions, metrics, attributes,
+                chunk_rows, partitions, args.sketch_columns,
+            )
+            timing.rows_out = len(olap_cube)
+    else:
+        # Step 2: Ingest sales data
+        sales_df = ingest_sales_data_from_dw()
+
+        # Steps 3-5: Merge Region and attributes, add time-based dimensions
+        with stage("prepare sales", rows_in=len(sales_df)) as timing:
+            sales_df = prepare_sales_for_cube(sales_df, customers_df, products_df, attributes)
+            timing.rows_out = len(sales_df)
+
+        # Step 6: Create the cube
+        with stage(f"cube build ({args.engine})", rows_in=len(sales_df)) as timing:
+            if args.engine == "parallel":
+                olap_cube = create_olap_cube_parallel(
+                    sales_df, dimensions, metrics, attributes, args.workers, args.partition_by
+                )
+            elif args.engine == "numpy":
+                olap_cube = create_olap_cube_numpy(sales_df, dimensions, metrics, attributes)
+            else:
+                olap_cube = create_olap_cube(sales_df, dimensions, metrics, attributes)
+            timing.rows_out = len(olap_cube)
+
+        # Distinct-count sketches per cell, so unique counts survive rollups
+        with stage("distinct sketches", rows_in=len(sales_df)) as timing:
+            olap_cube = add_distinct_sketches(olap_cube, sales_df, dimensions, args.sketch_columns)
+            timing.rows_out = len(olap_cube)
 
     # Step 7: Save the cube to a CSV file
     write_cube_to_csv(olap_cube, "multidimensional_olap_cube.csv")
@@ -156,4 +987,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
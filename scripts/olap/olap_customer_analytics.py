@@ -0,0 +1,341 @@
+"""
+Customer RFM and Lifetime Value
+File: scripts/olap/olap_customer_analytics.py
+
+Recency, frequency, monetary value, average basket, a run-rate lifetime value
+and quantile-based RFM segments for every customer, computed from the
+warehouse sales table.
+
+The per-customer work is split in two:
+
+1. Additive partials (first and last purchase date, transaction count, total
+   spend, highest TransactionID seen) are aggregated inside SQLite with one
+   GROUP BY pass, so only one row per customer reaches Python. They are kept
+   in a state file and updated incrementally: a later run reads only the
+   sales with a TransactionID above the stored watermark and merges their
+   partials into the state (min/max/sum), so the cost follows the new sales,
+   not the size of the history.
+2. Scores depend on every customer (quantiles shift as customers are added),
+   so they are recomputed from the state each run, fully vectorized with
+   numpy/pandas; no per-customer Python code runs.
+
+The sales table is treated as append-only. The state keeps a fingerprint of
+the rows at or below the watermark (row count and totals of SaleAmount,
+CustomerID, the sale dates and CustomerID * SaleAmount). If those rows change
+(e.g. etl_to_dw.py reloads the warehouse with different values, even with the
+same number of rows), the fingerprint no longer matches and the state is
+rebuilt from scratch.
+
+Usage:
+    python scripts/olap/olap_customer_analytics.py               # incremental update
+    python scripts/olap/olap_customer_analytics.py --full        # rebuild the state
+    python scripts/olap/olap_customer_analytics.py --as-of 2024-12-31
+"""
+
+import argparse
+import math
+import pathlib
+import pickle
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from scripts.olap.olap_cubing import DB_PATH  # noqa: E402
+
+# Constants
+RFM_STATE_FILE: pathlib.Path = pathlib.Path("data").joinpath("cache").joinpath("customer_rfm_state.pkl")
+RESULTS_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("results")
+RFM_QUANTILES: int = 5
+CLV_HORIZON_DAYS: int = 365
+# Floor on the observed tenure, so a brand-new customer's single purchase is not
+# extrapolated to one purchase per day
+CLV_MIN_TENURE_DAYS: int = 30
+
+# Segment name -> (recency score range, frequency score range); the first match wins
+RFM_SEGMENTS: dict = {
+    "Champions": ((4, 5), (4, 5)),
+    "Loyal": ((3, 5), (3, 5)),
+    "New": ((4, 5), (1, 1)),
+    "Promising": ((3, 5), (1, 2)),
+    "At Risk": ((1, 2), (3, 5)),
+    "Hibernating": ((1, 2), (1, 2)),
+}
+
+STATE_COLUMNS: list = ["CustomerID", "FirstPurchase", "LastPurchase", "Frequency", "Monetary"]
+
+CUSTOMER_PARTIALS_QUERY: str = """
+    SELECT CustomerID,
+           MIN(date(SaleDate)) AS FirstPurchase,
+           MAX(date(SaleDate)) AS LastPurchase,
+           COUNT(*) AS Frequency,
+           SUM(SaleAmount) AS Monetary
+    FROM sales
+    WHERE TransactionID > ? AND TransactionID <= ? AND CustomerID IS NOT NULL
+    GROUP BY CustomerID
+"""
+
+# Checksum of the sales rows with ? < TransactionID <= ?; every column but the
+# count is additive, so the fingerprint of a range is the sum of its parts
+HISTORY_FINGERPRINT_QUERY: str = """
+    SELECT COUNT(*),
+           TOTAL(SaleAmount),
+           TOTAL(CustomerID),
+           TOTAL(julianday(SaleDate)),
+           TOTAL(CustomerID * SaleAmount)
+    FROM sales
+    WHERE TransactionID > ? AND TransactionID <= ?
+"""
+
+
+def empty_state() -> dict:
+    """Return the state before any sales have been read."""
+    customers = pd.DataFrame({
+        "CustomerID": pd.Series(dtype="int64"),
+        "FirstPurchase": pd.Series(dtype="datetime64[ns]"),
+        "LastPurchase": pd.Series(dtype="datetime64[ns]"),
+        "Frequency": pd.Series(dtype="int64"),
+        "Monetary": pd.Series(dtype="float64"),
+    })
+    return {"watermark": 0, "sales_rows": 0, "fingerprint": (0, 0.0, 0.0, 0.0, 0.0), "customers": customers}
+
+
+def history_fingerprint(conn: sqlite3.Connection, after: int = 0, up_to: int = None) -> tuple:
+    """Return the HISTORY_FINGERPRINT_QUERY checksum of the sales with after < TransactionID <= up_to."""
+    up_to = np.iinfo(np.int64).max if up_to is None else up_to
+    return tuple(conn.execute(HISTORY_FINGERPRINT_QUERY, (after, up_to)).fetchone())
+
+
+def same_fingerprint(stored: tuple, current: tuple) -> bool:
+    """Compare two fingerprints, allowing for the rounding of float totals summed in a different order."""
+    if stored is None or len(stored) != len(current):
+        return False
+    return all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6) for a, b in zip(stored, current))
+
+
+def load_state(state_file: pathlib.Path = RFM_STATE_FILE) -> dict:
+    """Load the per-customer partials saved by the previous run (empty if there is none)."""
+    try:
+        with open(state_file, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return empty_state()
+
+
+def save_state(state: dict, state_file: pathlib.Path = RFM_STATE_FILE) -> None:
+    """Save the per-customer partials, replacing the previous state atomically."""
+    state_file = pathlib.Path(state_file)
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = state_file.with_suffix(".tmp")
+    with open(tmp_file, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_file.replace(state_file)
+
+
+def aggregate_customer_sales(conn: sqlite3.Connection, after: int = 0, up_to: int = None) -> pd.DataFrame:
+    """
+    Aggregate the per-customer partials of the sales with after < TransactionID <= up_to in SQLite.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the data warehouse.
+        after (int): Exclusive lower bound on TransactionID (the state's watermark).
+        up_to (int, optional): Inclusive upper bound on TransactionID (default: no bound).
+
+    Returns:
+        pd.DataFrame: One row of STATE_COLUMNS per customer.
+    """
+    up_to = np.iinfo(np.int64).max if up_to is None else up_to
+    partials = pd.read_sql_query(CUSTOMER_PARTIALS_QUERY, conn, params=(after, up_to))
+    return partials.astype({
+        "CustomerID": "int64",
+        "FirstPurchase": "datetime64[ns]",
+        "LastPurchase": "datetime64[ns]",
+        "Frequency": "int64",
+        "Monetary": "float64",
+    })
+
+
+def merge_customer_partials(customers: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """Merge two sets of per-customer partials (min/max of the dates, sums of the counts and spend)."""
+    if delta.empty:
+        return customers
+    if customers.empty:
+        return delta.sort_values("CustomerID", ignore_index=True)
+    combined = pd.concat([customers, delta], ignore_index=True)
+    return combined.groupby("CustomerID", as_index=False, sort=True).agg(
+        FirstPurchase=("FirstPurchase", "min"),
+        LastPurchase=("LastPurchase", "max"),
+        Frequency=("Frequency", "sum"),
+        Monetary=("Monetary", "sum"),
+    )
+
+
+def update_customer_state(
+    db_path: pathlib.Path = DB_PATH, state_file: pathlib.Path = RFM_STATE_FILE, full: bool = False
+) -> dict:
+    """
+    Bring the per-customer partials up to date with the sales table.
+
+    Args:
+        db_path (pathlib.Path): The SQLite data warehouse.
+        state_file (pathlib.Path): Where the partials are kept between runs.
+        full (bool): Ignore the saved state and rebuild it from every sale.
+
+    Returns:
+        dict: The state: watermark (highest TransactionID read), sales_rows (rows
+            read so far), fingerprint (history_fingerprint() of those rows) and
+            customers (one row of STATE_COLUMNS per customer).
+    """
+    try:
+        state = empty_state() if full else load_state(state_file)
+        conn = sqlite3.connect(db_path)
+        try:
+            if state["watermark"]:
+                # The history must still hold exactly the rows already merged into the state
+                seen = history_fingerprint(conn, 0, state["watermark"])
+                if not same_fingerprint(state.get("fingerprint"), seen):
+                    logger.warning(
+                        f"Sales at or below TransactionID {state['watermark']} changed "
+                        f"({state['sales_rows']} rows merged, {seen[0]} now); rebuilding the customer state."
+                    )
+                    state = empty_state()
+
+            new_rows, high_water = conn.execute(
+                "SELECT COUNT(*), MAX(TransactionID) FROM sales WHERE TransactionID > ?", (state["watermark"],)
+            ).fetchone()
+            if new_rows:
+                delta = aggregate_customer_sales(conn, state["watermark"], high_water)
+                new_fingerprint = history_fingerprint(conn, state["watermark"], high_water)
+                state = {
+                    "watermark": int(high_water),
+                    "sales_rows": state["sales_rows"] + int(new_rows),
+                    "fingerprint": tuple(a + b for a, b in zip(state["fingerprint"], new_fingerprint)),
+                    "customers": merge_customer_partials(state["customers"], delta),
+                }
+                save_state(state, state_file)
+        finally:
+            conn.close()
+        logger.info(
+            f"Customer state updated with {new_rows} new sales; "
+            f"{len(state['customers'])} customers through TransactionID {state['watermark']}."
+        )
+        return state
+    except Exception as e:
+        logger.error(f"Error updating the customer state from the data warehouse: {e}")
+        raise
+
+
+def quantile_scores(values: pd.Series, quantiles: int = RFM_QUANTILES, ascending: bool = True) -> np.ndarray:
+    """
+    Score values 1..quantiles by their quantile; higher values score higher unless ascending is False.
+
+    Tied values share their average rank, so they always get the same score.
+    """
+    pct = values.rank(method="average", pct=True, ascending=ascending).to_numpy()
+    return np.clip(np.ceil(pct * quantiles), 1, quantiles).astype(np.int64)
+
+
+def compute_rfm(
+    customers: pd.DataFrame,
+    as_of: pd.Timestamp = None,
+    quantiles: int = RFM_QUANTILES,
+    horizon_days: int = CLV_HORIZON_DAYS,
+) -> pd.DataFrame:
+    """
+    Compute the RFM metrics, lifetime value, scores and segment of every customer.
+
+    Args:
+        customers (pd.DataFrame): Per-customer partials (STATE_COLUMNS).
+        as_of (pd.Timestamp, optional): Date recency is measured from (default: the latest purchase).
+        quantiles (int): Number of score buckets for R, F and M.
+        horizon_days (int): Horizon of the lifetime-value estimate.
+
+    Returns:
+        pd.DataFrame: The partials plus RecencyDays, AverageBasket, TenureDays,
+            LifetimeValue, RScore, FScore, MScore, RFMScore (e.g. 545) and Segment.
+    """
+    try:
+        rfm = customers.copy()
+        as_of = rfm["LastPurchase"].max() if as_of is None else pd.Timestamp(as_of)
+
+        rfm["RecencyDays"] = (as_of - rfm["LastPurchase"]).dt.days
+        rfm["AverageBasket"] = rfm["Monetary"] / rfm["Frequency"]
+        rfm["TenureDays"] = (as_of - rfm["FirstPurchase"]).dt.days + 1
+        # Run-rate lifetime value: average basket x purchases per day so far x horizon
+        purchase_rate = rfm["Frequency"] / rfm["TenureDays"].clip(lower=CLV_MIN_TENURE_DAYS)
+        rfm["LifetimeValue"] = rfm["AverageBasket"] * purchase_rate * horizon_days
+
+        # More recent (fewer days) scores higher
+        rfm["RScore"] = quantile_scores(rfm["RecencyDays"], quantiles, ascending=False)
+        rfm["FScore"] = quantile_scores(rfm["Frequency"], quantiles)
+        rfm["MScore"] = quantile_scores(rfm["Monetary"], quantiles)
+        rfm["RFMScore"] = rfm["RScore"] * 100 + rfm["FScore"] * 10 + rfm["MScore"]
+
+        # Segment rules are written for 5 buckets; rescale other bucket counts onto 1..5
+        r = np.ceil(rfm["RScore"].to_numpy() * 5 / quantiles)
+        f = np.ceil(rfm["FScore"].to_numpy() * 5 / quantiles)
+        conditions = [
+            (r >= r_low) & (r <= r_high) & (f >= f_low) & (f <= f_high)
+            for (r_low, r_high), (f_low, f_high) in RFM_SEGMENTS.values()
+        ]
+        rfm["Segment"] = np.select(conditions, list(RFM_SEGMENTS), default="Other")
+
+        logger.info(f"RFM scores computed for {len(rfm)} customers as of {as_of:%Y-%m-%d}.")
+        return rfm
+    except Exception as e:
+        logger.error(f"Error computing RFM scores: {e}")
+        raise
+
+
+def summarize_segments(rfm: pd.DataFrame) -> pd.DataFrame:
+    """Customers, total spend and average lifetime value per segment, largest spend first."""
+    summary = rfm.groupby("Segment", as_index=False).agg(
+        Customers=("CustomerID", "count"),
+        TotalSales=("Monetary", "sum"),
+        AverageBasket=("AverageBasket", "mean"),
+        AverageLifetimeValue=("LifetimeValue", "mean"),
+    )
+    return summary.sort_values("TotalSales", ascending=False, ignore_index=True)
+
+
+def save_results_to_csv(results_df: pd.DataFrame, filename: str) -> None:
+    """Save the results to a CSV file."""
+    try:
+        RESULTS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = RESULTS_OUTPUT_DIR.joinpath(filename)
+        results_df.to_csv(output_path, index=False, date_format="%Y-%m-%d")
+        logger.info(f"Results saved to {output_path}.")
+    except Exception as e:
+        logger.error(f"Error saving results to CSV file: {e}")
+        raise
+
+
+def main():
+    """Main function for the customer RFM and lifetime-value analysis."""
+    parser = argparse.ArgumentParser(description="Compute customer RFM scores, segments and lifetime value.")
+    parser.add_argument("--full", action="store_true", help="Rebuild the customer state from every sale.")
+    parser.add_argument("--as-of", default=None, help="Date to measure recency from (default: latest purchase).")
+    parser.add_argument("--quantiles", type=int, default=RFM_QUANTILES, help="Score buckets for R, F and M.")
+    args = parser.parse_args()
+
+    logger.info("Starting CUSTOMER_RFM analysis...")
+    state = update_customer_state(full=args.full)
+    rfm = compute_rfm(state["customers"], args.as_of, args.quantiles)
+    save_results_to_csv(rfm, "customer_rfm.csv")
+
+    segments = summarize_segments(rfm)
+    print(segments)
+    save_results_to_csv(segments, "customer_segments.csv")
+
+    logger.info("Analysis completed successfully.")
+
+
+if __name__ == "__main__":
+    main()
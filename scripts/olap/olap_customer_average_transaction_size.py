@@ -1,6 +1,6 @@
 """
 Module 6: OLAP Goal Script (uses cubed results)
-File: scripts/olap_customer_average_transaction_size.py
+File: scripts/olap/olap_customer_average_transaction_size.py
 
 This script calculates the average transaction size for each customer.
 
@@ -12,13 +12,24 @@ PROCESS:
 1. Group transactions by CustomerID.
 2. Sum SaleAmount for each customer.
 3. Divide the total sales by the number of transactions to calculate the average transaction size per customer.
+4. Visualize the average transaction size per customer using a bar chart.
+
+Recency, frequency, monetary value and segments for every customer are computed
+from the warehouse by olap_customer_analytics.
 """
 
 import pandas as pd
 import pathlib
+import sys
 import logging
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_rendering import render_chart  # noqa: E402
+from scripts.olap.olap_result_cache import ResultCache  # noqa: E402
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
@@ -32,24 +43,6 @@ RESULTS_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("results")
 # Create output directory for results if it doesn't exist
 RESULTS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-# Load the results
-customer_stats = pd.read_csv("c:/Projects/smart-store-tommy/data/results/customer_average_transaction_size.csv")
-
-# Sort by AverageTransactionSize for better visualization
-customer_stats = customer_stats.sort_values(by="AverageTransactionSize", ascending=False)
-
-# Create the bar chart
-plt.figure(figsize=(12, 6))
-plt.bar(customer_stats["CustomerID"].astype(str), customer_stats["AverageTransactionSize"], color="skyblue")
-plt.title("Average Transaction Size by Customer", fontsize=16)
-plt.xlabel("Customer ID", fontsize=12)
-plt.ylabel("Average Transaction Size (USD)", fontsize=12)
-plt.xticks(rotation=45, fontsize=10)
-plt.tight_layout()
-
-# Save and show the chart
-plt.savefig("c:/Projects/smart-store-tommy/data/results/average_transaction_size_by_customer.png")
-plt.show()
 
 def load_olap_cube(file_path: pathlib.Path) -> pd.DataFrame:
     """Load the precomputed OLAP cube data."""
@@ -91,20 +84,49 @@ def save_results_to_csv(results_df: pd.DataFrame, filename: str) -> None:
         raise
 
 
+def plot_average_transaction_size(fig, ax, customer_stats: pd.DataFrame) -> None:
+    """Draw the average transaction size per customer as a bar chart, largest first."""
+    # Sort by AverageTransactionSize for better visualization
+    customer_stats = customer_stats.sort_values(by="AverageTransactionSize", ascending=False)
+    ax.bar(customer_stats["CustomerID"].astype(str), customer_stats["AverageTransactionSize"], color="skyblue")
+    ax.set_title("Average Transaction Size by Customer", fontsize=16)
+    ax.set_xlabel("Customer ID", fontsize=12)
+    ax.set_ylabel("Average Transaction Size (USD)", fontsize=12)
+    ax.tick_params(axis="x", labelrotation=45, labelsize=10)
+
+
+def visualize_average_transaction_size(customer_stats: pd.DataFrame) -> None:
+    """Visualize the average transaction size per customer using a bar chart."""
+    try:
+        output_path = RESULTS_OUTPUT_DIR.joinpath("average_transaction_size_by_customer.png")
+        if render_chart(plot_average_transaction_size, customer_stats, output_path, figsize=(12, 6)):
+            logger.info(f"Bar chart saved to {output_path}.")
+        else:
+            logger.info(f"Bar chart at {output_path} is up to date.")
+    except Exception as e:
+        logger.error(f"Error visualizing average transaction size: {e}")
+        raise
+
+
 def main():
     """Main function for calculating average transaction size."""
     logger.info("Starting CUSTOMER_AVERAGE_TRANSACTION_SIZE analysis...")
 
-    # Step 1: Load the precomputed OLAP cube
-    cube_df = load_olap_cube(CUBED_FILE)
-
-    # Step 2: Calculate the average transaction size for each customer
-    customer_stats = calculate_average_transaction_size(cube_df)
+    # Steps 1-2: Load the cube and calculate the average transaction size for each customer,
+    # unless the result for this exact cube is already cached
+    customer_stats = ResultCache().get_or_compute(
+        "customer_average_transaction_size",
+        [CUBED_FILE],
+        lambda: calculate_average_transaction_size(load_olap_cube(CUBED_FILE)),
+    )
 
     # Step 3: Save the results to a CSV file
     save_results_to_csv(customer_stats, "customer_average_transaction_size.csv")
 
-    logger.info("Analysis completed successfully.")
+    # Step 4: Visualize the average transaction size per customer
+    visualize_average_transaction_size(customer_stats)
+
+    logger.info("Analysis and visualization completed successfully.")
 
 
 if __name__ == "__main__":
@@ -1,9 +1,15 @@
 import pandas as pd
-import matplotlib.pyplot as plt
 import pathlib
 import sys
 import logging
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_rendering import render_chart  # noqa: E402
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -56,26 +62,28 @@ def identify_least_profitable_day(sales_by_weekday: pd.DataFrame) -> str:
         raise
 
 
+def plot_sales_by_weekday(fig, ax, sales_by_weekday: pd.DataFrame) -> None:
+    """Draw total sales by day of the week as a bar chart."""
+    ax.bar(
+        sales_by_weekday["DayOfWeek"],
+        sales_by_weekday["TotalSales"],
+        color="skyblue",
+    )
+    ax.set_title("Total Sales by Day of the Week", fontsize=16)
+    ax.set_xlabel("Day of the Week", fontsize=12)
+    ax.set_ylabel("Total Sales (USD)", fontsize=12)
+    ax.tick_params(axis="x", rotation=45)
+
+
 def visualize_sales_by_weekday(sales_by_weekday: pd.DataFrame) -> None:
     """Visualize total sales by day of the week."""
     try:
-        plt.figure(figsize=(10, 6))
-        plt.bar(
-            sales_by_weekday["DayOfWeek"],
-            sales_by_weekday["TotalSales"],
-            color="skyblue",
-        )
-        plt.title("Total Sales by Day of the Week", fontsize=16)
-        plt.xlabel("Day of the Week", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-
         # Save the visualization
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_day_of_week.png")
-        plt.savefig(output_path)
-        logger.info(f"Visualization saved to {output_path}.")
-        plt.show()
+        if render_chart(plot_sales_by_weekday, sales_by_weekday, output_path, figsize=(10, 6)):
+            logger.info(f"Visualization saved to {output_path}.")
+        else:
+            logger.info(f"Visualization at {output_path} is up to date.")
     except Exception as e:
         logger.error(f"Error visualizing sales by day of the week: {e}")
         raise
@@ -94,7 +102,6 @@ def main():
     # Step 3: Identify the least profitable day
     least_profitable_day = identify_least_profitable_day(sales_by_weekday)
     logger.info(f"Least profitable day: {least_profitable_day}")
-    logger.info("Close the Figure to complete this script.")
 
     # Step 4: Visualize total sales by DayOfWeek
     visualize_sales_by_weekday(sales_by_weekday)
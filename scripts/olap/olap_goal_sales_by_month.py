@@ -13,10 +13,18 @@ PROCESS:
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import pathlib
+import sys
 import logging
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_month_matrix import MonthMatrix, window_months  # noqa: E402
+from scripts.olap.olap_rendering import render_chart  # noqa: E402
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -41,16 +49,28 @@ def load_olap_cube(file_path: pathlib.Path) -> pd.DataFrame:
         raise
 
 
-def analyze_sales_by_month(cube_df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate total sales by Month."""
-    try:
-        # Ensure the Month column exists
-        if "Month" not in cube_df.columns:
-            logger.error("The OLAP cube does not contain a 'Month' column.")
-            raise ValueError("The OLAP cube does not contain a 'Month' column.")
+def analyze_sales_by_month(cube_df: pd.DataFrame, months: list = None, month_matrix: MonthMatrix = None) -> pd.DataFrame:
+    """
+    Aggregate total sales by Month.
 
-        # Group by Month and sum the sales
-        sales_by_month = cube_df.groupby("Month")["SaleAmount_sum"].sum().reset_index()
+    months restricts the result to any set of months (default: all). Pass a
+    month_matrix (e.g. month x region) shared with other analyses to answer
+    repeated windows without rescanning the cube.
+    """
+    try:
+        if month_matrix is not None:
+            # Sum the precomputed Month x key sales over the keys
+            sales_by_month = month_matrix.month_totals(months)
+        else:
+            # Ensure the Month column exists
+            if "Month" not in cube_df.columns:
+                logger.error("The OLAP cube does not contain a 'Month' column.")
+                raise ValueError("The OLAP cube does not contain a 'Month' column.")
+
+            # Group by Month and sum the sales
+            if months is not None:
+                cube_df = cube_df[cube_df["Month"].isin(window_months(months))]
+            sales_by_month = cube_df.groupby("Month")["SaleAmount_sum"].sum().reset_index()
         sales_by_month.rename(columns={"SaleAmount_sum": "TotalSales"}, inplace=True)
         sales_by_month.sort_values(by="Month", inplace=True)
         logger.info("Sales aggregated by Month successfully.")
@@ -60,24 +80,26 @@ def analyze_sales_by_month(cube_df: pd.DataFrame) -> pd.DataFrame:
         raise
 
 
+def plot_sales_by_month(fig, ax, sales_by_month: pd.DataFrame) -> None:
+    """Draw total sales by month as a line graph."""
+    ax.plot(sales_by_month["Month"], sales_by_month["TotalSales"], marker="o", color="blue", linestyle="-")
+    ax.set_title("Total Sales by Month", fontsize=16)
+    ax.set_xlabel("Month", fontsize=12)
+    ax.set_ylabel("Total Sales (USD)", fontsize=12)
+    ax.set_xticks(sales_by_month["Month"])
+    ax.tick_params(axis="x", labelsize=10)
+    ax.grid(True)
+
+
 def visualize_sales_by_month(sales_by_month: pd.DataFrame) -> None:
     """Visualize total sales by month using a line graph."""
     try:
-        # Create the line graph
-        plt.figure(figsize=(10, 6))
-        plt.plot(sales_by_month["Month"], sales_by_month["TotalSales"], marker="o", color="blue", linestyle="-")
-        plt.title("Total Sales by Month", fontsize=16)
-        plt.xlabel("Month", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(sales_by_month["Month"], fontsize=10)
-        plt.grid(True)
-        plt.tight_layout()
-
         # Save the visualization
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_month.png")
-        plt.savefig(output_path)
-        logger.info(f"Line graph saved to {output_path}.")
-        plt.show()
+        if render_chart(plot_sales_by_month, sales_by_month, output_path, figsize=(10, 6)):
+            logger.info(f"Line graph saved to {output_path}.")
+        else:
+            logger.info(f"Line graph at {output_path} is up to date.")
     except Exception as e:
         logger.error(f"Error visualizing sales by Month: {e}")
         raise
@@ -18,10 +18,24 @@ Identify the top product for each day based on total revenue.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import pathlib
+import sys
 import logging
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import add_dimension_attributes  # noqa: E402
+from scripts.olap.olap_rendering import render_chart  # noqa: E402
+from scripts.olap.olap_result_cache import ResultCache  # noqa: E402
+from scripts.olap.olap_topk import top_k_per_group  # noqa: E402
+from utils.lazy_import import lazy_import  # noqa: E402
+
+# Only loaded when the category chart is drawn
+sns = lazy_import("seaborn")
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -58,18 +72,20 @@ def load_products_data(file_path: pathlib.Path) -> pd.DataFrame:
         raise
 
 
-def analyze_top_product_by_weekday(cube_df: pd.DataFrame, products_df: pd.DataFrame) -> pd.DataFrame:
+def analyze_top_product_by_weekday(cube_df: pd.DataFrame, products_df: pd.DataFrame = None) -> pd.DataFrame:
     """Identify the product with the highest revenue for each day of the week."""
     try:
-        # Group by DayOfWeek and ProductID, sum the sales
-        grouped = cube_df.groupby(["DayOfWeek", "ProductID"])["SaleAmount_sum"].sum().reset_index()
-        grouped.rename(columns={"SaleAmount_sum": "TotalSales"}, inplace=True)
+        # Use the ProductName stored in the cube, joining products only for older cubes
+        cube_df = add_dimension_attributes(cube_df, ["ProductName"], products_df=products_df)
 
-        # Merge with product details to get ProductName
-        grouped = grouped.merge(products_df[["ProductID", "ProductName"]], on="ProductID", how="left")
+        # Group by DayOfWeek and ProductID, sum the sales
+        grouped = cube_df.groupby(["DayOfWeek", "ProductID"]).agg(
+            TotalSales=("SaleAmount_sum", "sum"),
+            ProductName=("ProductName", "first")
+        ).reset_index()
 
-        # Sort within each day to find the top product
-        top_products = grouped.sort_values(["DayOfWeek", "TotalSales"], ascending=[True, False]).groupby("DayOfWeek").head(1)
+        # Select the top product within each day without sorting the grouped frame
+        top_products = top_k_per_group(grouped, ["DayOfWeek"], "TotalSales", k=1)
         logger.info("Top products identified for each day of the week.")
         return top_products
     except Exception as e:
@@ -77,11 +93,38 @@ def analyze_top_product_by_weekday(cube_df: pd.DataFrame, products_df: pd.DataFr
         raise
 
 
-def visualize_sales_by_weekday_and_product(cube_df: pd.DataFrame, products_df: pd.DataFrame) -> None:
+def save_results_to_csv(results_df: pd.DataFrame, filename: str) -> None:
+    """Save the results to a CSV file."""
+    try:
+        output_path = RESULTS_OUTPUT_DIR.joinpath(filename)
+        results_df.to_csv(output_path, index=False)
+        logger.info(f"Results saved to {output_path}.")
+    except Exception as e:
+        logger.error(f"Error saving results to CSV file: {e}")
+        raise
+
+
+def plot_sales_by_weekday_and_product(fig, ax, sales_pivot: pd.DataFrame) -> None:
+    """Draw a stacked bar chart of sales by day of the week and product."""
+    sales_pivot.plot(
+        kind="bar",
+        stacked=True,
+        colormap="tab10",
+        ax=ax
+    )
+
+    ax.set_title("Total Sales by Day of the Week and Product", fontsize=16)
+    ax.set_xlabel("Day of the Week", fontsize=12)
+    ax.set_ylabel("Total Sales (USD)", fontsize=12)
+    ax.tick_params(axis="x", rotation=45)
+    ax.legend(title="Product Name", bbox_to_anchor=(1.05, 1), loc="upper left")
+
+
+def visualize_sales_by_weekday_and_product(cube_df: pd.DataFrame, products_df: pd.DataFrame = None) -> None:
     """Visualize total sales by day of the week, broken down by product."""
     try:
-        # Merge with product details to get ProductName
-        cube_df = cube_df.merge(products_df[["ProductID", "ProductName"]], on="ProductID", how="left")
+        # Use the ProductName stored in the cube, joining products only for older cubes
+        cube_df = add_dimension_attributes(cube_df, ["ProductName"], products_df=products_df)
 
         # Pivot the data to organize sales by DayOfWeek and ProductName
         sales_pivot = cube_df.pivot_table(
@@ -89,60 +132,52 @@ def visualize_sales_by_weekday_and_product(cube_df: pd.DataFrame, products_df: p
             columns="ProductName",
             values="SaleAmount_sum",
             aggfunc="sum",
-            fill_value=0
-        )
-
-        # Plot the stacked bar chart
-        sales_pivot.plot(
-            kind="bar",
-            stacked=True,
-            figsize=(12, 8),
-            colormap="tab10"
+            fill_value=0,
+            observed=True
         )
 
-        plt.title("Total Sales by Day of the Week and Product", fontsize=16)
-        plt.xlabel("Day of the Week", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.legend(title="Product Name", bbox_to_anchor=(1.05, 1), loc="upper left")
-        plt.tight_layout()
-
         # Save the visualization
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_day_and_product.png")
-        plt.savefig(output_path)
-        logger.info(f"Stacked bar chart saved to {output_path}.")
-        plt.show()
+        if render_chart(plot_sales_by_weekday_and_product, sales_pivot, output_path, figsize=(12, 8)):
+            logger.info(f"Stacked bar chart saved to {output_path}.")
+        else:
+            logger.info(f"Stacked bar chart at {output_path} is up to date.")
     except Exception as e:
         logger.error(f"Error visualizing sales by day and product: {e}")
         raise
-    
-def visualize_total_sales_by_category(products_df: pd.DataFrame) -> None:
-    """Visualize total sales by product category."""
-    try:
-        # Aggregate sales by product category
-        category_sales = products_df.groupby("Category")["SaleAmount_sum"].sum().reset_index()
-        category_sales.rename(columns={"Category": "product_category", "SaleAmount_sum": "sum(sale_amount)"}, inplace=True)
 
-        # Create the bar chart
-        import seaborn as sns
-        import matplotlib.pyplot as plt
 
-        sns.barplot(data=category_sales, x="product_category", y="sum(sale_amount)", palette="viridis")
-        plt.xticks(rotation=45)
-        plt.title("Total Sales by Product Category")
-        plt.xlabel("Product Category")
-        plt.ylabel("Total Sales (USD)")
-        plt.tight_layout()
+def plot_total_sales_by_category(fig, ax, category_sales: pd.DataFrame) -> None:
+    """Draw total sales by product category as a bar chart."""
+    sns.barplot(
+        data=category_sales, x="Category", y="TotalSales",
+        hue="Category", palette="viridis", legend=False, ax=ax
+    )
+    ax.tick_params(axis="x", rotation=45)
+    ax.set_title("Total Sales by Product Category")
+    ax.set_xlabel("Product Category")
+    ax.set_ylabel("Total Sales (USD)")
+
+
+def visualize_total_sales_by_category(cube_df: pd.DataFrame, products_df: pd.DataFrame = None) -> None:
+    """Visualize total sales by product category."""
+    try:
+        # Aggregate sales by the cube's Category attribute
+        cube_df = add_dimension_attributes(cube_df, ["Category"], products_df=products_df)
+        category_sales = cube_df.groupby("Category", observed=True)["SaleAmount_sum"].sum().reset_index()
+        category_sales.rename(columns={"SaleAmount_sum": "TotalSales"}, inplace=True)
 
         # Save the visualization
         output_path = RESULTS_OUTPUT_DIR.joinpath("total_sales_by_category.png")
-        plt.savefig(output_path)
-        logger.info(f"Bar chart saved to {output_path}.")
-        plt.show()
+        if render_chart(plot_total_sales_by_category, category_sales, output_path):
+            logger.info(f"Bar chart saved to {output_path}.")
+        else:
+            logger.info(f"Bar chart at {output_path} is up to date.")
     except Exception as e:
         logger.error(f"Error visualizing total sales by product category: {e}")
         raise
 
+
 def main():
     """Main function for analyzing and visualizing top product sales by day of the week."""
     logger.info("Starting SALES_TOP_PRODUCT_BY_WEEKDAY analysis...")
@@ -150,15 +185,23 @@ def main():
     # Step 1: Load the precomputed OLAP cube
     cube_df = load_olap_cube(CUBED_FILE)
 
-    # Step 2: Load the product details
-    products_df = load_products_data(PRODUCTS_FILE)
-
-    # Step 3: Analyze top products by DayOfWeek
-    top_products = analyze_top_product_by_weekday(cube_df, products_df)
+    # Step 2: Load the product details (only needed for cubes built without ProductName and Category)
+    products_df = None
+    if not {"ProductName", "Category"} <= set(cube_df.columns):
+        products_df = load_products_data(PRODUCTS_FILE)
+
+    # Step 3: Analyze top products by DayOfWeek, reusing the cached result for unchanged inputs
+    top_products = ResultCache().get_or_compute(
+        "top_product_by_weekday",
+        [CUBED_FILE] if products_df is None else [CUBED_FILE, PRODUCTS_FILE],
+        lambda: analyze_top_product_by_weekday(cube_df, products_df),
+    )
     print(top_products)
+    save_results_to_csv(top_products, "top_product_by_weekday.csv")
 
     # Step 4: Visualize the results
     visualize_sales_by_weekday_and_product(cube_df, products_df)
+    visualize_total_sales_by_category(cube_df, products_df)
     logger.info("Analysis and visualization completed successfully.")
 
 
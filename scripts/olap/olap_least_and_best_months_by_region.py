@@ -8,7 +8,7 @@ ACTION: Use this information to target marketing campaigns during slow months an
 
 PROCESS:
 1. Load the OLAP cube to get sales data by Month and Region.
-2. Merge the OLAP cube with customer data to include Region.
+2. Use the Region dimension stored in the cube.
 3. Group by Region and Month to calculate total sales.
 4. Identify the least and best performing months for each region.
 5. Save the results to a CSV file and optionally visualize the data.
@@ -16,9 +16,18 @@ PROCESS:
 
 import pandas as pd
 import pathlib
+import sys
 import logging
 import calendar
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_result_cache import ResultCache  # noqa: E402
+from scripts.olap.olap_topk import extremes_per_group  # noqa: E402
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -55,18 +64,22 @@ def load_customers_data(file_path: pathlib.Path) -> pd.DataFrame:
         raise
 
 
-def analyze_least_and_best_performing_months_by_region(cube_df: pd.DataFrame, customers_df: pd.DataFrame) -> pd.DataFrame:
+def analyze_least_and_best_performing_months_by_region(cube_df: pd.DataFrame, customers_df: pd.DataFrame = None) -> pd.DataFrame:
     """Analyze the least and best performing months by region."""
     try:
-        # Merge the OLAP cube with customer data to include Region
-        merged_data = cube_df.merge(customers_df[["CustomerID", "Region"]], on="CustomerID", how="left")
+        # Region is a cube dimension; join customers only for cubes built without it
+        if "Region" in cube_df.columns:
+            merged_data = cube_df
+        else:
+            merged_data = cube_df.merge(customers_df[["CustomerID", "Region"]], on="CustomerID", how="left")
 
         # Group by Region and Month, sum the sales
         grouped = merged_data.groupby(["Region", "Month"])["SaleAmount_sum"].sum().reset_index()
 
-        # Identify the least and best performing months for each region
-        least_performing = grouped.sort_values(["Region", "SaleAmount_sum"]).groupby("Region").first().reset_index()
-        best_performing = grouped.sort_values(["Region", "SaleAmount_sum"], ascending=False).groupby("Region").first().reset_index()
+        # Identify the least and best performing months for each region in one pass
+        least_performing, best_performing = extremes_per_group(grouped, ["Region"], "SaleAmount_sum", k=1)
+        least_performing = least_performing.reset_index(drop=True)
+        best_performing = best_performing.reset_index(drop=True)
 
         # Merge least and best performing data
         result = least_performing.merge(
@@ -112,14 +125,19 @@ def main():
     """Main function for analyzing least and best performing months by region."""
     logger.info("Starting LEAST_AND_BEST_PERFORMING_MONTHS_BY_REGION analysis...")
 
-    # Step 1: Load the precomputed OLAP cube
-    cube_df = load_olap_cube(CUBED_FILE)
+    # Steps 1-3: Load the cube (and customers for cubes built without Region) and analyze,
+    # unless the result for these exact input files is already cached. Only the header is
+    # read up front, to tell whether the customers file is an input at all
+    needs_customers = "Region" not in pd.read_csv(CUBED_FILE, nrows=0).columns
 
-    # Step 2: Load the customer details
-    customers_df = load_customers_data(CUSTOMERS_FILE)
+    def compute():
+        cube_df = load_olap_cube(CUBED_FILE)
+        customers_df = load_customers_data(CUSTOMERS_FILE) if needs_customers else None
+        return analyze_least_and_best_performing_months_by_region(cube_df, customers_df)
 
-    # Step 3: Analyze least and best performing months by region
-    results = analyze_least_and_best_performing_months_by_region(cube_df, customers_df)
+    results = ResultCache().get_or_compute(
+        "least_and_best_months_by_region", [CUBED_FILE, CUSTOMERS_FILE] if needs_customers else [CUBED_FILE], compute
+    )
     print(results)
 
     # Step 4: Save the results to a CSV file
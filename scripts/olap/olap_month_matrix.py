@@ -0,0 +1,180 @@
+"""
+Month Range Queries
+File: scripts/olap/olap_month_matrix.py
+
+Precomputed month x key matrices (e.g. month x product, month x region) of the
+additive cube measures, with cumulative prefix sums over the months.
+
+After one pass over the cube:
+
+- the rows of any set of months are direct array lookups, and
+- the total over a contiguous range of months m1..m2 is one vector
+  subtraction, prefix[m2] - prefix[m1 - 1]; an arbitrary month set is split
+  into contiguous runs and answered with one subtraction per run.
+
+So month-window analyses (slow months, a quarter, a season) no longer filter
+and re-group the cube on every call. Range totals come from differences of
+running sums, so they can differ from a direct sum in the last floating-point
+digit; per-month rows are stored exactly as grouped from the cube.
+
+    matrix = build_month_matrix(cube_df, "ProductID", attributes=["ProductName"])
+    matrix.month_rows([3, 10])        # per-month, per-product rows for March and October
+    matrix.window_totals([6, 7, 8])   # summer totals per product
+"""
+
+import numpy as np
+import pandas as pd
+
+# Constants
+MONTHS: np.ndarray = np.arange(1, 13)
+MONTH_MEASURES: list = ["SaleAmount_sum", "TransactionID_count"]
+
+
+def month_runs(months: list) -> list:
+    """
+    Split a set of months into contiguous (start, end) runs.
+
+    Args:
+        months (list): Month numbers 1-12, in any order, duplicates allowed.
+
+    Returns:
+        list: Sorted (start, end) tuples, e.g. [3, 4, 5, 10] -> [(3, 5), (10, 10)].
+    """
+    months = sorted({int(month) for month in months})
+    invalid = [month for month in months if month not in MONTHS]
+    if invalid:
+        raise ValueError(f"Months must be between 1 and 12, got {invalid}.")
+
+    runs = []
+    for month in months:
+        if runs and month == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], month)
+        else:
+            runs.append((month, month))
+    return runs
+
+
+def window_months(months: list = None) -> np.ndarray:
+    """Return the sorted, distinct, validated months of a set (default: all 12)."""
+    if months is None:
+        return MONTHS
+    return np.array([month for start, end in month_runs(months) for month in range(start, end + 1)])
+
+
+class MonthMatrix:
+    """Month x key totals of additive measures with prefix sums over the months."""
+
+    def __init__(self, key: str, keys: np.ndarray, monthly: dict, occupied: np.ndarray, attributes: dict = None):
+        """
+        Args:
+            key (str): Name of the key dimension, e.g. "ProductID".
+            keys (np.ndarray): Sorted key values (matrix columns).
+            monthly (dict): Measure name -> (12, len(keys)) array of per-month totals.
+            occupied (np.ndarray): (12, len(keys)) bool array, True where the cube has the cell.
+            attributes (dict, optional): Attribute name -> array (numpy or pandas) of one value per key.
+        """
+        self.key = key
+        self.keys = keys
+        self.monthly = monthly
+        self.occupied = occupied
+        self.attributes = attributes or {}
+        # prefix[m] holds the totals of months 1..m; prefix[0] is all zeros
+        self.prefix = {
+            measure: np.vstack([np.zeros((1, len(keys)), dtype=values.dtype), np.cumsum(values, axis=0)])
+            for measure, values in monthly.items()
+        }
+
+    def month_rows(self, months: list = None) -> pd.DataFrame:
+        """
+        Return the per-month, per-key rows of a set of months (default: all months).
+
+        Only cells present in the cube are returned, ordered by Month, then key,
+        like cube_df.groupby(["Month", key]).
+
+        Returns:
+            pd.DataFrame: Month, key, one column per measure, then the attributes.
+        """
+        months = window_months(months)
+        month_index, key_index = np.nonzero(self.occupied[months - 1])
+        rows = {"Month": months[month_index], self.key: self.keys[key_index]}
+        for measure, values in self.monthly.items():
+            rows[measure] = values[months - 1][month_index, key_index]
+        for attr, values in self.attributes.items():
+            rows[attr] = values[key_index]
+        return pd.DataFrame(rows)
+
+    def month_totals(self, months: list = None, measure: str = "SaleAmount_sum") -> pd.DataFrame:
+        """Return Month and the measure summed over all keys, for the occupied months of a set (default: all)."""
+        months = window_months(months)
+        present = self.occupied[months - 1].any(axis=1)
+        totals = self.monthly[measure][months - 1].sum(axis=1)
+        return pd.DataFrame({"Month": months[present], measure: totals[present]})
+
+    def range_totals(self, start: int, end: int) -> dict:
+        """Return {measure: per-key totals} over the contiguous months start..end."""
+        month_runs([start, end])
+        if start > end:
+            raise ValueError(f"Empty month range {start}..{end}.")
+        return {measure: prefix[end] - prefix[start - 1] for measure, prefix in self.prefix.items()}
+
+    def window_totals(self, months: list) -> pd.DataFrame:
+        """
+        Return the per-key totals over an arbitrary set of months.
+
+        The set is split into contiguous runs and each run is one prefix-sum difference.
+
+        Returns:
+            pd.DataFrame: key, one column per measure, then the attributes; keys
+                with no cube cell in the window are left out.
+        """
+        totals = {measure: np.zeros(len(self.keys), dtype=values.dtype) for measure, values in self.monthly.items()}
+        present = np.zeros(len(self.keys), dtype=bool)
+        for start, end in month_runs(months):
+            for measure, values in self.range_totals(start, end).items():
+                totals[measure] += values
+            present |= self.occupied[start - 1:end].any(axis=0)
+
+        rows = {self.key: self.keys[present]}
+        rows.update({measure: values[present] for measure, values in totals.items()})
+        rows.update({attr: values[present] for attr, values in self.attributes.items()})
+        return pd.DataFrame(rows)
+
+
+def build_month_matrix(cube_df: pd.DataFrame, key: str, measures: list = None, attributes: list = None) -> MonthMatrix:
+    """
+    Build a month x key matrix of additive measures from the cube in one pass.
+
+    Args:
+        cube_df (pd.DataFrame): The OLAP cube, with a Month column (1-12).
+        key (str): Dimension for the matrix columns, e.g. "ProductID" or "Region".
+        measures (list, optional): Additive measure columns (default: MONTH_MEASURES present in the cube).
+        attributes (list, optional): Attributes of the key to carry, e.g. ["ProductName"] (first value per key).
+
+    Returns:
+        MonthMatrix: The matrix with its prefix sums.
+    """
+    measures = measures or [measure for measure in MONTH_MEASURES if measure in cube_df.columns]
+    attributes = attributes or []
+
+    grouped = cube_df.groupby(["Month", key], observed=True)[measures].sum().reset_index()
+    month_codes = grouped["Month"].to_numpy().astype(np.int64) - 1
+    if ((month_codes < 0) | (month_codes >= len(MONTHS))).any():
+        raise ValueError("The cube's Month column must hold months 1-12.")
+    key_codes, keys = pd.factorize(grouped[key], sort=True)
+    keys = np.asarray(keys)
+
+    shape = (len(MONTHS), len(keys))
+    monthly = {}
+    for measure in measures:
+        values = grouped[measure].to_numpy()
+        monthly[measure] = np.zeros(shape, dtype=values.dtype)
+        monthly[measure][month_codes, key_codes] = values
+    occupied = np.zeros(shape, dtype=bool)
+    occupied[month_codes, key_codes] = True
+
+    attribute_values = {}
+    if attributes:
+        first = cube_df.groupby(key, observed=True)[attributes].first()
+        attribute_values = {attr: first[attr].reindex(keys).array for attr in attributes}
+
+    return MonthMatrix(key, keys, monthly, occupied, attribute_values)
@@ -8,16 +8,24 @@ ACTION: Use this information to identify regional product preferences and optimi
 
 PROCESS:
 1. Load the OLAP cube to get sales data by ProductID and Region.
-2. Merge the data with product details to get ProductName.
+2. Use the ProductName stored in the cube (merge product details for older cubes).
 3. Group by Region and ProductID to calculate total sales.
 4. Create a stacked bar chart with regions on the X-axis, total sales on the Y-axis, and products as the stacks.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import pathlib
+import sys
 import logging
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import add_dimension_attributes  # noqa: E402
+from scripts.olap.olap_rendering import render_chart  # noqa: E402
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -66,17 +74,19 @@ def load_customers_data(file_path: pathlib.Path) -> pd.DataFrame:
         raise
 
 
-def analyze_most_purchased_products_by_region(cube_df: pd.DataFrame, products_df: pd.DataFrame, customers_df: pd.DataFrame) -> pd.DataFrame:
+def analyze_most_purchased_products_by_region(cube_df: pd.DataFrame, products_df: pd.DataFrame = None, customers_df: pd.DataFrame = None) -> pd.DataFrame:
     """Analyze the most purchased products by region."""
     try:
-        # Merge the OLAP cube with customer data to get Region
-        merged_data = cube_df.merge(customers_df[["CustomerID", "Region"]], on="CustomerID", how="left")
+        # Region is a cube dimension; join customers only for cubes built without it
+        merged_data = cube_df
+        if "Region" not in merged_data.columns:
+            merged_data = merged_data.merge(customers_df[["CustomerID", "Region"]], on="CustomerID", how="left")
 
-        # Merge with product details to get ProductName
-        merged_data = merged_data.merge(products_df[["ProductID", "ProductName"]], on="ProductID", how="left")
+        # Use the ProductName stored in the cube, joining products only for older cubes
+        merged_data = add_dimension_attributes(merged_data, ["ProductName"], products_df=products_df)
 
         # Group by Region and ProductName, sum the sales
-        grouped = merged_data.groupby(["Region", "ProductName"])["SaleAmount_sum"].sum().reset_index()
+        grouped = merged_data.groupby(["Region", "ProductName"], observed=True)["SaleAmount_sum"].sum().reset_index()
 
         logger.info("Most purchased products by region analysis completed successfully.")
         return grouped
@@ -85,27 +95,29 @@ def analyze_most_purchased_products_by_region(cube_df: pd.DataFrame, products_df
         raise
 
 
+def plot_most_purchased_products_by_region(fig, ax, sales_pivot: pd.DataFrame) -> None:
+    """Draw a stacked bar chart of sales by region and product."""
+    sales_pivot.plot(kind="bar", stacked=True, colormap="tab10", ax=ax)
+
+    ax.set_title("Most Purchased Products by Region", fontsize=16)
+    ax.set_xlabel("Region", fontsize=12)
+    ax.set_ylabel("Total Sales (USD)", fontsize=12)
+    ax.tick_params(axis="x", rotation=45)
+    ax.legend(title="Product Name", bbox_to_anchor=(1.05, 1), loc="upper left")
+
+
 def visualize_most_purchased_products_by_region(grouped_data: pd.DataFrame) -> None:
     """Visualize the most purchased products by region using a stacked bar chart."""
     try:
         # Pivot the data to organize sales by Region and ProductName
         sales_pivot = grouped_data.pivot(index="Region", columns="ProductName", values="SaleAmount_sum").fillna(0)
 
-        # Plot the stacked bar chart
-        sales_pivot.plot(kind="bar", stacked=True, figsize=(12, 8), colormap="tab10")
-
-        plt.title("Most Purchased Products by Region", fontsize=16)
-        plt.xlabel("Region", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(rotation=45)
-        plt.legend(title="Product Name", bbox_to_anchor=(1.05, 1), loc="upper left")
-        plt.tight_layout()
-
         # Save the visualization
         output_path = RESULTS_OUTPUT_DIR.joinpath("most_purchased_products_by_region.png")
-        plt.savefig(output_path)
-        logger.info(f"Stacked bar chart saved to {output_path}.")
-        plt.show()
+        if render_chart(plot_most_purchased_products_by_region, sales_pivot, output_path, figsize=(12, 8)):
+            logger.info(f"Stacked bar chart saved to {output_path}.")
+        else:
+            logger.info(f"Stacked bar chart at {output_path} is up to date.")
     except Exception as e:
         logger.error(f"Error visualizing most purchased products by region: {e}")
         raise
@@ -118,11 +130,11 @@ def main():
     # Step 1: Load the precomputed OLAP cube
     cube_df = load_olap_cube(CUBED_FILE)
 
-    # Step 2: Load the product details
-    products_df = load_products_data(PRODUCTS_FILE)
+    # Step 2: Load the product details (only needed for cubes built without ProductName)
+    products_df = None if "ProductName" in cube_df.columns else load_products_data(PRODUCTS_FILE)
 
-    # Step 3: Load the customer details
-    customers_df = load_customers_data(CUSTOMERS_FILE)
+    # Step 3: Load the customer details (only needed for cubes built without Region)
+    customers_df = None if "Region" in cube_df.columns else load_customers_data(CUSTOMERS_FILE)
 
     # Step 4: Analyze most purchased products by region
     grouped_data = analyze_most_purchased_products_by_region(cube_df, products_df, customers_df)
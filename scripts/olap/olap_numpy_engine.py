@@ -0,0 +1,224 @@
+"""
+NumPy OLAP Cube Engine
+File: scripts/olap/olap_numpy_engine.py
+
+An alternative to the pandas groupby in olap_cubing.create_olap_cube().
+
+Instead of hashing composite keys of strings such as DayOfWeek and Region,
+every dimension is dictionary-encoded to small integer codes and each row is
+mapped to a single linear cell index. Aggregation is then done with
+np.bincount / ufunc.at:
+
+- Dense mode: when the cell space (product of the dimension cardinalities) is
+  small, measures are accumulated into dense ndarrays indexed by cell.
+- Sparse mode: otherwise, only the occupied cells are kept as sorted
+  coordinates and measures are accumulated per occupied cell. The codes are
+  combined one dimension at a time and re-factorized whenever the next
+  combination could overflow 64 bits (see compress_cells()), so the index
+  space is bounded by the number of occupied cells, not by the product of
+  the cardinalities.
+
+The output reproduces the SaleAmount_sum / SaleAmount_mean /
+TransactionID_count (and TransactionIDs) columns of the pandas cube.
+"""
+
+import math
+import pathlib
+import sys
+
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+
+# Largest cell space aggregated into dense arrays
+DENSE_CELL_LIMIT: int = 1 << 22
+SUPPORTED_FUNCS = ("sum", "mean", "count", "min", "max")
+
+
+def encode_dimensions(df: pd.DataFrame, dimensions: list) -> tuple:
+    """
+    Dictionary-encode each dimension to integer codes in sorted value order.
+
+    Args:
+        df (pd.DataFrame): The sales data.
+        dimensions (list): Dimension columns to encode.
+
+    Returns:
+        tuple: (codes, uniques) lists, one entry per dimension. Missing values get code -1.
+    """
+    codes, uniques = [], []
+    for dim in dimensions:
+        dim_codes, dim_uniques = pd.factorize(df[dim], sort=True)
+        codes.append(dim_codes.astype(np.int64))
+        uniques.append(np.asarray(dim_uniques))
+    return codes, uniques
+
+
+def linearize_cells(codes: list, cardinalities: tuple) -> np.ndarray:
+    """Map per-dimension codes to one linear (row-major) cell index per row."""
+    if np.prod([float(card) for card in cardinalities]) >= np.iinfo(np.int64).max:
+        raise ValueError("Cell space is too large to linearize into 64-bit indexes.")
+    return np.ravel_multi_index(codes, cardinalities)
+
+
+def compress_cells(codes: list, cardinalities: tuple) -> np.ndarray:
+    """
+    Map per-dimension codes to one cell index per row, for cell spaces of any size.
+
+    The codes are folded in one dimension at a time. When the next fold could
+    overflow int64, the indexes so far are first re-factorized to the distinct
+    values present, which are at most the number of rows. np.unique sorts, so
+    the indexes keep the row-major order of linearize_cells().
+
+    Args:
+        codes (list): Non-negative codes of each dimension, one array per dimension.
+        cardinalities (tuple): Number of distinct values of each dimension.
+
+    Returns:
+        np.ndarray: One int64 cell index per row, ordered like the dimension tuples.
+    """
+    cells, space = codes[0].astype(np.int64), cardinalities[0]
+    for dim_codes, cardinality in zip(codes[1:], cardinalities[1:]):
+        if space * cardinality >= np.iinfo(np.int64).max:
+            uniques, cells = np.unique(cells, return_inverse=True)
+            cells, space = cells.astype(np.int64).ravel(), len(uniques)
+        cells = cells * cardinality + dim_codes
+        space *= cardinality
+    return cells
+
+
+def aggregate_dense(df: pd.DataFrame, dimensions: list, column: str, func: str = "sum") -> tuple:
+    """
+    Aggregate one measure into a dense ndarray shaped by the dimension cardinalities.
+
+    Returns:
+        tuple: (ndarray, uniques) where uniques holds the axis labels of each dimension.
+            Empty cells hold 0 for sum/count and NaN for mean/min/max.
+    """
+    codes, uniques = encode_dimensions(df, dimensions)
+    valid = np.logical_and.reduce([dim_codes >= 0 for dim_codes in codes])
+    cardinalities = tuple(len(dim_uniques) for dim_uniques in uniques)
+    n_cells = int(np.prod(cardinalities))
+    if n_cells > DENSE_CELL_LIMIT:
+        raise ValueError(f"Cell space of {n_cells} cells is too large for a dense array.")
+    cells = linearize_cells([dim_codes[valid] for dim_codes in codes], cardinalities)
+    values = df[column].to_numpy()[valid]
+    measures = _aggregate_measure(cells, n_cells, values, func)
+    return measures.reshape(cardinalities), uniques
+
+
+def _aggregate_measure(slots: np.ndarray, n_slots: int, values: np.ndarray, func: str) -> np.ndarray:
+    """Aggregate values into n_slots cells with bincount / ufunc.at."""
+    if func not in SUPPORTED_FUNCS:
+        raise ValueError(f"Aggregation '{func}' is not supported by the NumPy engine.")
+
+    present = ~pd.isna(values)
+    slots = slots[present]
+    if func == "count":
+        return np.bincount(slots, minlength=n_slots)
+
+    values = values[present].astype(np.float64)
+    if func in ("sum", "mean"):
+        sums = np.bincount(slots, weights=values, minlength=n_slots)
+        if func == "sum":
+            return sums
+        counts = np.bincount(slots, minlength=n_slots)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts
+
+    fill = np.inf if func == "min" else -np.inf
+    result = np.full(n_slots, fill)
+    (np.minimum if func == "min" else np.maximum).at(result, slots, values)
+    result[result == fill] = np.nan
+    return result
+
+
+def create_olap_cube_numpy(
+    sales_df: pd.DataFrame,
+    dimensions: list,
+    metrics: dict,
+    attributes: list = None,
+    traceability: bool = True,
+    dense_limit: int = DENSE_CELL_LIMIT,
+) -> pd.DataFrame:
+    """
+    Create an OLAP cube with integer-coded dimensions and NumPy aggregation.
+
+    Args:
+        sales_df (pd.DataFrame): The sales data.
+        dimensions (list): List of column names to group by.
+        metrics (dict): Dictionary of aggregation functions for metrics.
+        attributes (list, optional): Dimension attribute columns to carry into the cube.
+        traceability (bool): Whether to build the TransactionIDs column.
+        dense_limit (int): Largest cell space aggregated into dense arrays.
+
+    Returns:
+        pd.DataFrame: The multidimensional OLAP cube, in the same layout as
+            olap_cubing.create_olap_cube().
+    """
+    try:
+        attributes = attributes or []
+        codes, uniques = encode_dimensions(sales_df, dimensions)
+
+        # Rows with a missing dimension value are dropped, like the pandas groupby
+        valid = np.logical_and.reduce([dim_codes >= 0 for dim_codes in codes])
+        row_positions = np.flatnonzero(valid)
+        codes = [dim_codes[valid] for dim_codes in codes]
+        cardinalities = tuple(len(dim_uniques) for dim_uniques in uniques)
+        n_cells = math.prod(cardinalities)
+
+        dense = n_cells <= dense_limit
+        if dense:
+            # Dense: one slot per possible cell, keep the occupied ones afterwards
+            slots, n_slots = linearize_cells(codes, cardinalities), n_cells
+            occupied = np.flatnonzero(np.bincount(slots, minlength=n_slots))
+            keep = occupied
+            coordinates = np.unravel_index(occupied, cardinalities)
+        else:
+            # Sparse: one slot per occupied cell, in sorted cell order
+            occupied, first_rows, slots = np.unique(
+                compress_cells(codes, cardinalities), return_index=True, return_inverse=True
+            )
+            slots = slots.ravel()
+            n_slots = len(occupied)
+            keep = np.arange(n_slots)
+            coordinates = [dim_codes[first_rows] for dim_codes in codes]
+
+        cube = pd.DataFrame({
+            dim: dim_uniques[dim_coords]
+            for dim, dim_uniques, dim_coords in zip(dimensions, uniques, coordinates)
+        })
+
+        if (attributes or traceability) and len(keep):
+            # Stable order of rows by slot, preserving the original row order within a cell
+            order = np.argsort(slots, kind="stable")
+            boundaries = np.cumsum(np.bincount(slots, minlength=n_slots)[keep])[:-1]
+
+        if attributes and len(keep):
+            first_rows = row_positions[order[np.concatenate(([0], boundaries))]]
+            for attr in attributes:
+                cube[attr] = sales_df[attr].iloc[first_rows].reset_index(drop=True)
+
+        for column, agg_funcs in metrics.items():
+            values = sales_df[column].to_numpy()[valid]
+            for func in agg_funcs if isinstance(agg_funcs, list) else [agg_funcs]:
+                cube[f"{column}_{func}"] = _aggregate_measure(slots, n_slots, values, func)[keep]
+
+        if traceability and len(keep):
+            transaction_ids = sales_df["TransactionID"].to_numpy()[valid][order]
+            cube["TransactionIDs"] = [ids.tolist() for ids in np.split(transaction_ids, boundaries)]
+        elif traceability:
+            cube["TransactionIDs"] = []
+
+        mode = "dense" if dense else "sparse"
+        logger.info(f"OLAP cube created with dimensions: {dimensions} using the NumPy engine ({mode}, {n_cells} cells)")
+        return cube
+    except Exception as e:
+        logger.error(f"Error creating OLAP cube with the NumPy engine: {e}")
+        raise
@@ -8,16 +8,24 @@ ACTION: Use this information to identify product trends in each region over time
 
 PROCESS:
 1. Load the OLAP cube to get sales data by Month, Region, and ProductID.
-2. Merge the data with product details to include ProductName.
+2. Use the ProductName stored in the cube (merge product details for older cubes).
 3. Filter the data by region.
 4. Create individual line charts for each region with products as the legend.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import pathlib
+import sys
 import logging
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import add_dimension_attributes  # noqa: E402
+from scripts.olap.olap_rendering import MONTH_LABELS, render_charts  # noqa: E402
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -54,14 +62,14 @@ def load_products_data(file_path: pathlib.Path) -> pd.DataFrame:
         raise
 
 
-def analyze_product_sales_by_region(cube_df: pd.DataFrame, products_df: pd.DataFrame) -> dict:
+def analyze_product_sales_by_region(cube_df: pd.DataFrame, products_df: pd.DataFrame = None) -> dict:
     """Analyze product sales for each region by month."""
     try:
-        # Merge the OLAP cube with product details to include ProductName
-        merged_data = cube_df.merge(products_df[["ProductID", "ProductName"]], on="ProductID", how="left")
+        # Use the ProductName stored in the cube, joining products only for older cubes
+        merged_data = add_dimension_attributes(cube_df, ["ProductName"], products_df=products_df)
 
         # Group by Region, Month, and ProductName, and calculate total sales
-        grouped = merged_data.groupby(["Region", "Month", "ProductName"])["SaleAmount_sum"].sum().reset_index()
+        grouped = merged_data.groupby(["Region", "Month", "ProductName"], observed=True)["SaleAmount_sum"].sum().reset_index()
 
         # Organize data by region
         region_data = {}
@@ -75,30 +83,35 @@ def analyze_product_sales_by_region(cube_df: pd.DataFrame, products_df: pd.DataF
         raise
 
 
-def visualize_product_sales_by_region(region_data: dict) -> None:
-    """Visualize product sales for each region using line charts."""
+def plot_product_sales_by_region(fig, ax, sales_pivot: pd.DataFrame, region: str) -> None:
+    """Draw monthly product sales in one region as a line chart."""
+    sales_pivot.plot(kind="line", marker='o', colormap="tab10", ax=ax)
+
+    # Add labels and title
+    ax.set_title(f"Product Sales by Month in {region}", fontsize=16)
+    ax.set_xlabel("Month", fontsize=12)
+    ax.set_ylabel("Total Sales (USD)", fontsize=12)
+    ax.set_xticks(range(1, 13), labels=MONTH_LABELS, rotation=0)
+    ax.legend(title="Product", bbox_to_anchor=(1.05, 1), loc="upper left")
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+
+
+def visualize_product_sales_by_region(region_data: dict, workers: int = None) -> None:
+    """Visualize product sales for each region using line charts, rendered in parallel."""
     try:
+        jobs = []
         for region, data in region_data.items():
             # Pivot the data to organize sales by Month and ProductName
             sales_pivot = data.pivot(index="Month", columns="ProductName", values="SaleAmount_sum").fillna(0)
-
-            # Plot the line chart
-            sales_pivot.plot(kind="line", figsize=(12, 8), marker='o', colormap="tab10")
-
-            # Add labels and title
-            plt.title(f"Product Sales by Month in {region}", fontsize=16)
-            plt.xlabel("Month", fontsize=12)
-            plt.ylabel("Total Sales (USD)", fontsize=12)
-            plt.xticks(ticks=range(1, 13), labels=["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], rotation=0)
-            plt.legend(title="Product", bbox_to_anchor=(1.05, 1), loc="upper left")
-            plt.grid(axis="y", linestyle="--", alpha=0.7)
-            plt.tight_layout()
-
-            # Save the chart
             output_path = RESULTS_OUTPUT_DIR.joinpath(f"product_sales_{region.lower()}_line_chart.png")
-            plt.savefig(output_path)
-            logger.info(f"Line chart saved to {output_path}.")
-            plt.show()
+            jobs.append((plot_product_sales_by_region, sales_pivot, output_path, {"figsize": (12, 8), "region": region}))
+
+        # Save the charts
+        for (_, _, output_path, _), rendered in zip(jobs, render_charts(jobs, workers)):
+            if rendered:
+                logger.info(f"Line chart saved to {output_path}.")
+            else:
+                logger.info(f"Line chart at {output_path} is up to date.")
     except Exception as e:
         logger.error(f"Error visualizing product sales by region: {e}")
         raise
@@ -111,8 +124,8 @@ def main():
     # Step 1: Load the precomputed OLAP cube
     cube_df = load_olap_cube(CUBED_FILE)
 
-    # Step 2: Load the product details
-    products_df = load_products_data(PRODUCTS_FILE)
+    # Step 2: Load the product details (only needed for cubes built without ProductName)
+    products_df = None if "ProductName" in cube_df.columns else load_products_data(PRODUCTS_FILE)
 
     # Step 3: Analyze product sales by region
     region_data = analyze_product_sales_by_region(cube_df, products_df)
@@ -8,16 +8,25 @@ ACTION: Use this information to identify product performance trends over time.
 
 PROCESS:
 1. Load the OLAP cube to get sales data by Month and ProductID.
-2. Load the product details to get ProductName.
-3. Merge the data on ProductID.
+2. Use the ProductName stored in the cube (load product details for older cubes).
+3. Merge the data on ProductID when needed.
 4. Create a stacked column chart to show total sales by product for each month.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import pathlib
+import sys
 import logging
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import add_dimension_attributes  # noqa: E402
+from scripts.olap.olap_month_matrix import MonthMatrix, build_month_matrix  # noqa: E402
+from scripts.olap.olap_rendering import render_chart  # noqa: E402
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -54,15 +63,24 @@ def load_products_data(file_path: pathlib.Path) -> pd.DataFrame:
         raise
 
 
-def analyze_products_sold_by_month(cube_df: pd.DataFrame, products_df: pd.DataFrame) -> pd.DataFrame:
-    """Analyze total sales by Month and ProductID."""
+def analyze_products_sold_by_month(
+    cube_df: pd.DataFrame, products_df: pd.DataFrame = None, months: list = None, month_matrix: MonthMatrix = None
+) -> pd.DataFrame:
+    """
+    Analyze total sales by Month and ProductID.
+
+    months restricts the result to any set of months (default: all). Pass a
+    month x product month_matrix to answer repeated windows without rescanning the cube.
+    """
     try:
-        # Group by Month and ProductID, sum the sales
-        grouped = cube_df.groupby(["Month", "ProductID"])["SaleAmount_sum"].sum().reset_index()
-        grouped.rename(columns={"SaleAmount_sum": "TotalSales"}, inplace=True)
+        if month_matrix is None:
+            # Use the ProductName stored in the cube, joining products only for older cubes
+            cube_df = add_dimension_attributes(cube_df, ["ProductName"], products_df=products_df)
+            month_matrix = build_month_matrix(cube_df, "ProductID", ["SaleAmount_sum"], attributes=["ProductName"])
 
-        # Merge with product details to get ProductName
-        merged_data = grouped.merge(products_df[["ProductID", "ProductName"]], on="ProductID", how="left")
+        # Look up the Month x ProductID sales of the requested months
+        merged_data = month_matrix.month_rows(months).rename(columns={"SaleAmount_sum": "TotalSales"})
+        merged_data = merged_data[["Month", "ProductID", "TotalSales", "ProductName"]]
 
         logger.info("Sales by month and product analysis completed successfully.")
         return merged_data
@@ -70,6 +88,20 @@ def analyze_products_sold_by_month(cube_df: pd.DataFrame, products_df: pd.DataFr
         logger.error(f"Error analyzing sales by month and product: {e}")
         raise
 
+def plot_products_sold_by_month(fig, ax, sales_pivot: pd.DataFrame) -> None:
+    """Draw one line per product of total sales by month."""
+    for product in sales_pivot.columns:
+        ax.plot(sales_pivot.index, sales_pivot[product], marker="o", label=product)
+
+    ax.set_title("Total Sales by Month and Product", fontsize=16)
+    ax.set_xlabel("Month", fontsize=12)
+    ax.set_ylabel("Total Sales (USD)", fontsize=12)
+    ax.set_xticks(sales_pivot.index)
+    ax.tick_params(axis="x", labelsize=10)
+    ax.legend(title="Product Name", bbox_to_anchor=(1.05, 1), loc="upper left")
+    ax.grid(True)
+
+
 def visualize_products_sold_by_month(merged_data: pd.DataFrame) -> None:
     """Visualize total sales by month and product using a line graph."""
     try:
@@ -79,27 +111,16 @@ def visualize_products_sold_by_month(merged_data: pd.DataFrame) -> None:
             columns="ProductName",
             values="TotalSales",
             aggfunc="sum",
-            fill_value=0
+            fill_value=0,
+            observed=True
         )
 
-        # Plot the line graph
-        plt.figure(figsize=(12, 8))
-        for product in sales_pivot.columns:
-            plt.plot(sales_pivot.index, sales_pivot[product], marker="o", label=product)
-
-        plt.title("Total Sales by Month and Product", fontsize=16)
-        plt.xlabel("Month", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(sales_pivot.index, fontsize=10)
-        plt.legend(title="Product Name", bbox_to_anchor=(1.05, 1), loc="upper left")
-        plt.grid(True)
-        plt.tight_layout()
-
         # Save the visualization
         output_path = RESULTS_OUTPUT_DIR.joinpath("products_sold_by_month_line_graph.png")
-        plt.savefig(output_path)
-        logger.info(f"Line graph saved to {output_path}.")
-        plt.show()
+        if render_chart(plot_products_sold_by_month, sales_pivot, output_path, figsize=(12, 8)):
+            logger.info(f"Line graph saved to {output_path}.")
+        else:
+            logger.info(f"Line graph at {output_path} is up to date.")
     except Exception as e:
         logger.error(f"Error visualizing products sold by month: {e}")
         raise
@@ -111,8 +132,8 @@ def main():
     # Step 1: Load the precomputed OLAP cube
     cube_df = load_olap_cube(CUBED_FILE)
 
-    # Step 2: Load the product details
-    products_df = load_products_data(PRODUCTS_FILE)
+    # Step 2: Load the product details (only needed for cubes built without ProductName)
+    products_df = None if "ProductName" in cube_df.columns else load_products_data(PRODUCTS_FILE)
 
     # Step 3: Analyze sales by Month and ProductID
     merged_data = analyze_products_sold_by_month(cube_df, products_df)
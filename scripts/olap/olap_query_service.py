@@ -0,0 +1,420 @@
+"""
+OLAP Query Service
+File: scripts/olap/olap_query_service.py
+
+A long-running local HTTP service that answers the OLAP goal analyses as JSON.
+
+The event loop (asyncio, standard library only) accepts connections and parses
+requests; the aggregations run in a process pool whose workers load the cube
+(and any dimension tables it lacks attributes for) once, through
+olap_report_runner.load_report_data(). The service polls the cube file and,
+when it changes, bumps a data version; each worker reloads its copy the next
+time it sees a request tagged with the new version.
+
+Endpoints (GET):
+    /                                   list the analyses
+    /health                             cube file, data version and worker count
+    /<analysis>?<params>                run an analysis, e.g.
+        /sales_by_month
+        /total_sales_by_region?Region=East
+        /underperforming_products?slow_months=3,10
+        /sales_by_month?months=6,7,8
+        /top_product_by_day?limit=3
+        /customer_rfm?Segment=Champions
+        /rollup?by=Region,Month
+
+Serve the approximate cube (olap_cubing.py --approximate) with --cube-file to
+get estimates; /rollup then returns confidence intervals with each total.
+
+Any query parameter named after a result column filters the rows to that value
+(several values separated by commas); limit caps the number of rows returned.
+
+Invalid parameters (a month outside 1-12, a filter on a column the result
+does not have, ...) are answered with 400. Malformed values are rejected
+before the request reaches a worker; the rest raise QueryError there. Any
+other error raised by an analysis is a failure of the service and answered
+with 500.
+
+Usage:
+    python scripts/olap/olap_query_service.py --port 8765 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from scripts.olap.olap_report_runner import CUBED_FILE, SLOW_MONTHS, load_report_data, month_product_matrix  # noqa: E402
+from scripts.olap.olap_cubing import DB_PATH, rollup_cube  # noqa: E402
+from scripts.olap.olap_sampling import add_confidence_intervals  # noqa: E402
+from scripts.olap.olap_sketches import add_distinct_counts  # noqa: E402
+from scripts.olap import (  # noqa: E402
+    olap_customer_analytics,
+    olap_customer_average_transaction_size,
+    olap_goal_sales_by_day,
+    olap_goal_sales_by_month,
+    olap_goal_top_product_by_day,
+    olap_least_and_best_months_by_region,
+    olap_most_purchased_product_by_region,
+    olap_product_sales_by_region_line_chart,
+    olap_products_sold_by_month,
+    olap_sales_by_contact,
+    olap_total_sales_by_region,
+    olap_underperforming_products,
+)
+
+# Constants
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8765
+POLL_INTERVAL_SECONDS: float = 2.0
+MAX_HEADER_BYTES: int = 16 * 1024
+
+
+class QueryError(ValueError):
+    """Invalid request parameters (HTTP 400), as opposed to an analysis failing (HTTP 500)."""
+
+
+def _product_sales_by_region(data: dict, params: dict) -> pd.DataFrame:
+    region_data = olap_product_sales_by_region_line_chart.analyze_product_sales_by_region(data["cube"], data["products"])
+    return pd.concat(region_data.values(), ignore_index=True) if region_data else pd.DataFrame()
+
+
+def _months(params: dict, name: str = "months", default: list = None) -> list:
+    months = params.pop(name, default)
+    return None if months is None else [int(month) for month in months]
+
+
+def _parse_months(values: list) -> None:
+    months = [int(value) for value in values]
+    if not months or any(month < 1 or month > 12 for month in months):
+        raise QueryError("Months must be between 1 and 12.")
+
+
+def _parse_limit(values: list) -> None:
+    if len(values) != 1 or int(values[0]) < 0:
+        raise QueryError("limit must be one non-negative integer.")
+
+
+def _parse_confidence(values: list) -> None:
+    if len(values) != 1 or not 0 < float(values[0]) < 1:
+        raise QueryError("confidence must be one number between 0 and 1.")
+
+
+def _parse_date(values: list) -> None:
+    if len(values) != 1:
+        raise QueryError("Expected one date.")
+    pd.Timestamp(values[0])
+
+
+# Parameter consumed by an endpoint (or filter_rows) -> check of its values
+PARAMETER_CHECKS: dict = {
+    "months": _parse_months,
+    "slow_months": _parse_months,
+    "limit": _parse_limit,
+    "confidence": _parse_confidence,
+    "as_of": _parse_date,
+}
+
+
+def validate_params(params: dict) -> None:
+    """
+    Check the values of the parameters the endpoints consume, before any analysis runs.
+
+    Raises:
+        QueryError: If a value is malformed or out of range.
+    """
+    for name, check in PARAMETER_CHECKS.items():
+        if name in params:
+            try:
+                check(params[name])
+            except QueryError:
+                raise
+            except ValueError as e:
+                raise QueryError(f"Invalid value for {name}: {params[name]} ({e}).")
+
+
+def _sales_by_month(data: dict, params: dict) -> pd.DataFrame:
+    return olap_goal_sales_by_month.analyze_sales_by_month(
+        data["cube"], _months(params), month_product_matrix(data)
+    )
+
+
+def _products_sold_by_month(data: dict, params: dict) -> pd.DataFrame:
+    return olap_products_sold_by_month.analyze_products_sold_by_month(
+        data["cube"], data["products"], _months(params), month_product_matrix(data)
+    )
+
+
+def _underperforming_products(data: dict, params: dict) -> pd.DataFrame:
+    return olap_underperforming_products.analyze_underperforming_products(
+        data["cube"], data["products"], _months(params, "slow_months", SLOW_MONTHS), month_product_matrix(data)
+    )
+
+
+def _customer_rfm(data: dict, params: dict) -> pd.DataFrame:
+    # Read-only: aggregate straight from the warehouse rather than touching the incremental state file
+    as_of = params.pop("as_of", [None])[0]
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        customers = olap_customer_analytics.aggregate_customer_sales(conn)
+    finally:
+        conn.close()
+    return olap_customer_analytics.compute_rfm(customers, as_of)
+
+
+def _rollup(data: dict, params: dict) -> pd.DataFrame:
+    # Totals of an approximate cube carry _var columns; recompute their intervals after the rollup.
+    # Distinct-count sketches are merged by the rollup and estimated here.
+    by = params.pop("by", [])
+    confidence = float(params.pop("confidence", [0.95])[0])
+    cube = data["cube"].drop(columns=["TransactionIDs"], errors="ignore")
+    unknown = [dim for dim in by if dim not in cube.columns]
+    if unknown:
+        raise QueryError(f"Unknown dimensions {unknown}.")
+    rolled = add_confidence_intervals(add_distinct_counts(rollup_cube(cube, by, sketches=True)), confidence)
+    return rolled[[col for col in rolled.columns if not col.endswith("_hll")]]
+
+
+# Endpoint name -> function(data, params) returning the result frame. Parameters the
+# function consumes are popped from params; the rest filter the result rows.
+ENDPOINTS: dict = {
+    "sales_by_day": lambda data, params: olap_goal_sales_by_day.analyze_sales_by_weekday(data["cube"]),
+    "sales_by_month": _sales_by_month,
+    "top_product_by_day": lambda data, params: olap_goal_top_product_by_day.analyze_top_product_by_weekday(
+        data["cube"], data["products"]
+    ),
+    "least_and_best_months_by_region": lambda data, params: (
+        olap_least_and_best_months_by_region.analyze_least_and_best_performing_months_by_region(
+            data["cube"], data["customers"]
+        )
+    ),
+    "most_purchased_product_by_region": lambda data, params: (
+        olap_most_purchased_product_by_region.analyze_most_purchased_products_by_region(
+            data["cube"], data["products"], data["customers"]
+        )
+    ),
+    "product_sales_by_region": _product_sales_by_region,
+    "products_sold_by_month": _products_sold_by_month,
+    "sales_by_contact": lambda data, params: olap_sales_by_contact.analyze_sales_and_contact(
+        data["cube"], data["customers"]
+    ),
+    "total_sales_by_region": lambda data, params: olap_total_sales_by_region.analyze_sales_by_month_and_region(
+        data["cube"], data["customers"]
+    ),
+    "underperforming_products": _underperforming_products,
+    "customer_average_transaction_size": lambda data, params: (
+        olap_customer_average_transaction_size.calculate_average_transaction_size(data["cube"])
+    ),
+    "customer_rfm": _customer_rfm,
+    "rollup": _rollup,
+}
+
+# Data loaded by each worker process, tagged with the version it was loaded for
+_worker_state: dict = {"version": None, "data": None}
+
+
+def _init_worker(cube_file: str, version: int) -> None:
+    """Load the shared data once when a worker process starts."""
+    _worker_state["data"] = load_report_data(pathlib.Path(cube_file))
+    _worker_state["version"] = version
+
+
+def parse_query(query: str) -> dict:
+    """Parse a query string into {name: [values]}, splitting comma-separated values."""
+    params = {}
+    for name, values in parse_qs(query, keep_blank_values=False).items():
+        params[name] = [part for value in values for part in value.split(",") if part != ""]
+    return params
+
+
+def filter_rows(result: pd.DataFrame, params: dict) -> pd.DataFrame:
+    """
+    Apply the remaining query parameters to a result frame.
+
+    Args:
+        result (pd.DataFrame): The analysis result.
+        params (dict): {column: [values]} filters, plus an optional "limit".
+
+    Returns:
+        pd.DataFrame: The filtered rows.
+
+    Raises:
+        QueryError: If a parameter names no column of the result.
+    """
+    params = dict(params)
+    limit = params.pop("limit", None)
+    unknown = [name for name in params if name not in result.columns]
+    if unknown:
+        raise QueryError(f"Unknown parameters {unknown}; result columns are {list(result.columns)}.")
+
+    for column, values in params.items():
+        # Compare as text so that ?Month=3 matches integer months
+        result = result[result[column].astype(str).isin(values)]
+    if limit:
+        result = result.head(int(limit[0]))
+    return result
+
+
+def run_analysis(name: str, params: dict, cube_file: str, version: int) -> str:
+    """
+    Run one analysis in a worker process and return the JSON response body.
+
+    The worker reloads its data first if the cube has changed since it was loaded.
+    """
+    if _worker_state["version"] != version:
+        logger.info(f"Reloading OLAP data (version {version}) in worker {os.getpid()}.")
+        _init_worker(cube_file, version)
+
+    start = time.perf_counter()
+    params = dict(params)
+    result = ENDPOINTS[name](_worker_state["data"], params)
+    result = filter_rows(result, params)
+    rows = json.loads(result.to_json(orient="records", date_format="iso"))
+    return json.dumps({
+        "analysis": name,
+        "version": version,
+        "rows": rows,
+        "seconds": round(time.perf_counter() - start, 6),
+    })
+
+
+class OlapQueryService:
+    """asyncio HTTP front end dispatching analyses to a process pool."""
+
+    def __init__(self, cube_file: pathlib.Path = CUBED_FILE, workers: int = None,
+                 poll_interval: float = POLL_INTERVAL_SECONDS):
+        self.cube_file = pathlib.Path(cube_file)
+        self.poll_interval = poll_interval
+        self.workers = workers or os.cpu_count() or 1
+        self._mtime_ns = self.cube_file.stat().st_mtime_ns
+        self.version = 1
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(str(self.cube_file), self.version),
+        )
+
+    def check_cube(self) -> bool:
+        """Bump the data version if the cube file changed since the last check; return whether it did."""
+        try:
+            mtime_ns = self.cube_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            # The cube is being rewritten; keep serving the loaded version
+            return False
+        if mtime_ns == self._mtime_ns:
+            return False
+        self._mtime_ns = mtime_ns
+        self.version += 1
+        logger.info(f"Cube file {self.cube_file} changed; serving data version {self.version}.")
+        return True
+
+    async def watch_cube(self) -> None:
+        """Poll the cube file and bump the data version when it changes."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self.check_cube()
+
+    async def dispatch(self, method: str, target: str) -> tuple:
+        """Route one request and return (status, body)."""
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Only GET is supported."}
+
+        url = urlsplit(target)
+        name = url.path.strip("/")
+        if name == "":
+            return HTTPStatus.OK, {"analyses": list(ENDPOINTS)}
+        if name == "health":
+            return HTTPStatus.OK, {
+                "cube_file": str(self.cube_file),
+                "version": self.version,
+                "workers": self.workers,
+            }
+        if name not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown analysis '{name}'.", "analyses": list(ENDPOINTS)}
+
+        params = parse_query(url.query)
+        loop = asyncio.get_running_loop()
+        try:
+            validate_params(params)
+            body = await loop.run_in_executor(
+                self.executor, run_analysis, name, params, str(self.cube_file), self.version
+            )
+            return HTTPStatus.OK, body
+        except QueryError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:
+            logger.error(f"Analysis {name} failed: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one HTTP/1.1 request per connection."""
+        try:
+            header = await reader.readuntil(b"\r\n\r\n")
+            if len(header) > MAX_HEADER_BYTES:
+                raise ValueError("Request header too large.")
+            request_line = header.split(b"\r\n", 1)[0].decode("latin-1")
+            method, target, _ = request_line.split(" ", 2)
+            status, body = await self.dispatch(method, target)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            status, body = HTTPStatus.BAD_REQUEST, {"error": "Malformed request."}
+
+        payload = (body if isinstance(body, str) else json.dumps(body)).encode()
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode() + payload
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        """Serve requests until cancelled."""
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        watcher = asyncio.create_task(self.watch_cube())
+        logger.info(f"OLAP query service listening on http://{host}:{port} with {self.workers} workers.")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+            self.executor.shutdown(cancel_futures=True)
+
+
+def main():
+    """Main function for running the OLAP query service."""
+    parser = argparse.ArgumentParser(description="Serve the OLAP goal analyses as JSON over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL_SECONDS,
+                        help="Seconds between checks of the cube file for changes.")
+    parser.add_argument("--cube-file", type=pathlib.Path, default=CUBED_FILE)
+    args = parser.parse_args()
+
+    service = OlapQueryService(args.cube_file, args.workers, args.poll_interval)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        logger.info("OLAP query service stopped.")
+
+
+if __name__ == "__main__":
+    main()
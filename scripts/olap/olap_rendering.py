@@ -0,0 +1,137 @@
+"""
+OLAP Chart Rendering
+File: scripts/olap/olap_rendering.py
+
+Headless rendering for the OLAP goal charts.
+
+Figures are built with the object-oriented Matplotlib API (matplotlib.figure.Figure
+with the Agg canvas), never through the global pyplot state, so nothing blocks on
+plt.show() and no figure outlives its chart. Each chart is described by a plot
+function that draws on an Axes plus the DataFrame it plots:
+
+    def plot_sales(fig, ax, data):
+        ax.bar(data["Month"], data["TotalSales"])
+
+    render_chart(plot_sales, sales_df, RESULTS_OUTPUT_DIR.joinpath("sales.png"))
+
+Matplotlib is imported lazily, when the first chart is actually drawn, so
+scripts whose charts are all up to date never load it.
+
+A chart is skipped when its plot function, data and options hash to the same
+value as the last render of that file. Independent charts can be rendered
+concurrently in a process pool with render_charts().
+"""
+
+import os
+import pathlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.content_hash import hash_dataframe, hash_values  # noqa: E402
+from utils.instrumentation import timed  # noqa: E402
+from utils.lazy_import import lazy_import  # noqa: E402
+
+mpl_figure = lazy_import("matplotlib.figure")
+
+MONTH_LABELS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def _fingerprint_path(output_path: pathlib.Path) -> pathlib.Path:
+    """Return the hidden file holding the input fingerprint of a rendered chart."""
+    return output_path.parent.joinpath(f".{output_path.name}.sha256")
+
+
+def chart_fingerprint(plot_func, data: pd.DataFrame, options: dict) -> str:
+    """Hash the plot function's code, the plotted data and the render options."""
+    code = plot_func.__code__
+    return hash_values(
+        plot_func.__module__,
+        plot_func.__qualname__,
+        code.co_code.hex(),
+        repr(code.co_consts),
+        hash_dataframe(data),
+        options,
+    )
+
+
+@timed("render {output_path}")
+def render_chart(
+    plot_func,
+    data: pd.DataFrame,
+    output_path: pathlib.Path,
+    figsize: tuple = (10, 6),
+    force: bool = False,
+    **plot_kwargs,
+) -> bool:
+    """
+    Render one chart to a PNG file without touching the pyplot state.
+
+    Args:
+        plot_func (callable): Function drawing the chart, called as plot_func(fig, ax, data, **plot_kwargs).
+        data (pd.DataFrame): The data to plot.
+        output_path (pathlib.Path): Where to save the PNG.
+        figsize (tuple): Figure size in inches.
+        force (bool): Render even if the inputs are unchanged since the last render.
+        **plot_kwargs: Extra arguments for plot_func.
+
+    Returns:
+        bool: True if the chart was rendered, False if it was skipped as up to date.
+    """
+    output_path = pathlib.Path(output_path)
+    fingerprint_file = _fingerprint_path(output_path)
+    fingerprint = chart_fingerprint(plot_func, data, {"figsize": figsize, **plot_kwargs})
+    if (
+        not force
+        and output_path.exists()
+        and fingerprint_file.exists()
+        and fingerprint_file.read_text() == fingerprint
+    ):
+        return False
+
+    fig = mpl_figure.Figure(figsize=figsize)
+    try:
+        ax = fig.add_subplot()
+        plot_func(fig, ax, data, **plot_kwargs)
+        fig.tight_layout()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(output_path)
+    finally:
+        # Release the figure's artists right away instead of waiting for garbage collection
+        fig.clear()
+
+    fingerprint_file.write_text(fingerprint)
+    return True
+
+
+def _render_job(job: tuple) -> bool:
+    """Render one (plot_func, data, output_path, options) job in a worker process."""
+    plot_func, data, output_path, options = job
+    return render_chart(plot_func, data, output_path, **options)
+
+
+def render_charts(jobs: list, workers: int = None) -> list:
+    """
+    Render independent charts, in a process pool when there is more than one.
+
+    Args:
+        jobs (list): List of (plot_func, data, output_path, options) tuples, where
+            options holds keyword arguments for render_chart(). plot_func must be a
+            module-level function so it can be sent to a worker process.
+        workers (int, optional): Worker processes (default: one per chart, up to the CPU count).
+
+    Returns:
+        list: For each job, True if rendered or False if skipped as up to date.
+    """
+    if len(jobs) <= 1 or workers == 1:
+        return [_render_job(job) for job in jobs]
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_render_job, jobs))
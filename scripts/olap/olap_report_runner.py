@@ -0,0 +1,351 @@
+"""
+OLAP Report Runner
+File: scripts/olap/olap_report_runner.py
+
+Runs the OLAP goal analyses in a single process against shared in-memory data.
+
+Running each scripts/olap/*.py file separately re-imports pandas and
+matplotlib and re-reads the cube and the dimension CSVs. This runner loads
+the cube (and the dimension tables, only if the cube was built without their
+attributes) once, runs any selected subset of the analyses, writes all CSVs
+and PNGs (charts are rendered headlessly by olap_rendering), and reports
+per-analysis timings.
+
+Usage:
+    python scripts/olap/olap_report_runner.py                 # run every analysis
+    python scripts/olap/olap_report_runner.py sales_by_month top_product_by_day
+    python scripts/olap/olap_report_runner.py --list
+    python scripts/olap/olap_report_runner.py --no-cache     # recompute cached analyses
+    python scripts/olap/olap_report_runner.py --approximate  # use the sampled cube from olap_sampling
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from utils.instrumentation import stage  # noqa: E402
+from utils.profiling import enable_profiling, profile_dir, write_profile_report, written_profiles  # noqa: E402
+from scripts.olap.olap_cubing import CUSTOMERS_FILE, DIMENSION_ATTRIBUTES, OLAP_OUTPUT_DIR, PRODUCTS_FILE  # noqa: E402
+from scripts.olap.olap_result_cache import ResultCache  # noqa: E402
+from scripts.olap.olap_sampling import APPROX_CUBE_FILENAME  # noqa: E402
+from scripts.olap.olap_view_selection import record_query  # noqa: E402
+from scripts.olap import (  # noqa: E402
+    olap_campaign_store_analysis,
+    olap_customer_analytics,
+    olap_customer_average_transaction_size,
+    olap_goal_sales_by_day,
+    olap_goal_sales_by_month,
+    olap_goal_top_product_by_day,
+    olap_least_and_best_months_by_region,
+    olap_most_purchased_product_by_region,
+    olap_product_sales_by_region_line_chart,
+    olap_products_sold_by_month,
+    olap_sales_by_contact,
+    olap_total_sales_by_region,
+    olap_time_hierarchy,
+    olap_underperforming_products,
+)
+
+# Constants
+CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.csv")
+APPROX_CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath(APPROX_CUBE_FILENAME)
+SLOW_MONTHS = [3, 10]  # March and October, as in olap_underperforming_products
+
+
+def load_report_data(
+    cube_file: pathlib.Path = CUBED_FILE,
+    products_file: pathlib.Path = PRODUCTS_FILE,
+    customers_file: pathlib.Path = CUSTOMERS_FILE,
+) -> dict:
+    """
+    Load the cube once, plus any dimension table whose attributes the cube lacks.
+
+    Returns:
+        dict: Shared data with keys "cube", "products", "customers" and "files"
+            (the paths of those three inputs, used in result cache keys).
+    """
+    cube_df = pd.read_csv(cube_file, dtype={attr: "category" for attr in DIMENSION_ATTRIBUTES})
+    logger.info(f"OLAP cube data successfully loaded from {cube_file}.")
+
+    product_attributes = [attr for attr, key in DIMENSION_ATTRIBUTES.items() if key == "ProductID"]
+    customer_attributes = [attr for attr, key in DIMENSION_ATTRIBUTES.items() if key == "CustomerID"] + ["Region"]
+    products_df = customers_df = None
+    if not set(product_attributes) <= set(cube_df.columns):
+        products_df = pd.read_csv(products_file)
+        logger.info(f"Products data successfully loaded from {products_file}.")
+    if not set(customer_attributes) <= set(cube_df.columns):
+        customers_df = pd.read_csv(customers_file)
+        logger.info(f"Customers data successfully loaded from {customers_file}.")
+    files = {"cube": cube_file, "products": products_file, "customers": customers_file}
+    return {"cube": cube_df, "products": products_df, "customers": customers_df, "files": files}
+
+
+def cached_result(
+    data: dict, analysis: str, inputs: list, compute, params: dict = None, module=None
+) -> pd.DataFrame:
+    """Serve an analysis result from data["cache"] when one is set, else compute it.
+
+    inputs names the entries of data["files"] the analysis may read and module
+    is the goal script computing it, so the key matches the one the standalone
+    goal script uses for the same analysis. A dimension table that was not
+    loaded (the cube already carries its attributes) is not part of the key.
+    """
+    cache = data.get("cache")
+    if cache is None:
+        return compute()
+    files = [data["files"][name] for name in inputs if name == "cube" or data.get(name) is not None]
+    return cache.get_or_compute(analysis, files, compute, params, module)
+
+
+def month_product_matrix(data: dict):
+    """Return the shared month x product matrix, building it from the cube on first use."""
+    if data.get("month_product_matrix") is None:
+        data["month_product_matrix"] = olap_underperforming_products.build_month_product_matrix(
+            data["cube"], data["products"]
+        )
+    return data["month_product_matrix"]
+
+
+def run_sales_by_day(data: dict) -> None:
+    """Total sales by day of the week and the least profitable day."""
+    sales_by_weekday = olap_goal_sales_by_day.analyze_sales_by_weekday(data["cube"])
+    olap_goal_sales_by_day.identify_least_profitable_day(sales_by_weekday)
+    olap_goal_sales_by_day.visualize_sales_by_weekday(sales_by_weekday)
+
+
+def run_sales_by_month(data: dict) -> None:
+    """Total sales by month."""
+    sales_by_month = olap_goal_sales_by_month.analyze_sales_by_month(
+        data["cube"], month_matrix=month_product_matrix(data)
+    )
+    olap_goal_sales_by_month.visualize_sales_by_month(sales_by_month)
+
+
+def run_top_product_by_day(data: dict) -> None:
+    """Top product for each day of the week, and total sales by category."""
+    top_products = cached_result(
+        data,
+        "top_product_by_weekday",
+        ["cube", "products"],
+        lambda: olap_goal_top_product_by_day.analyze_top_product_by_weekday(data["cube"], data["products"]),
+        module=olap_goal_top_product_by_day,
+    )
+    olap_goal_top_product_by_day.save_results_to_csv(top_products, "top_product_by_weekday.csv")
+    olap_goal_top_product_by_day.visualize_sales_by_weekday_and_product(data["cube"], data["products"])
+    olap_goal_top_product_by_day.visualize_total_sales_by_category(data["cube"], data["products"])
+
+
+def run_least_and_best_months_by_region(data: dict) -> None:
+    """Least and best performing months for each region."""
+    results = cached_result(
+        data,
+        "least_and_best_months_by_region",
+        ["cube", "customers"],
+        lambda: olap_least_and_best_months_by_region.analyze_least_and_best_performing_months_by_region(
+            data["cube"], data["customers"]
+        ),
+        module=olap_least_and_best_months_by_region,
+    )
+    olap_least_and_best_months_by_region.save_results_to_csv(results, "least_and_best_performing_months_by_region.csv")
+
+
+def run_most_purchased_product_by_region(data: dict) -> None:
+    """Most purchased products by region."""
+    grouped = olap_most_purchased_product_by_region.analyze_most_purchased_products_by_region(
+        data["cube"], data["products"], data["customers"]
+    )
+    olap_most_purchased_product_by_region.visualize_most_purchased_products_by_region(grouped)
+
+
+def run_product_sales_by_region(data: dict) -> None:
+    """Monthly product sales line chart for each region."""
+    region_data = olap_product_sales_by_region_line_chart.analyze_product_sales_by_region(data["cube"], data["products"])
+    olap_product_sales_by_region_line_chart.visualize_product_sales_by_region(region_data)
+
+
+def run_products_sold_by_month(data: dict) -> None:
+    """Total sales by month and product."""
+    merged_data = olap_products_sold_by_month.analyze_products_sold_by_month(
+        data["cube"], data["products"], month_matrix=month_product_matrix(data)
+    )
+    olap_products_sold_by_month.visualize_products_sold_by_month(merged_data)
+
+
+def run_sales_by_contact(data: dict) -> None:
+    """Total sales by preferred contact method."""
+    merged_data = olap_sales_by_contact.analyze_sales_and_contact(data["cube"], data["customers"])
+    olap_sales_by_contact.visualize_sales_by_contact_method(merged_data)
+
+
+def run_total_sales_by_region(data: dict) -> None:
+    """Total sales by month and region."""
+    grouped = olap_total_sales_by_region.analyze_sales_by_month_and_region(data["cube"], data["customers"])
+    olap_total_sales_by_region.visualize_sales_by_month_and_region(grouped)
+
+
+def run_underperforming_products(data: dict) -> None:
+    """Underperforming products during the slow months."""
+    results = cached_result(
+        data,
+        "underperforming_products",
+        ["cube", "products"],
+        lambda: olap_underperforming_products.analyze_underperforming_products(
+            data["cube"], data["products"], SLOW_MONTHS, month_product_matrix(data)
+        ),
+        {"slow_months": SLOW_MONTHS},
+        module=olap_underperforming_products,
+    )
+    olap_underperforming_products.save_results_to_csv(results, "underperforming_products.csv")
+
+
+def run_sales_by_quarter(data: dict) -> None:
+    """Total sales by quarter and year-over-year growth, rolled up the time hierarchy."""
+    quarterly = olap_time_hierarchy.quarterly_report(data["cube"])
+    olap_time_hierarchy.save_results_to_csv(quarterly, "sales_by_quarter.csv")
+    yoy = olap_time_hierarchy.year_over_year(data["cube"])
+    olap_time_hierarchy.save_results_to_csv(yoy, "yoy_sales_by_quarter.csv")
+
+
+def run_customer_average_transaction_size(data: dict) -> None:
+    """Average transaction size for each customer."""
+    customer_stats = cached_result(
+        data,
+        "customer_average_transaction_size",
+        ["cube"],
+        lambda: olap_customer_average_transaction_size.calculate_average_transaction_size(data["cube"]),
+        module=olap_customer_average_transaction_size,
+    )
+    olap_customer_average_transaction_size.save_results_to_csv(customer_stats, "customer_average_transaction_size.csv")
+    olap_customer_average_transaction_size.visualize_average_transaction_size(customer_stats)
+
+
+def run_customer_rfm(data: dict) -> None:
+    """Customer RFM scores, segments and lifetime value, updated incrementally from the warehouse."""
+    state = olap_customer_analytics.update_customer_state()
+    rfm = olap_customer_analytics.compute_rfm(state["customers"])
+    olap_customer_analytics.save_results_to_csv(rfm, "customer_rfm.csv")
+    segments = olap_customer_analytics.summarize_segments(rfm)
+    olap_customer_analytics.save_results_to_csv(segments, "customer_segments.csv")
+
+
+def run_sales_by_campaign_and_store(data: dict) -> None:
+    """Gross versus net sales by campaign, and by store and payment type."""
+    by_campaign = olap_campaign_store_analysis.discount_report(data["cube"], ["CampaignID"])
+    olap_campaign_store_analysis.save_results_to_csv(by_campaign, "sales_by_campaign.csv")
+    olap_campaign_store_analysis.visualize_gross_and_net_by_campaign(by_campaign)
+    by_store = olap_campaign_store_analysis.discount_report(data["cube"], ["StoreID", "PaymentType"])
+    olap_campaign_store_analysis.save_results_to_csv(by_store, "sales_by_store_and_payment_type.csv")
+
+
+# Analysis name -> (runner, cube group-bys it issues)
+ANALYSES: dict = {
+    "sales_by_day": (run_sales_by_day, [("DayOfWeek",)]),
+    "sales_by_month": (run_sales_by_month, [("Month",)]),
+    "sales_by_quarter": (run_sales_by_quarter, [("Year", "Quarter")]),
+    "top_product_by_day": (run_top_product_by_day, [("DayOfWeek", "ProductID")]),
+    "least_and_best_months_by_region": (run_least_and_best_months_by_region, [("Month", "Region")]),
+    "most_purchased_product_by_region": (run_most_purchased_product_by_region, [("Region", "ProductID")]),
+    "product_sales_by_region": (run_product_sales_by_region, [("Month", "Region", "ProductID")]),
+    "products_sold_by_month": (run_products_sold_by_month, [("Month", "ProductID")]),
+    "sales_by_contact": (run_sales_by_contact, [("CustomerID",)]),
+    "total_sales_by_region": (run_total_sales_by_region, [("Month", "Region")]),
+    "underperforming_products": (run_underperforming_products, [("Month", "ProductID")]),
+    "customer_average_transaction_size": (run_customer_average_transaction_size, [("CustomerID",)]),
+    "sales_by_campaign_and_store": (
+        run_sales_by_campaign_and_store, [("CampaignID",), ("StoreID", "PaymentType")]
+    ),
+    # Reads the warehouse sales table, not the cube
+    "customer_rfm": (run_customer_rfm, []),
+}
+
+
+def run_reports(data: dict, names: list = None, record_workload: bool = False) -> pd.DataFrame:
+    """
+    Run the selected analyses against the shared data.
+
+    Args:
+        data (dict): Shared data from load_report_data().
+        names (list, optional): Analyses to run (default: all of them).
+        record_workload (bool): Append each analysis' group-bys to the view-selection workload log.
+
+    Returns:
+        pd.DataFrame: Per-analysis status and timings in seconds.
+    """
+    names = names or list(ANALYSES)
+    unknown = [name for name in names if name not in ANALYSES]
+    if unknown:
+        raise ValueError(f"Unknown analyses: {unknown}. Available: {list(ANALYSES)}")
+
+    timings = []
+    for name in names:
+        runner, queries = ANALYSES[name]
+        start = time.perf_counter()
+        try:
+            with stage(f"analysis: {name}"):
+                runner(data)
+            status = "ok"
+        except Exception as e:
+            logger.error(f"Analysis {name} failed: {e}")
+            status = "failed"
+        timings.append({"Analysis": name, "Status": status, "Seconds": time.perf_counter() - start})
+        if record_workload:
+            for query in queries:
+                record_query(query)
+
+    return pd.DataFrame(timings)
+
+
+def main():
+    """Main function for running the OLAP report pack."""
+    parser = argparse.ArgumentParser(description="Run the OLAP goal analyses in one process.")
+    parser.add_argument("analyses", nargs="*", help="Analyses to run (default: all).")
+    parser.add_argument("--list", action="store_true", help="List the available analyses and exit.")
+    parser.add_argument("--record-workload", action="store_true",
+                        help="Record the cube group-bys for olap_view_selection.py.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Recompute analyses instead of serving them from the result cache.")
+    parser.add_argument("--approximate", action="store_true",
+                        help="Run against the approximate cube built by olap_cubing.py --approximate.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile each analysis with cProfile (see utils/profiling.py).")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(ANALYSES))
+        return
+
+    if args.profile:
+        enable_profiling(profile_dir())
+    logger.info("Starting OLAP report runner...")
+    start = time.perf_counter()
+    if args.approximate:
+        logger.warning(f"Running on the sampled cube {APPROX_CUBED_FILE}; results are estimates.")
+    with stage("load report data"):
+        data = load_report_data(APPROX_CUBED_FILE if args.approximate else CUBED_FILE)
+    data["cache"] = None if args.no_cache else ResultCache()
+    load_seconds = time.perf_counter() - start
+
+    timings = run_reports(data, args.analyses, args.record_workload)
+    logger.info(f"Shared data loaded in {load_seconds:.3f}s")
+    logger.info("Per-analysis timings:\n" + timings.to_string(index=False, float_format="{:.3f}".format))
+    logger.info(f"Report pack completed in {time.perf_counter() - start:.3f}s")
+    if profile_dir() is not None:
+        # Named after the analyses, as run_pipeline.py runs several runners at once
+        report_name = f"olap_report_runner_{'_'.join(args.analyses) or 'all'}_top_functions.txt"
+        write_profile_report(written_profiles(), profile_dir().joinpath(report_name))
+
+    if (timings["Status"] != "ok").any():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+OLAP Result Cache
+File: scripts/olap/olap_result_cache.py
+
+A content-addressed, size-bounded cache for the result frames of the OLAP goal analyses.
+
+A result is keyed by the analysis name, its parameters (e.g. slow_months),
+the SHA-256 content hashes of the input files it reads (the cube and any
+dimension tables) and of the source of the module computing it, so editing the
+analysis invalidates its results. Only that module is hashed: after changing a
+helper it imports, clear the cache (olap_report_runner.py --no-cache recomputes).
+Every input file must exist. Results are pickled to the cache directory; when the
+directory grows past max_bytes the least recently used results are evicted.
+
+File hashes are memoized by (size, mtime) in the cache directory, so a cache
+hit only stats the inputs and never reads or parses the cube:
+
+    cache = ResultCache()
+    results = cache.get_or_compute(
+        "least_and_best_months_by_region",
+        [CUBED_FILE, CUSTOMERS_FILE],
+        lambda: analyze_least_and_best_performing_months_by_region(load_olap_cube(CUBED_FILE)),
+    )
+"""
+
+import inspect
+import json
+import os
+import pathlib
+import sys
+
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from utils.content_hash import hash_file, hash_values  # noqa: E402
+
+# Constants
+RESULT_CACHE_DIR: pathlib.Path = pathlib.Path("data").joinpath("cache").joinpath("olap_results")
+DEFAULT_MAX_BYTES: int = 256 * 1024 * 1024
+INPUT_HASHES_FILE: str = "input_hashes.json"
+RESULT_SUFFIX: str = ".pkl"
+
+
+class ResultCache:
+    """Content-addressed on-disk cache of analysis result frames with LRU eviction by size."""
+
+    def __init__(self, cache_dir: pathlib.Path = RESULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._input_hashes_file = self.cache_dir.joinpath(INPUT_HASHES_FILE)
+
+    def _load_input_hashes(self) -> dict:
+        """Load the (size, mtime) -> content hash memo of the input files."""
+        try:
+            return json.loads(self._input_hashes_file.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def input_hash(self, file_path: pathlib.Path) -> str:
+        """
+        Return the content hash of an input file, re-reading it only if its size or mtime changed.
+
+        Args:
+            file_path (pathlib.Path): The input file.
+
+        Returns:
+            str: SHA-256 hex digest of the file contents.
+        """
+        file_path = pathlib.Path(file_path).resolve()
+        stat = file_path.stat()
+        memo = self._load_input_hashes()
+        entry = memo.get(str(file_path))
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+
+        digest = hash_file(file_path)
+        memo[str(file_path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        tmp_file = self._input_hashes_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(memo, indent=2))
+        os.replace(tmp_file, self._input_hashes_file)
+        return digest
+
+    def code_hash(self, code) -> str:
+        """Return the content hash of the source file defining a module, class or function."""
+        return self.input_hash(inspect.getsourcefile(code))
+
+    def key(self, analysis: str, input_files: list, params: dict = None, code=None) -> str:
+        """
+        Build the cache key from the analysis name, its parameters, its inputs' and its code's content hashes.
+
+        Args:
+            analysis (str): Name of the analysis.
+            input_files (list): Files the analysis reads.
+            params (dict, optional): Parameters of the analysis.
+            code (optional): Module (or function) computing the result, whose source file is hashed.
+
+        Raises:
+            FileNotFoundError: If an input file does not exist.
+        """
+        missing = [str(path) for path in input_files if not pathlib.Path(path).exists()]
+        if missing:
+            raise FileNotFoundError(f"Input files of {analysis} not found: {missing}")
+        input_hashes = [self.input_hash(path) for path in input_files]
+        code_hash = self.code_hash(code) if code is not None else None
+        return hash_values(analysis, params or {}, input_hashes, code_hash)
+
+    def _result_path(self, key: str) -> pathlib.Path:
+        return self.cache_dir.joinpath(f"{key}{RESULT_SUFFIX}")
+
+    def get(self, key: str) -> pd.DataFrame:
+        """Return the cached frame for a key, or None on a miss."""
+        result_path = self._result_path(key)
+        try:
+            result = pd.read_pickle(result_path)
+        except FileNotFoundError:
+            return None
+        # Mark as recently used for LRU eviction
+        os.utime(result_path)
+        return result
+
+    def put(self, key: str, result: pd.DataFrame) -> None:
+        """Store a result frame, then evict least recently used results beyond max_bytes."""
+        result_path = self._result_path(key)
+        tmp_path = result_path.with_suffix(f".{os.getpid()}.tmp")
+        result.to_pickle(tmp_path)
+        os.replace(tmp_path, result_path)
+        self.evict()
+
+    def evict(self) -> list:
+        """
+        Remove least recently used results until the cache fits in max_bytes.
+
+        Returns:
+            list: Paths of the evicted result files.
+        """
+        entries = []
+        for path in self.cache_dir.glob(f"*{RESULT_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        evicted = []
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted.append(path)
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} cached results from {self.cache_dir}.")
+        return evicted
+
+    def clear(self) -> None:
+        """Remove every cached result and the input hash memo."""
+        for path in self.cache_dir.glob(f"*{RESULT_SUFFIX}"):
+            path.unlink(missing_ok=True)
+        self._input_hashes_file.unlink(missing_ok=True)
+
+    def get_or_compute(
+        self, analysis: str, input_files: list, compute, params: dict = None, code=None
+    ) -> pd.DataFrame:
+        """
+        Return the cached result of an analysis, computing and storing it on a miss.
+
+        Args:
+            analysis (str): Name of the analysis.
+            input_files (list): Files the analysis reads; each must exist.
+            compute (callable): Zero-argument function that loads the inputs and returns the result frame.
+            params (dict, optional): Parameters of the analysis, e.g. {"slow_months": [3, 10]}.
+            code (optional): Module (or function) computing the result (default: the module defining compute).
+
+        Returns:
+            pd.DataFrame: The analysis result.
+        """
+        try:
+            key = self.key(analysis, input_files, params, code or inspect.getmodule(compute))
+            result = self.get(key)
+            if result is not None:
+                logger.info(f"Result cache hit for {analysis}.")
+                return result
+
+            logger.info(f"Result cache miss for {analysis}; computing.")
+            result = compute()
+            self.put(key, result)
+            return result
+        except Exception as e:
+            logger.error(f"Error serving {analysis} through the result cache: {e}")
+            raise
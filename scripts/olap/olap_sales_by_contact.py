@@ -8,16 +8,24 @@ ACTION: Use this information to personalize marketing strategies and improve cus
 
 PROCESS:
 1. Load the OLAP cube to get total sales by CustomerID.
-2. Load the customers data to get preferred contact methods.
-3. Merge the data on CustomerID.
+2. Use the PreferredContactMethod stored in the cube (load customers data for older cubes).
+3. Merge the data on CustomerID when needed.
 4. Visualize total sales by CustomerID and their preferred contact method.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import pathlib
+import sys
 import logging
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import add_dimension_attributes  # noqa: E402
+from scripts.olap.olap_rendering import render_chart  # noqa: E402
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -54,15 +62,17 @@ def load_customers_data(file_path: pathlib.Path) -> pd.DataFrame:
         raise
 
 
-def analyze_sales_and_contact(cube_df: pd.DataFrame, customers_df: pd.DataFrame) -> pd.DataFrame:
+def analyze_sales_and_contact(cube_df: pd.DataFrame, customers_df: pd.DataFrame = None) -> pd.DataFrame:
     """Analyze total sales by CustomerID and include preferred contact method."""
     try:
-        # Group by CustomerID and calculate total sales
-        customer_sales = cube_df.groupby("CustomerID")["SaleAmount_sum"].sum().reset_index()
-        customer_sales.rename(columns={"SaleAmount_sum": "TotalSales"}, inplace=True)
+        # Use the contact method stored in the cube, joining customers only for older cubes
+        cube_df = add_dimension_attributes(cube_df, ["PreferredContactMethod"], customers_df=customers_df)
 
-        # Merge with customers data to get preferred contact method
-        merged_data = customer_sales.merge(customers_df[["CustomerID", "PreferredContactMethod"]], on="CustomerID", how="left")
+        # Group by CustomerID and calculate total sales
+        merged_data = cube_df.groupby("CustomerID").agg(
+            TotalSales=("SaleAmount_sum", "sum"),
+            PreferredContactMethod=("PreferredContactMethod", "first")
+        ).reset_index()
 
         logger.info("Sales and contact method analysis completed successfully.")
         return merged_data
@@ -70,29 +80,30 @@ def analyze_sales_and_contact(cube_df: pd.DataFrame, customers_df: pd.DataFrame)
         logger.error(f"Error analyzing sales and contact method: {e}")
         raise
 
+def plot_sales_by_contact_method(fig, ax, contact_method_sales: pd.DataFrame) -> None:
+    """Draw total sales by preferred contact method as a bar chart."""
+    ax.bar(contact_method_sales["PreferredContactMethod"], contact_method_sales["TotalSales"], color="skyblue")
+    ax.set_title("Total Sales by Preferred Contact Method", fontsize=16)
+    ax.set_xlabel("Preferred Contact Method", fontsize=12)
+    ax.set_ylabel("Total Sales (USD)", fontsize=12)
+    ax.tick_params(axis="x", rotation=45, labelsize=10)
+
+
 def visualize_sales_by_contact_method(merged_data: pd.DataFrame) -> None:
     """Visualize total sales by preferred contact method."""
     try:
         # Group by PreferredContactMethod and calculate total sales
-        contact_method_sales = merged_data.groupby("PreferredContactMethod")["TotalSales"].sum().reset_index()
+        contact_method_sales = merged_data.groupby("PreferredContactMethod", observed=True)["TotalSales"].sum().reset_index()
 
         # Sort data for better visualization
         contact_method_sales = contact_method_sales.sort_values(by="TotalSales", ascending=False)
 
-        # Create the bar chart
-        plt.figure(figsize=(10, 6))
-        plt.bar(contact_method_sales["PreferredContactMethod"], contact_method_sales["TotalSales"], color="skyblue")
-        plt.title("Total Sales by Preferred Contact Method", fontsize=16)
-        plt.xlabel("Preferred Contact Method", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(rotation=45, fontsize=10)
-        plt.tight_layout()
-
         # Save the visualization
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_contact_method.png")
-        plt.savefig(output_path)
-        logger.info(f"Bar chart saved to {output_path}.")
-        plt.show()
+        if render_chart(plot_sales_by_contact_method, contact_method_sales, output_path, figsize=(10, 6)):
+            logger.info(f"Bar chart saved to {output_path}.")
+        else:
+            logger.info(f"Bar chart at {output_path} is up to date.")
     except Exception as e:
         logger.error(f"Error visualizing sales by contact method: {e}")
         raise
@@ -104,8 +115,8 @@ def main():
     # Step 1: Load the precomputed OLAP cube
     cube_df = load_olap_cube(CUBED_FILE)
 
-    # Step 2: Load the customers data
-    customers_df = load_customers_data(CUSTOMERS_FILE)
+    # Step 2: Load the customers data (only needed for cubes built without PreferredContactMethod)
+    customers_df = None if "PreferredContactMethod" in cube_df.columns else load_customers_data(CUSTOMERS_FILE)
 
     # Step 3: Analyze sales and contact method
     merged_data = analyze_sales_and_contact(cube_df, customers_df)
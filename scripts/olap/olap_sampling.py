@@ -0,0 +1,278 @@
+"""
+Approximate OLAP Cube
+File: scripts/olap/olap_sampling.py
+
+Builds the OLAP cube from a stratified Bernoulli sample of the sales table,
+with confidence intervals alongside each estimated aggregate, for exploratory
+questions that do not need exact answers.
+
+1. Planning pass: one two-key GROUP BY in SQLite collects, for each
+   Region x Month stratum, the row count, the SaleAmount total and the sum of
+   squared sale amounts.
+2. Sample rates: each stratum gets the smallest rate p for which the
+   Horvitz-Thompson estimate of its SaleAmount total is within error_bound
+   (relative) of the true total at the requested confidence:
+
+       z * sqrt((1 - p) / p * sum(y^2)) <= error_bound * sum(y)
+       =>  p = sum(y^2) / (sum(y^2) + (error_bound * sum(y) / z)^2)
+
+   Strata with fewer than MIN_STRATUM_ROWS rows are read in full.
+3. Sampling and aggregation happen inside SQLite: a row is kept when a
+   multiplicative hash of its TransactionID falls below its stratum's
+   threshold (so the sample is reproducible for a given seed), and each kept
+   row is weighted by 1 / p. Sums and counts are Horvitz-Thompson estimates;
+   means are the ratio of the two. Only the sampled rows are grouped and only
+   the aggregated cells are returned to Python.
+
+Each estimated sum or count X comes with X_var (its estimated variance) and
+X_low / X_high (the confidence interval). Cells are disjoint and sampled
+independently, so variances add: olap_cubing.rollup_cube() sums the _var
+columns, and add_confidence_intervals() recomputes the intervals of a
+rolled-up cuboid. The error bound applies to each Region x Month total;
+finer cells (a product in a month) get proportionally wider intervals.
+
+Usage:
+    python scripts/olap/olap_sampling.py --error-bound 0.05 --confidence 0.95
+    python scripts/olap/olap_cubing.py --approximate --error-bound 0.1
+"""
+
+import argparse
+import pathlib
+import sqlite3
+import sys
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from scripts.olap.olap_cubing import (  # noqa: E402
+    CUBE_METRICS,
+    DB_PATH,
+    DIMENSION_ATTRIBUTES,
+    SQL_COLUMN_EXPRESSIONS,
+    TIME_GRAINS,
+    cube_dimensions,
+    sql_joins,
+    write_cube_to_csv,
+)
+
+# Constants
+APPROX_CUBE_FILENAME: str = "multidimensional_olap_cube_approx.csv"
+STRATA: list = ["Region", "Month"]
+ERROR_BOUND_MEASURE: str = "SaleAmount"
+DEFAULT_ERROR_BOUND: float = 0.05
+DEFAULT_CONFIDENCE: float = 0.95
+MIN_SAMPLE_RATE: float = 0.001
+MIN_STRATUM_ROWS: int = 30
+
+# Row hash in [0, 2^32): Knuth's multiplicative hash of the TransactionID. SQLite turns
+# integer overflow into floating point, so TransactionID + seed must stay below 2^63 / HASH_MULTIPLIER.
+HASH_MODULUS: int = 1 << 32
+HASH_MULTIPLIER: int = 2654435761
+
+
+def z_score(confidence: float) -> float:
+    """Return the two-sided normal critical value for a confidence level, e.g. 1.96 for 0.95."""
+    if not 0 < confidence < 1:
+        raise ValueError(f"Confidence must be between 0 and 1, got {confidence}.")
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def _row_hash(seed: int) -> str:
+    return f"(((s.TransactionID + {int(seed)}) * {HASH_MULTIPLIER}) % {HASH_MODULUS})"
+
+
+def stratum_statistics(conn: sqlite3.Connection, measure: str = ERROR_BOUND_MEASURE) -> pd.DataFrame:
+    """
+    Collect the row count, total and sum of squares of a measure for each stratum.
+
+    Returns:
+        pd.DataFrame: STRATA columns plus Rows, Total and SumSquares.
+    """
+    value = SQL_COLUMN_EXPRESSIONS[measure]
+    select = [f"{SQL_COLUMN_EXPRESSIONS[col]} AS {col}" for col in STRATA]
+    where = " AND ".join(f"{SQL_COLUMN_EXPRESSIONS[col]} IS NOT NULL" for col in STRATA)
+    group_by = ", ".join(str(position) for position in range(1, len(STRATA) + 1))
+    query = (
+        f"SELECT {', '.join(select)}, COUNT(*) AS Rows, TOTAL({value}) AS Total, "
+        f"TOTAL({value} * {value}) AS SumSquares FROM sales s{sql_joins(STRATA + [measure])} "
+        f"WHERE {where} GROUP BY {group_by}"
+    )
+    return pd.read_sql_query(query, conn)
+
+
+def choose_sample_rates(
+    stats: pd.DataFrame,
+    error_bound: float = DEFAULT_ERROR_BOUND,
+    confidence: float = DEFAULT_CONFIDENCE,
+    min_rate: float = MIN_SAMPLE_RATE,
+) -> pd.DataFrame:
+    """
+    Choose each stratum's sample rate from the requested relative error bound.
+
+    Args:
+        stats (pd.DataFrame): Output of stratum_statistics().
+        error_bound (float): Relative half-width of the confidence interval of each stratum total.
+        confidence (float): Confidence level of the interval.
+        min_rate (float): Lowest rate any stratum is sampled at.
+
+    Returns:
+        pd.DataFrame: stats plus Threshold (hash cut-off) and Rate (Threshold / 2^32, the exact rate used).
+    """
+    if error_bound <= 0:
+        raise ValueError(f"The error bound must be positive, got {error_bound}.")
+    sum_squares = stats["SumSquares"].to_numpy(dtype=np.float64)
+    target = (error_bound * stats["Total"].to_numpy(dtype=np.float64) / z_score(confidence)) ** 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rates = np.where(target > 0, sum_squares / (sum_squares + target), 1.0)
+    rates = np.where(stats["Rows"].to_numpy() < MIN_STRATUM_ROWS, 1.0, np.clip(rates, min_rate, 1.0))
+
+    thresholds = np.ceil(rates * HASH_MODULUS).astype(np.int64)
+    return stats.assign(Threshold=thresholds, Rate=thresholds / HASH_MODULUS)
+
+
+def build_sample_query(dimensions: list, metrics: dict, attributes: list = None, seed: int = 0) -> str:
+    """
+    Generate the GROUP BY query that samples the sales and aggregates Horvitz-Thompson estimates.
+
+    The query joins the temporary table sample_strata (STRATA columns, Rate, Threshold).
+
+    Returns:
+        str: The SQL query.
+    """
+    attributes = attributes or []
+    joins = sql_joins(dimensions + attributes + list(metrics) + STRATA)
+
+    select = [f"{SQL_COLUMN_EXPRESSIONS[dim]} AS {dim}" for dim in dimensions]
+    select += [f"MIN({SQL_COLUMN_EXPRESSIONS[attr]}) AS {attr}" for attr in attributes]
+    variances = []
+    weight = "(1.0 / r.Rate)"
+    # Variance contribution of one sampled row of value y under Poisson sampling: (1 - p) / p^2 * y^2
+    variance_weight = "((1.0 - r.Rate) / (r.Rate * r.Rate))"
+    for column, agg_funcs in metrics.items():
+        value = SQL_COLUMN_EXPRESSIONS[column]
+        present = f"CASE WHEN {value} IS NOT NULL THEN 1 ELSE 0 END"
+        for func in agg_funcs if isinstance(agg_funcs, list) else [agg_funcs]:
+            if func == "sum":
+                select.append(f"TOTAL({value} * {weight}) AS {column}_sum")
+                variances.append(f"TOTAL({value} * {value} * {variance_weight}) AS {column}_sum_var")
+            elif func == "count":
+                select.append(f"TOTAL({present} * {weight}) AS {column}_count")
+                variances.append(f"TOTAL({present} * {variance_weight}) AS {column}_count_var")
+            elif func == "mean":
+                select.append(f"TOTAL({value} * {weight}) / TOTAL({present} * {weight}) AS {column}_mean")
+            else:
+                raise ValueError(f"Aggregation '{func}' cannot be estimated from a sample.")
+
+    strata_join = " AND ".join(f"r.{col} = {SQL_COLUMN_EXPRESSIONS[col]}" for col in STRATA)
+    where = " AND ".join(
+        [f"{_row_hash(seed)} < r.Threshold"] + [f"{SQL_COLUMN_EXPRESSIONS[dim]} IS NOT NULL" for dim in dimensions]
+    )
+    group_by = ", ".join(str(position) for position in range(1, len(dimensions) + 1))
+    return (
+        f"SELECT {', '.join(select + variances)} FROM sales s{joins} "
+        f"JOIN sample_strata r ON {strata_join} WHERE {where}"
+        + (f" GROUP BY {group_by} ORDER BY {group_by}" if dimensions else "")
+    )
+
+
+def add_confidence_intervals(cube: pd.DataFrame, confidence: float = DEFAULT_CONFIDENCE) -> pd.DataFrame:
+    """
+    Add X_low and X_high for every estimate X with a variance column X_var.
+
+    Call again after olap_cubing.rollup_cube(), which sums the variances but drops the intervals.
+    """
+    z = z_score(confidence)
+    cube = cube.copy()
+    for column in [col for col in cube.columns if col.endswith("_var")]:
+        estimate = column[: -len("_var")]
+        half_width = z * np.sqrt(cube[column].clip(lower=0))
+        cube[f"{estimate}_low"] = cube[estimate] - half_width
+        cube[f"{estimate}_high"] = cube[estimate] + half_width
+    return cube
+
+
+def create_olap_cube_approximate(
+    db_path: pathlib.Path,
+    dimensions: list,
+    metrics: dict,
+    attributes: list = None,
+    error_bound: float = DEFAULT_ERROR_BOUND,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Create an approximate OLAP cube from a stratified sample of the sales table.
+
+    Args:
+        db_path (pathlib.Path): Path to the SQLite data warehouse.
+        dimensions (list): List of column names to group by.
+        metrics (dict): Dictionary of aggregation functions for metrics (sum, count and mean only).
+        attributes (list, optional): Dimension attributes to carry into the cube.
+        error_bound (float): Relative half-width of the confidence interval of each Region x Month total.
+        confidence (float): Confidence level of the intervals.
+        seed (int): Selects which rows are sampled; the same seed gives the same sample.
+
+    Returns:
+        pd.DataFrame: The estimated cube with _var, _low and _high columns for each sum and count.
+    """
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            strata = choose_sample_rates(stratum_statistics(conn), error_bound, confidence)
+            sampled_rows = float((strata["Rows"] * strata["Rate"]).sum())
+            total_rows = int(strata["Rows"].sum())
+            logger.info(
+                f"Sampling about {sampled_rows:.0f} of {total_rows} sales rows "
+                f"({sampled_rows / max(total_rows, 1):.1%}) for a {error_bound:.1%} error bound "
+                f"at {confidence:.0%} confidence."
+            )
+
+            # A temporary table, so the warehouse itself is never modified
+            columns = STRATA + ["Rate", "Threshold"]
+            conn.execute(f"CREATE TEMP TABLE sample_strata ({', '.join(columns)})")
+            conn.executemany(
+                f"INSERT INTO sample_strata VALUES ({', '.join('?' for _ in columns)})",
+                zip(*(strata[col].tolist() for col in columns)),
+            )
+            cube = pd.read_sql_query(build_sample_query(dimensions, metrics, attributes, seed), conn)
+        finally:
+            conn.close()
+
+        for attr in attributes or []:
+            cube[attr] = cube[attr].astype("category")
+        cube = add_confidence_intervals(cube, confidence)
+        logger.info(f"Approximate OLAP cube created with dimensions: {dimensions}")
+        return cube
+    except Exception as e:
+        logger.error(f"Error creating the approximate OLAP cube: {e}")
+        raise
+
+
+def main():
+    """Main function for building the approximate OLAP cube."""
+    parser = argparse.ArgumentParser(description="Build an approximate OLAP cube from a stratified sample.")
+    parser.add_argument("--error-bound", type=float, default=DEFAULT_ERROR_BOUND,
+                        help="Relative error allowed on each Region x Month sales total.")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-grain", choices=list(TIME_GRAINS), default="month")
+    args = parser.parse_args()
+
+    logger.info("Starting approximate OLAP Cubing process...")
+    cube = create_olap_cube_approximate(
+        DB_PATH, cube_dimensions(args.time_grain), CUBE_METRICS, list(DIMENSION_ATTRIBUTES),
+        args.error_bound, args.confidence, args.seed,
+    )
+    write_cube_to_csv(cube, APPROX_CUBE_FILENAME)
+    logger.info("Approximate OLAP Cubing process completed successfully.")
+
+
+if __name__ == "__main__":
+    main()
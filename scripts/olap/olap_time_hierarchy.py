@@ -0,0 +1,192 @@
+"""
+OLAP Time Hierarchy
+File: scripts/olap/olap_time_hierarchy.py
+
+Rollups along the cube's time hierarchy (Year -> Quarter -> Month -> Day, plus
+ISOYear -> ISOWeek -> Day) and the quarter and year-over-year reports built on them.
+
+Reports never go back to the raw sale dates: every coarser level is derived
+from the finest level stored in the cube (Day for cubes built with
+--time-grain day, otherwise Year/Month) and the measures are re-aggregated
+with olap_cubing.rollup_cube(). ISO weeks cut across months, so they can only
+be rolled up from a day-grain cube.
+
+Usage:
+    python scripts/olap/olap_time_hierarchy.py                        # quarterly + YoY by quarter
+    python scripts/olap/olap_time_hierarchy.py --level Month --by Region
+"""
+
+import argparse
+import pathlib
+import sys
+
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from scripts.olap.olap_cubing import (  # noqa: E402
+    ISO_WEEK_HIERARCHY,
+    OLAP_OUTPUT_DIR,
+    TIME_HIERARCHY,
+    add_time_dimensions,
+    rollup_cube,
+)
+from scripts.olap.olap_sketches import add_distinct_counts  # noqa: E402
+
+# Constants
+CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.csv")
+RESULTS_OUTPUT_DIR: pathlib.Path = pathlib.Path("data").joinpath("results")
+
+
+def hierarchy_for(level: str) -> list:
+    """Return the levels from the top of level's hierarchy down to level itself."""
+    for hierarchy in (TIME_HIERARCHY, ISO_WEEK_HIERARCHY):
+        if level in hierarchy[:-1] or (level == "Day" and hierarchy is TIME_HIERARCHY):
+            return hierarchy[: hierarchy.index(level) + 1]
+    raise ValueError(f"Unknown time level '{level}'. Choose from {TIME_HIERARCHY + ISO_WEEK_HIERARCHY[:-1]}.")
+
+
+def finest_time_level(cube: pd.DataFrame) -> str:
+    """Return the finest level of TIME_HIERARCHY stored in the cube."""
+    stored = [level for level in TIME_HIERARCHY if level in cube.columns]
+    if not stored:
+        raise ValueError("The cube has no time hierarchy columns.")
+    return stored[-1]
+
+
+def derive_time_levels(cube: pd.DataFrame, levels: list) -> pd.DataFrame:
+    """
+    Add the requested time levels that the cube does not store, from its finest stored level.
+
+    Args:
+        cube (pd.DataFrame): The cube or cuboid.
+        levels (list): Time levels needed, e.g. ["Year", "Quarter"].
+
+    Returns:
+        pd.DataFrame: The cube with every requested level present.
+    """
+    missing = [level for level in levels if level not in cube.columns]
+    if not missing:
+        return cube
+
+    if "Day" in cube.columns:
+        # Every level is a function of the day
+        derived = add_time_dimensions(cube[["Day"]], "Day")
+        return cube.assign(**{level: derived[level] for level in missing})
+
+    if missing == ["Quarter"] and "Month" in cube.columns:
+        return cube.assign(Quarter=(cube["Month"] - 1) // 3 + 1)
+
+    raise ValueError(
+        f"Time levels {missing} cannot be derived from a cube stored at {finest_time_level(cube)} grain; "
+        "rebuild it with olap_cubing.py --time-grain day."
+    )
+
+
+def rollup_time(cube: pd.DataFrame, level: str, dimensions: list = None, sketches: bool = False) -> pd.DataFrame:
+    """
+    Roll the cube up to a time level, keeping the levels above it and any other dimensions.
+
+    Args:
+        cube (pd.DataFrame): The cube, at any time grain at or below level.
+        level (str): Target level, e.g. "Quarter" (keeps Year, Quarter) or "ISOWeek" (keeps ISOYear, ISOWeek).
+        dimensions (list, optional): Other dimensions to keep, e.g. ["Region"].
+        sketches (bool): Merge the distinct-count sketches (see olap_cubing.rollup_cube).
+
+    Returns:
+        pd.DataFrame: The rolled-up cuboid.
+    """
+    time_levels = hierarchy_for(level)
+    cube = derive_time_levels(cube, time_levels)
+    rolled = rollup_cube(cube, time_levels + list(dimensions or []), sketches=sketches)
+    # Derived levels are appended after the measures; lead with the hierarchy
+    return rolled[time_levels + [col for col in rolled.columns if col not in time_levels]]
+
+
+def quarterly_report(cube: pd.DataFrame, dimensions: list = None) -> pd.DataFrame:
+    """Total sales, transactions, average sale and distinct customers per Year and Quarter (and dimensions)."""
+    try:
+        report = add_distinct_counts(rollup_time(cube, "Quarter", dimensions, sketches=True))
+        logger.info(f"Quarterly report computed with {len(report)} rows.")
+        return report
+    except Exception as e:
+        logger.error(f"Error computing the quarterly report: {e}")
+        raise
+
+
+def year_over_year(
+    cube: pd.DataFrame, level: str = "Quarter", dimensions: list = None, measure: str = "SaleAmount_sum"
+) -> pd.DataFrame:
+    """
+    Compare each period with the same period of the previous year.
+
+    Args:
+        cube (pd.DataFrame): The cube.
+        level (str): Period within the year: "Quarter", "Month" or "ISOWeek".
+        dimensions (list, optional): Other dimensions to compare within, e.g. ["Region"].
+        measure (str): Additive measure to compare.
+
+    Returns:
+        pd.DataFrame: Year, period, dimensions, the measure, PriorYear (the measure a year
+            earlier), YoYChange and YoYGrowthPct; prior-year columns are empty when there is no prior year.
+    """
+    try:
+        time_levels = hierarchy_for(level)
+        if len(time_levels) < 2:
+            raise ValueError("Year-over-year needs a period below the year, e.g. Quarter or Month.")
+        year, keys = time_levels[0], time_levels[1:] + list(dimensions or [])
+
+        current = rollup_time(cube, level, dimensions)[[year] + keys + [measure]]
+        prior = current.rename(columns={measure: "PriorYear"}).assign(**{year: current[year] + 1})
+        report = current.merge(prior, on=[year] + keys, how="left")
+        report["YoYChange"] = report[measure] - report["PriorYear"]
+        report["YoYGrowthPct"] = report["YoYChange"] / report["PriorYear"] * 100
+        logger.info(f"Year-over-year report by {level} computed with {len(report)} rows.")
+        return report
+    except Exception as e:
+        logger.error(f"Error computing the year-over-year report: {e}")
+        raise
+
+
+def save_results_to_csv(results_df: pd.DataFrame, filename: str) -> None:
+    """Save the results to a CSV file."""
+    try:
+        RESULTS_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = RESULTS_OUTPUT_DIR.joinpath(filename)
+        results_df.to_csv(output_path, index=False)
+        logger.info(f"Results saved to {output_path}.")
+    except Exception as e:
+        logger.error(f"Error saving results to CSV file: {e}")
+        raise
+
+
+def main():
+    """Main function for the quarterly and year-over-year time reports."""
+    parser = argparse.ArgumentParser(description="Roll the OLAP cube up its time hierarchy.")
+    parser.add_argument("--level", default="Quarter", help="Period for the year-over-year report.")
+    parser.add_argument("--by", nargs="*", default=[], help="Other dimensions to keep, e.g. Region.")
+    args = parser.parse_args()
+
+    logger.info("Starting TIME_HIERARCHY reports...")
+    cube_df = pd.read_csv(CUBED_FILE)
+    logger.info(f"OLAP cube data successfully loaded from {CUBED_FILE}.")
+
+    suffix = "".join(f"_by_{dim.lower()}" for dim in args.by)
+
+    quarterly = quarterly_report(cube_df, args.by)
+    print(quarterly)
+    save_results_to_csv(quarterly, f"sales_by_quarter{suffix}.csv")
+
+    yoy = year_over_year(cube_df, args.level, args.by)
+    print(yoy)
+    save_results_to_csv(yoy, f"yoy_sales_by_{args.level.lower()}{suffix}.csv")
+
+    logger.info("Time hierarchy reports completed successfully.")
+
+
+if __name__ == "__main__":
+    main()
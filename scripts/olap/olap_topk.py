@@ -0,0 +1,119 @@
+"""
+Top-K per Group
+File: scripts/olap/olap_topk.py
+
+Linear-time top-k / bottom-k selection within groups, for rankings such as
+the top product for each day of the week or the best and worst month for
+each region.
+
+Sorting the whole grouped frame and taking groupby().head(k) costs
+O(n log n) to keep a handful of rows per group. Here the group keys are
+factorized to integer codes and each of the k ranks is found with one
+np.maximum.at / np.minimum.at pass over the rows, so the work is O(k * n).
+Both extremes can be taken in the same call, sharing the factorization.
+
+Ties are broken by row order: the earlier row ranks first, matching a stable
+sort followed by groupby().head(k).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _group_codes(df: pd.DataFrame, group_cols: list) -> tuple:
+    """Return (codes, n_groups) with codes numbered in sorted group-key order."""
+    if len(group_cols) == 1:
+        codes, uniques = pd.factorize(df[group_cols[0]], sort=True)
+        return codes.astype(np.int64), len(uniques)
+    codes = df.groupby(group_cols, sort=True, observed=True, dropna=True).ngroup().to_numpy()
+    return codes.astype(np.int64), int(codes.max()) + 1 if len(codes) else 0
+
+
+def _select_positions(codes: np.ndarray, n_groups: int, values: np.ndarray, k: int, directions: tuple) -> list:
+    """
+    Find the row positions of the k largest and/or smallest values in each group.
+
+    Every direction ("max" or "min") is advanced in the same pass over the rows.
+
+    Returns:
+        list: One (positions, groups, ranks) tuple of arrays per direction.
+    """
+    n_rows = len(values)
+    row_positions = np.arange(n_rows)
+    safe_codes = np.where(codes >= 0, codes, 0)
+    valid = (codes >= 0) & ~np.isnan(values)
+    available = {direction: valid.copy() for direction in directions}
+    selected = {direction: ([], []) for direction in directions}
+
+    for rank in range(k):
+        for direction in directions:
+            remaining = available[direction]
+            if not remaining.any():
+                continue
+            # Best remaining value per group, then the first row holding it
+            largest = direction == "max"
+            best = np.full(n_groups, -np.inf if largest else np.inf)
+            (np.maximum if largest else np.minimum).at(best, codes[remaining], values[remaining])
+            hits = remaining & (values == best[safe_codes])
+            first = np.full(n_groups, n_rows)
+            np.minimum.at(first, codes[hits], row_positions[hits])
+            chosen = first[first < n_rows]
+
+            remaining[chosen] = False
+            selected[direction][0].append(chosen)
+            selected[direction][1].append(np.full(len(chosen), rank))
+
+    results = []
+    for direction in directions:
+        positions, ranks = selected[direction]
+        positions = np.concatenate(positions) if positions else np.array([], dtype=np.int64)
+        ranks = np.concatenate(ranks) if ranks else np.array([], dtype=np.int64)
+        results.append((positions, codes[positions], ranks))
+    return results
+
+
+def _ordered_rows(df: pd.DataFrame, positions: np.ndarray, groups: np.ndarray, ranks: np.ndarray) -> pd.DataFrame:
+    """Return the selected rows ordered by group, then rank."""
+    order = np.lexsort((ranks, groups))
+    return df.iloc[positions[order]]
+
+
+def top_k_per_group(
+    df: pd.DataFrame, group_cols: list, value_col: str, k: int = 1, largest: bool = True
+) -> pd.DataFrame:
+    """
+    Select the k rows with the largest (or smallest) value in each group.
+
+    Args:
+        df (pd.DataFrame): The data to rank.
+        group_cols (list): Columns defining the groups.
+        value_col (str): Column to rank by. Rows with a missing value are never selected.
+        k (int): Rows to keep per group.
+        largest (bool): Keep the largest values if True, the smallest if False.
+
+    Returns:
+        pd.DataFrame: The selected rows (original index kept), ordered by group key, then rank.
+    """
+    codes, n_groups = _group_codes(df, group_cols)
+    values = df[value_col].to_numpy(dtype=np.float64)
+    (selection,) = _select_positions(codes, n_groups, values, k, ("max" if largest else "min",))
+    return _ordered_rows(df, *selection)
+
+
+def extremes_per_group(df: pd.DataFrame, group_cols: list, value_col: str, k: int = 1) -> tuple:
+    """
+    Select both the bottom k and the top k rows of each group in one call.
+
+    Args:
+        df (pd.DataFrame): The data to rank.
+        group_cols (list): Columns defining the groups.
+        value_col (str): Column to rank by. Rows with a missing value are never selected.
+        k (int): Rows to keep per group at each end.
+
+    Returns:
+        tuple: (bottom, top) DataFrames, each ordered by group key, then rank.
+    """
+    codes, n_groups = _group_codes(df, group_cols)
+    values = df[value_col].to_numpy(dtype=np.float64)
+    bottom, top = _select_positions(codes, n_groups, values, k, ("min", "max"))
+    return _ordered_rows(df, *bottom), _ordered_rows(df, *top)
@@ -7,18 +7,25 @@ GOAL: Create a bar graph showing total sales by month with regions as the legend
 ACTION: Use this information to identify regional sales trends over the months.
 
 PROCESS:
-1. Load the OLAP cube to get sales data by Month and CustomerID.
-2. Load the customer details to get Region.
-3. Merge the data on CustomerID.
+1. Load the OLAP cube to get sales data by Month and Region.
+2. Load the customer details to get Region (only for cubes built without Region).
+3. Merge the data on CustomerID when needed.
 4. Group by Month and Region to calculate total sales.
 5. Create a bar graph with months on the X-axis, total sales on the Y-axis, and regions as the legend.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import pathlib
+import sys
 import logging
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_rendering import MONTH_LABELS, render_chart  # noqa: E402
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -55,11 +62,14 @@ def load_customers_data(file_path: pathlib.Path) -> pd.DataFrame:
         raise
 
 
-def analyze_sales_by_month_and_region(cube_df: pd.DataFrame, customers_df: pd.DataFrame) -> pd.DataFrame:
+def analyze_sales_by_month_and_region(cube_df: pd.DataFrame, customers_df: pd.DataFrame = None) -> pd.DataFrame:
     """Analyze total sales by Month and Region."""
     try:
-        # Merge the OLAP cube with customer data to get Region
-        merged_data = cube_df.merge(customers_df[["CustomerID", "Region"]], on="CustomerID", how="left")
+        # Region is a cube dimension; join customers only for cubes built without it
+        if "Region" in cube_df.columns:
+            merged_data = cube_df
+        else:
+            merged_data = cube_df.merge(customers_df[["CustomerID", "Region"]], on="CustomerID", how="left")
 
         # Group by Month and Region, sum the sales
         grouped = merged_data.groupby(["Month", "Region"])["SaleAmount_sum"].sum().reset_index()
@@ -71,28 +81,30 @@ def analyze_sales_by_month_and_region(cube_df: pd.DataFrame, customers_df: pd.Da
         raise
 
 
+def plot_sales_by_month_and_region(fig, ax, sales_pivot: pd.DataFrame) -> None:
+    """Draw one line per region of total sales by month."""
+    sales_pivot.plot(kind="line", marker='o', colormap="tab10", ax=ax)
+
+    ax.set_title("Total Sales by Month and Region", fontsize=16)
+    ax.set_xlabel("Month", fontsize=12)
+    ax.set_ylabel("Total Sales (USD)", fontsize=12)
+    ax.set_xticks(range(1, 13), labels=MONTH_LABELS, rotation=0)
+    ax.legend(title="Region", bbox_to_anchor=(1.05, 1), loc="upper left")
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+
+
 def visualize_sales_by_month_and_region(grouped_data: pd.DataFrame) -> None:
     """Visualize total sales by month and region using a line graph."""
     try:
         # Pivot the data to organize sales by Month and Region
         sales_pivot = grouped_data.pivot(index="Month", columns="Region", values="SaleAmount_sum").fillna(0)
 
-        # Plot the line graph
-        sales_pivot.plot(kind="line", figsize=(12, 8), marker='o', colormap="tab10")
-
-        plt.title("Total Sales by Month and Region", fontsize=16)
-        plt.xlabel("Month", fontsize=12)
-        plt.ylabel("Total Sales (USD)", fontsize=12)
-        plt.xticks(ticks=range(1, 13), labels=["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], rotation=0)
-        plt.legend(title="Region", bbox_to_anchor=(1.05, 1), loc="upper left")
-        plt.grid(axis="y", linestyle="--", alpha=0.7)
-        plt.tight_layout()
-
         # Save the visualization
         output_path = RESULTS_OUTPUT_DIR.joinpath("sales_by_month_and_region_line_graph.png")
-        plt.savefig(output_path)
-        logger.info(f"Line graph saved to {output_path}.")
-        plt.show()
+        if render_chart(plot_sales_by_month_and_region, sales_pivot, output_path, figsize=(12, 8)):
+            logger.info(f"Line graph saved to {output_path}.")
+        else:
+            logger.info(f"Line graph at {output_path} is up to date.")
     except Exception as e:
         logger.error(f"Error visualizing sales by month and region: {e}")
         raise
@@ -104,8 +116,8 @@ def main():
     # Step 1: Load the precomputed OLAP cube
     cube_df = load_olap_cube(CUBED_FILE)
 
-    # Step 2: Load the customer details
-    customers_df = load_customers_data(CUSTOMERS_FILE)
+    # Step 2: Load the customer details (only needed for cubes built without Region)
+    customers_df = None if "Region" in cube_df.columns else load_customers_data(CUSTOMERS_FILE)
 
     # Step 3: Analyze sales by month and region
     grouped_data = analyze_sales_by_month_and_region(cube_df, customers_df)
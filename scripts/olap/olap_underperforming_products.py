@@ -15,8 +15,18 @@ PROCESS:
 
 import pandas as pd
 import pathlib
+import sys
 import logging
 
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import add_dimension_attributes  # noqa: E402
+from scripts.olap.olap_month_matrix import MonthMatrix, build_month_matrix  # noqa: E402
+from scripts.olap.olap_result_cache import ResultCache  # noqa: E402
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
@@ -53,20 +63,30 @@ def load_products_data(file_path: pathlib.Path) -> pd.DataFrame:
         raise
 
 
-def analyze_underperforming_products(cube_df: pd.DataFrame, products_df: pd.DataFrame, slow_months: list) -> pd.DataFrame:
-    """Identify underperforming products during slow months."""
-    try:
-        # Filter the data for slow months
-        filtered_data = cube_df[cube_df["Month"].isin(slow_months)]
+def build_month_product_matrix(cube_df: pd.DataFrame, products_df: pd.DataFrame = None) -> MonthMatrix:
+    """Precompute the month x product sales matrix (with ProductName) used for month-window queries."""
+    # Use the ProductName stored in the cube, joining products only for older cubes
+    cube_df = add_dimension_attributes(cube_df, ["ProductName"], products_df=products_df)
+    return build_month_matrix(cube_df, "ProductID", attributes=["ProductName"])
+
 
-        # Group by Month and ProductID, calculate total sales and transaction count
-        grouped = filtered_data.groupby(["Month", "ProductID"]).agg(
-            TotalSales=("SaleAmount_sum", "sum"),
-            TransactionCount=("TransactionID_count", "sum")
-        ).reset_index()
+def analyze_underperforming_products(
+    cube_df: pd.DataFrame, products_df: pd.DataFrame, slow_months: list, month_matrix: MonthMatrix = None
+) -> pd.DataFrame:
+    """
+    Identify underperforming products during slow months.
 
-        # Merge with product details to get ProductName
-        merged_data = grouped.merge(products_df[["ProductID", "ProductName"]], on="ProductID", how="left")
+    slow_months can be any set of months. Pass a month_matrix from
+    build_month_product_matrix() to answer repeated windows without rescanning the cube.
+    """
+    try:
+        if month_matrix is None:
+            month_matrix = build_month_product_matrix(cube_df, products_df)
+
+        # Look up the Month x ProductID totals and transaction counts of the slow months
+        merged_data = month_matrix.month_rows(slow_months).rename(
+            columns={"SaleAmount_sum": "TotalSales", "TransactionID_count": "TransactionCount"}
+        )
 
         # Sort by TotalSales in ascending order to identify underperforming products
         sorted_data = merged_data.sort_values(by="TotalSales", ascending=True)
@@ -93,17 +113,23 @@ def main():
     """Main function for analyzing underperforming products."""
     logger.info("Starting UNDERPERFORMING_PRODUCTS analysis...")
 
-    # Step 1: Load the precomputed OLAP cube
-    cube_df = load_olap_cube(CUBED_FILE)
+    # Step 1: Define slow months (e.g., months with the lowest total sales)
+    slow_months = [3, 10]  # Example: march and october
 
-    # Step 2: Load the product details
-    products_df = load_products_data(PRODUCTS_FILE)
+    # Steps 2-4: Load the cube (and products for cubes built without ProductName) and
+    # analyze the slow months, unless the result for these inputs is already cached. Only
+    # the header is read up front, to tell whether the products file is an input at all
+    needs_products = "ProductName" not in pd.read_csv(CUBED_FILE, nrows=0).columns
 
-    # Step 3: Define slow months (e.g., months with the lowest total sales)
-    slow_months = [3, 10]  # Example: march and october
+    def compute():
+        cube_df = load_olap_cube(CUBED_FILE)
+        products_df = load_products_data(PRODUCTS_FILE) if needs_products else None
+        return analyze_underperforming_products(cube_df, products_df, slow_months)
 
-    # Step 4: Analyze underperforming products during slow months
-    underperforming_products = analyze_underperforming_products(cube_df, products_df, slow_months)
+    inputs = [CUBED_FILE, PRODUCTS_FILE] if needs_products else [CUBED_FILE]
+    underperforming_products = ResultCache().get_or_compute(
+        "underperforming_products", inputs, compute, {"slow_months": slow_months}
+    )
     print(underperforming_products)
 
     # Step 5: Save the results to a CSV file
@@ -0,0 +1,312 @@
+"""
+OLAP View Selection
+File: scripts/olap/olap_view_selection.py
+
+Materializing every cuboid of the cube is too expensive at our cardinalities,
+and answering every rollup from the base cuboid is too slow.
+This module picks which cuboids to materialize for a given query workload and
+storage budget using the greedy benefit-per-unit-space algorithm over the
+cube lattice (Harinarayan, Rajaraman and Ullman).
+
+Cost model: answering a query from a cuboid costs the number of rows in that
+cuboid, so a query is answered from its smallest materialized ancestor.
+
+The base cuboid's dimensions are those of olap_cubing.cube_dimensions() stored
+in the loaded cube, so they follow the cube layout (time grain included).
+Candidate cuboids are limited to the dimensions the workload groups by: a
+cuboid with any other dimension is larger than its projection onto the
+workload dimensions and answers no more queries, so it is never worth selecting.
+
+PROCESS:
+1. Load the base cube written by olap_cubing.py.
+2. Load the workload - recorded queries if available, otherwise the declared one.
+3. Measure (or estimate) the size of every candidate cuboid.
+4. Greedily select cuboids until the storage budget is used up.
+5. Report the expected speedup and write the selected cuboids to CSV.
+"""
+
+import argparse
+import itertools
+import json
+import pathlib
+import sys
+from collections import Counter
+
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from scripts.olap.olap_cubing import OLAP_OUTPUT_DIR, cube_dimensions, rollup_cube  # noqa: E402
+
+# Constants
+CUBED_FILE: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("multidimensional_olap_cube.csv")
+WORKLOAD_LOG: pathlib.Path = OLAP_OUTPUT_DIR.joinpath("query_workload.jsonl")
+BASE_DIMENSIONS: list = cube_dimensions()
+
+# Group-bys issued by the goal scripts in scripts/olap, weighted equally
+DECLARED_WORKLOAD = [
+    (("DayOfWeek",), 1),                          # olap_goal_sales_by_day
+    (("Month",), 1),                              # olap_goal_sales_by_month
+    (("Year", "Quarter"), 1),                     # olap_time_hierarchy
+    (("DayOfWeek", "ProductID"), 1),              # olap_goal_top_product_by_day
+    (("Month", "Region"), 2),                     # olap_least_and_best_months_by_region, olap_total_sales_by_region
+    (("Region", "ProductID"), 1),                 # olap_most_purchased_product_by_region
+    (("Month", "Region", "ProductID"), 1),        # olap_product_sales_by_region_line_chart
+    (("Month", "ProductID"), 2),                  # olap_products_sold_by_month, olap_underperforming_products
+    (("CustomerID",), 2),                         # olap_sales_by_contact, olap_customer_average_transaction_size
+    (("CampaignID",), 1),                         # olap_campaign_store_analysis
+    (("PaymentType", "StoreID"), 1),              # olap_campaign_store_analysis
+]
+
+
+def cube_base_dimensions(cube: pd.DataFrame) -> list:
+    """Return the cube dimensions stored in a cube, at whichever time grain it was built."""
+    # The day grain stores every time level a cube can have
+    base_dimensions = [dim for dim in cube_dimensions("day") if dim in cube.columns]
+    if not base_dimensions:
+        raise ValueError("The cube has none of the cube dimensions.")
+    return base_dimensions
+
+
+def workload_dimensions(workload: list, base_dimensions: list = BASE_DIMENSIONS) -> list:
+    """Return the base dimensions any workload query groups by, in base cuboid order."""
+    used = {dim for query, _ in workload for dim in normalize_cuboid(query, base_dimensions)}
+    return [dim for dim in base_dimensions if dim in used]
+
+
+def normalize_cuboid(dimensions, base_dimensions: list = BASE_DIMENSIONS) -> tuple:
+    """Return the dimensions as a tuple ordered like the base cuboid."""
+    unknown = set(dimensions) - set(base_dimensions)
+    if unknown:
+        raise ValueError(f"Dimensions {sorted(unknown)} are not part of the base cuboid.")
+    return tuple(dim for dim in base_dimensions if dim in dimensions)
+
+
+def build_lattice(base_dimensions: list = BASE_DIMENSIONS) -> list:
+    """Return every cuboid (subset of the base dimensions), largest first."""
+    lattice = []
+    for size in range(len(base_dimensions), -1, -1):
+        lattice.extend(itertools.combinations(base_dimensions, size))
+    return lattice
+
+
+def estimate_cuboid_sizes(
+    base_cube: pd.DataFrame,
+    base_dimensions: list = BASE_DIMENSIONS,
+    method: str = "exact",
+    candidate_dimensions: list = None,
+) -> dict:
+    """
+    Estimate the number of rows in the base cuboid and every candidate cuboid.
+
+    Args:
+        base_cube (pd.DataFrame): The base cuboid.
+        base_dimensions (list): Dimensions of the base cuboid.
+        method (str): "exact" counts distinct cells with a groupby per cuboid.
+            "cardenas" uses only the per-dimension cardinalities, which is much
+            cheaper on very large cubes.
+        candidate_dimensions (list, optional): Only consider cuboids over these
+            dimensions, e.g. workload_dimensions(workload) (default: all base dimensions).
+
+    Returns:
+        dict: Mapping of cuboid tuple to estimated row count.
+    """
+    base_rows = len(base_cube)
+    cardinalities = {dim: base_cube[dim].nunique() for dim in base_dimensions}
+    candidates = build_lattice(candidate_dimensions if candidate_dimensions is not None else base_dimensions)
+    if tuple(base_dimensions) not in candidates:
+        candidates.insert(0, tuple(base_dimensions))
+    sizes = {}
+    for cuboid in candidates:
+        if not cuboid:
+            sizes[cuboid] = 1
+        elif cuboid == tuple(base_dimensions):
+            sizes[cuboid] = base_rows
+        elif method == "exact":
+            sizes[cuboid] = int(base_cube.groupby(list(cuboid)).ngroups)
+        elif method == "cardenas":
+            # Expected distinct cells when base_rows rows fall into `cells` buckets
+            cells = 1
+            for dim in cuboid:
+                cells *= cardinalities[dim]
+            estimate = cells * (1 - (1 - 1 / cells) ** base_rows)
+            sizes[cuboid] = max(1, min(base_rows, int(round(estimate))))
+        else:
+            raise ValueError(f"Unknown size estimation method: {method}")
+    return sizes
+
+
+def record_query(dimensions, workload_file: pathlib.Path = WORKLOAD_LOG) -> None:
+    """Append one group-by query to the recorded workload log."""
+    workload_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(workload_file, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"dimensions": list(dimensions)}) + "\n")
+
+
+def load_recorded_workload(
+    workload_file: pathlib.Path = WORKLOAD_LOG, base_dimensions: list = BASE_DIMENSIONS
+) -> list:
+    """Load the recorded workload as a list of (cuboid, frequency) pairs."""
+    counts = Counter()
+    with open(workload_file, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                counts[normalize_cuboid(json.loads(line)["dimensions"], base_dimensions)] += 1
+    return sorted(counts.items())
+
+
+def _answer_costs(workload: list, materialized: set, sizes: dict) -> dict:
+    """Cost of answering each workload query from its smallest materialized ancestor."""
+    costs = {}
+    for query, _ in workload:
+        costs[query] = min(sizes[view] for view in materialized if set(query) <= set(view))
+    return costs
+
+
+def workload_cost(workload: list, materialized: set, sizes: dict) -> float:
+    """Total frequency-weighted cost of the workload for a set of materialized cuboids."""
+    costs = _answer_costs(workload, materialized, sizes)
+    return float(sum(costs[query] * frequency for query, frequency in workload))
+
+
+def select_views(
+    sizes: dict, workload: list, budget_rows: int, base_dimensions: list = BASE_DIMENSIONS
+) -> dict:
+    """
+    Greedily select cuboids to materialize under a storage budget.
+
+    The base cuboid is always materialized and does not count against the budget.
+    At each step the cuboid with the highest benefit per row of storage is added,
+    where the benefit is the frequency-weighted reduction in workload cost.
+
+    Args:
+        sizes (dict): Cuboid row counts from estimate_cuboid_sizes().
+        workload (list): List of (cuboid, frequency) pairs.
+        budget_rows (int): Maximum total rows of the additional cuboids.
+        base_dimensions (list): Dimensions of the base cuboid.
+
+    Returns:
+        dict: Selected cuboids, rows used, workload costs and expected speedup.
+    """
+    base = tuple(base_dimensions)
+    workload = [(normalize_cuboid(query, base_dimensions), frequency) for query, frequency in workload]
+    materialized = {base}
+    selected = []
+    used_rows = 0
+
+    while True:
+        costs = _answer_costs(workload, materialized, sizes)
+        best_view, best_ratio = None, 0.0
+        for view, size in sizes.items():
+            if view in materialized or used_rows + size > budget_rows:
+                continue
+            benefit = sum(
+                frequency * max(0, costs[query] - size)
+                for query, frequency in workload
+                if set(query) <= set(view)
+            )
+            ratio = benefit / size
+            if ratio > best_ratio:
+                best_view, best_ratio = view, ratio
+        if best_view is None:
+            break
+        materialized.add(best_view)
+        selected.append(best_view)
+        used_rows += sizes[best_view]
+        logger.info(f"Selected cuboid {best_view} ({sizes[best_view]} rows, benefit/row {best_ratio:.2f})")
+
+    base_cost = workload_cost(workload, {base}, sizes)
+    selected_cost = workload_cost(workload, materialized, sizes)
+    return {
+        "selected": selected,
+        "rows_used": used_rows,
+        "budget_rows": budget_rows,
+        "base_cost": base_cost,
+        "selected_cost": selected_cost,
+        "speedup": base_cost / selected_cost if selected_cost else 1.0,
+    }
+
+
+def materialize_views(base_cube: pd.DataFrame, selected: list, base_dimensions: list = BASE_DIMENSIONS) -> dict:
+    """
+    Compute the selected cuboids, each from its smallest already-computed ancestor.
+
+    Returns:
+        dict: Mapping of cuboid tuple to its DataFrame, including the base cuboid.
+    """
+    views = {tuple(base_dimensions): base_cube}
+    for cuboid in sorted(selected, key=len, reverse=True):
+        source = min(
+            (view for view in views if set(cuboid) <= set(view)),
+            key=lambda view: len(views[view]),
+        )
+        views[cuboid] = rollup_cube(views[source], list(cuboid))
+    return views
+
+
+def answer_query(views: dict, dimensions) -> pd.DataFrame:
+    """Answer a group-by query from the smallest materialized ancestor cuboid."""
+    candidates = [view for view in views if set(dimensions) <= set(view)]
+    if not candidates:
+        raise ValueError(f"No materialized cuboid can answer a query on {list(dimensions)}.")
+    source = min(candidates, key=lambda view: len(views[view]))
+    if set(source) == set(dimensions):
+        return views[source]
+    return rollup_cube(views[source], [dim for dim in source if dim in dimensions])
+
+
+def cuboid_file_name(cuboid: tuple) -> str:
+    """Return the CSV file name used for a materialized cuboid."""
+    return "cuboid_" + ("_".join(cuboid) if cuboid else "all") + ".csv"
+
+
+def main():
+    """Main function for selecting and materializing cuboids."""
+    parser = argparse.ArgumentParser(description="Select cuboids to materialize for the OLAP cube.")
+    parser.add_argument("--budget-rows", type=int, default=None,
+                        help="Storage budget in rows (default: size of the base cuboid).")
+    parser.add_argument("--estimate", choices=["exact", "cardenas"], default="exact")
+    parser.add_argument("--workload", type=pathlib.Path, default=None,
+                        help="Recorded workload file (default: recorded log if present, else declared).")
+    args = parser.parse_args()
+
+    logger.info("Starting OLAP view selection...")
+    base_cube = pd.read_csv(CUBED_FILE)
+    logger.info(f"Base cuboid loaded from {CUBED_FILE} with {len(base_cube)} rows.")
+
+    base_dimensions = cube_base_dimensions(base_cube)
+
+    workload_file = args.workload or WORKLOAD_LOG
+    if workload_file.exists():
+        workload = load_recorded_workload(workload_file, base_dimensions)
+        logger.info(f"Using recorded workload from {workload_file} ({len(workload)} distinct queries).")
+    else:
+        workload = DECLARED_WORKLOAD
+        logger.info("Using the declared goal-script workload.")
+
+    sizes = estimate_cuboid_sizes(
+        base_cube, base_dimensions, args.estimate, workload_dimensions(workload, base_dimensions)
+    )
+    budget_rows = args.budget_rows if args.budget_rows is not None else len(base_cube)
+    selection = select_views(sizes, workload, budget_rows, base_dimensions)
+    logger.info(
+        f"Selected {len(selection['selected'])} cuboids using {selection['rows_used']}/{budget_rows} rows. "
+        f"Workload cost {selection['base_cost']:.0f} -> {selection['selected_cost']:.0f} rows scanned "
+        f"(expected speedup {selection['speedup']:.2f}x)."
+    )
+
+    views = materialize_views(base_cube, selection["selected"], base_dimensions)
+    for cuboid in selection["selected"]:
+        output_path = OLAP_OUTPUT_DIR.joinpath(cuboid_file_name(cuboid))
+        views[cuboid].to_csv(output_path, index=False)
+        logger.info(f"Cuboid {cuboid} saved to {output_path}.")
+
+    logger.info("OLAP view selection completed successfully.")
+
+
+if __name__ == "__main__":
+    main()
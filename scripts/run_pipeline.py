@@ -0,0 +1,356 @@
+"""
+Pipeline Orchestrator
+File: scripts/run_pipeline.py
+
+Runs the whole pipeline, from the raw CSVs to the analysis results, and only
+the parts of it whose inputs changed:
+
+    data_prep -> etl_to_dw -> olap_cubing -> analyses (one stage each)
+                                           -> bitmap_index
+
+Every stage declares the files it reads and writes, its own source code
+included, and the dependencies between stages follow from those files: a
+stage waits for the stages producing its inputs. The analyses (one
+olap_report_runner.py process each) only depend on the cube and the
+warehouse, so they run concurrently, up to --jobs at a time.
+
+A stage is reused, not run, when the content hashes of its inputs match
+those of its last successful run and its outputs are still the files that
+run wrote. The hashes are kept in data/cache/pipeline_state.json; a file's
+hash is recomputed only when its size or modification time changed. Helper
+modules imported by a stage are not tracked; use --force after changing one.
+
+Each run ends with a report of what was executed and what was reused, also
+written to data/cache/pipeline_report.json.
+
+Usage:
+    python scripts/run_pipeline.py                       # everything that is stale
+    python scripts/run_pipeline.py sales_by_month        # one analysis and what it depends on
+    python scripts/run_pipeline.py --force olap_cubing   # rerun the cube even if fresh
+    python scripts/run_pipeline.py --force --profile     # cProfile every stage (see utils/profiling.py)
+    python scripts/run_pipeline.py --list
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger  # noqa: E402
+from utils.content_hash import hash_file, hash_values  # noqa: E402
+from utils.profiling import DEFAULT_PROFILE_DIR, enable_profiling, write_profile_report  # noqa: E402
+
+# Constants (paths relative to the project root, where every stage runs)
+RAW_DATA_DIR: pathlib.Path = pathlib.Path("data").joinpath("raw")
+PREPARED_DATA_DIR: pathlib.Path = pathlib.Path("data").joinpath("prepared")
+DB_FILE: pathlib.Path = pathlib.Path("data").joinpath("dw", "smart_sales.db")
+CUBE_FILE: pathlib.Path = pathlib.Path("data").joinpath("olap_cubing_outputs", "multidimensional_olap_cube.csv")
+RESULTS_DIR: pathlib.Path = pathlib.Path("data").joinpath("results")
+CACHE_DIR: pathlib.Path = pathlib.Path("data").joinpath("cache")
+STATE_FILE: pathlib.Path = CACHE_DIR.joinpath("pipeline_state.json")
+REPORT_FILE: pathlib.Path = CACHE_DIR.joinpath("pipeline_report.json")
+TABLES: list = ["customers", "products", "sales"]
+REPORT_RUNNER: pathlib.Path = pathlib.Path("scripts").joinpath("olap", "olap_report_runner.py")
+
+# Analysis name (as in olap_report_runner) -> (module file, every result file it writes)
+ANALYSES: dict = {
+    "sales_by_day": ("olap_goal_sales_by_day.py", ["sales_by_day_of_week.png"]),
+    "sales_by_month": ("olap_goal_sales_by_month.py", ["sales_by_month.png"]),
+    "sales_by_quarter": ("olap_time_hierarchy.py", ["sales_by_quarter.csv", "yoy_sales_by_quarter.csv"]),
+    "top_product_by_day": (
+        "olap_goal_top_product_by_day.py",
+        ["top_product_by_weekday.csv", "sales_by_day_and_product.png", "total_sales_by_category.png"],
+    ),
+    "least_and_best_months_by_region": (
+        "olap_least_and_best_months_by_region.py", ["least_and_best_performing_months_by_region.csv"]
+    ),
+    "most_purchased_product_by_region": (
+        "olap_most_purchased_product_by_region.py", ["most_purchased_products_by_region.png"]
+    ),
+    "product_sales_by_region": (
+        "olap_product_sales_by_region_line_chart.py",
+        [f"product_sales_{region}_line_chart.png" for region in ["east", "north", "south", "west"]],
+    ),
+    "products_sold_by_month": ("olap_products_sold_by_month.py", ["products_sold_by_month_line_graph.png"]),
+    "sales_by_contact": ("olap_sales_by_contact.py", ["sales_by_contact_method.png"]),
+    "total_sales_by_region": ("olap_total_sales_by_region.py", ["sales_by_month_and_region_line_graph.png"]),
+    "underperforming_products": ("olap_underperforming_products.py", ["underperforming_products.csv"]),
+    "customer_average_transaction_size": (
+        "olap_customer_average_transaction_size.py",
+        ["customer_average_transaction_size.csv", "average_transaction_size_by_customer.png"],
+    ),
+    "sales_by_campaign_and_store": (
+        "olap_campaign_store_analysis.py",
+        ["sales_by_campaign.csv", "sales_by_campaign.png", "sales_by_store_and_payment_type.csv"],
+    ),
+    "customer_rfm": ("olap_customer_analytics.py", ["customer_rfm.csv", "customer_segments.csv"]),
+}
+
+
+def build_stages() -> dict:
+    """
+    Declare the pipeline stages.
+
+    Returns:
+        dict: Stage name -> {"command", "inputs", "outputs"}, in pipeline order.
+    """
+    prepared = [PREPARED_DATA_DIR.joinpath(f"{table}_data_prepared.csv") for table in TABLES]
+    stages = {
+        "data_prep": {
+            "command": [pathlib.Path("scripts").joinpath("data_prep.py")],
+            "inputs": [RAW_DATA_DIR.joinpath(f"{table}_data.csv") for table in TABLES]
+            + [pathlib.Path("scripts").joinpath("data_scrubber.py")],
+            "outputs": prepared,
+        },
+        "etl_to_dw": {
+            "command": [pathlib.Path("scripts").joinpath("etl_to_dw.py")],
+            "inputs": prepared,
+            "outputs": [DB_FILE],
+        },
+        "olap_cubing": {
+            "command": [pathlib.Path("scripts").joinpath("olap", "olap_cubing.py")],
+            "inputs": [DB_FILE] + prepared,
+            "outputs": [CUBE_FILE],
+        },
+        "bitmap_index": {
+            "command": [pathlib.Path("scripts").joinpath("olap", "olap_bitmap_index.py")],
+            "inputs": [DB_FILE, CUBE_FILE, prepared[0]],
+            "outputs": [CUBE_FILE.with_name(f"{name}_bitmap_index.npz") for name in ["sales", "cube"]],
+        },
+    }
+    for name, (module_file, results) in ANALYSES.items():
+        stages[name] = {
+            "command": [REPORT_RUNNER, name],
+            # customer_rfm reads the warehouse; the others read the cube (and the
+            # dimension tables when the cube lacks their attributes)
+            "inputs": ([DB_FILE] if name == "customer_rfm" else [CUBE_FILE] + prepared[:2])
+            + [pathlib.Path("scripts").joinpath("olap", module_file)],
+            "outputs": [RESULTS_DIR.joinpath(result) for result in results],
+        }
+    for stage in stages.values():
+        # A stage's own script is one of its inputs
+        stage["inputs"] = [stage["command"][0]] + stage["inputs"]
+    return stages
+
+
+def upstream_stages(stages: dict) -> dict:
+    """Return stage name -> names of the stages producing its inputs."""
+    producers = {output: name for name, stage in stages.items() for output in stage["outputs"]}
+    return {
+        name: sorted({producers[path] for path in stage["inputs"] if path in producers} - {name})
+        for name, stage in stages.items()
+    }
+
+
+def select_stages(stages: dict, targets: list) -> list:
+    """Return the targets and every stage they depend on, in pipeline order."""
+    unknown = [target for target in targets if target not in stages]
+    if unknown:
+        raise ValueError(f"Unknown stages: {unknown}. Available: {list(stages)}")
+    upstream = upstream_stages(stages)
+    selected, queue = set(), list(targets or stages)
+    while queue:
+        name = queue.pop()
+        if name not in selected:
+            selected.add(name)
+            queue.extend(upstream[name])
+    return [name for name in stages if name in selected]
+
+
+def load_state(state_file: pathlib.Path = STATE_FILE) -> dict:
+    """Load the stage and file hashes of earlier runs."""
+    path = PROJECT_ROOT.joinpath(state_file)
+    if not path.exists():
+        return {"stages": {}, "files": {}}
+    return json.loads(path.read_text())
+
+
+def save_state(state: dict, state_file: pathlib.Path = STATE_FILE) -> None:
+    """Write the state atomically, so an interrupted run never leaves it half written."""
+    path = PROJECT_ROOT.joinpath(state_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(state, indent=2))
+    os.replace(tmp_path, path)
+
+
+def file_hash(path: pathlib.Path, state: dict) -> str:
+    """Content hash of a file (None if missing), reusing the stored hash while size and mtime are unchanged."""
+    full_path = PROJECT_ROOT.joinpath(path)
+    if not full_path.exists():
+        return None
+    stat = full_path.stat()
+    known = state["files"].get(str(path))
+    if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+        return known["hash"]
+    digest = hash_file(full_path)
+    state["files"][str(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+    return digest
+
+
+def stale_reason(name: str, stage: dict, state: dict) -> tuple:
+    """
+    Decide whether a stage has to run.
+
+    Returns:
+        tuple: (reason to run, or None if the stage is fresh; hash of the current inputs).
+    """
+    input_hashes = {str(path): file_hash(path, state) for path in stage["inputs"]}
+    missing = [path for path, digest in input_hashes.items() if digest is None]
+    if missing:
+        raise FileNotFoundError(f"Stage {name} is missing its inputs {missing}.")
+    inputs_hash = hash_values([str(arg) for arg in stage["command"]], input_hashes)
+
+    previous = state["stages"].get(name)
+    if previous is None:
+        return "no previous run", inputs_hash
+    if previous["inputs"] != inputs_hash:
+        changed = [path for path, digest in input_hashes.items() if previous["input_files"].get(path) != digest]
+        return f"inputs changed: {', '.join(changed) or 'command'}", inputs_hash
+    for path in stage["outputs"]:
+        if file_hash(path, state) != previous["outputs"].get(str(path)):
+            return f"output missing or modified: {path}", inputs_hash
+    return None, inputs_hash
+
+
+def run_command(name: str, stage: dict) -> tuple:
+    """Run a stage's script in a child process. Returns (exit code, seconds)."""
+    command = [sys.executable] + [str(arg) for arg in stage["command"]]
+    logger.info(f"Running stage {name}: {' '.join(command[1:])}")
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        logger.error(f"Stage {name} failed:\n{completed.stderr[-2000:]}")
+    return completed.returncode, time.perf_counter() - start
+
+
+def run_pipeline(targets: list = None, force: list = None, jobs: int = None, state_file: pathlib.Path = STATE_FILE):
+    """
+    Run the stale stages needed for the targets, concurrently where the dependencies allow.
+
+    Args:
+        targets (list, optional): Stages to bring up to date (default: all).
+        force (list, optional): Stages to run even if fresh ("all" for every stage).
+        jobs (int, optional): Maximum stages running at once (default: the CPU count).
+        state_file (pathlib.Path): Where the hashes of earlier runs are kept.
+
+    Returns:
+        list: One report dict per selected stage: Stage, Action (ran, reused,
+            failed or blocked), Reason and Seconds.
+    """
+    stages = build_stages()
+    selected = select_stages(stages, targets or [])
+    upstream = upstream_stages(stages)
+    force = set(stages) if force and "all" in force else set(force or [])
+    state = load_state(state_file)
+    report, running = {}, {}
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        while len(report) < len(selected):
+            for name in selected:
+                if name in report or name in running.values():
+                    continue
+                deps = [dep for dep in upstream[name] if dep in selected]
+                if any(dep not in report for dep in deps):
+                    continue
+                if any(report[dep]["Action"] in ("failed", "blocked") for dep in deps):
+                    report[name] = {"Stage": name, "Action": "blocked", "Reason": "an upstream stage failed",
+                                    "Seconds": 0.0}
+                    continue
+                try:
+                    reason, inputs_hash = stale_reason(name, stages[name], state)
+                except FileNotFoundError as e:
+                    report[name] = {"Stage": name, "Action": "failed", "Reason": str(e), "Seconds": 0.0}
+                    continue
+                if reason is None and name not in force:
+                    report[name] = {"Stage": name, "Action": "reused", "Reason": "inputs unchanged", "Seconds": 0.0}
+                    continue
+                stages[name]["inputs_hash"] = inputs_hash
+                stages[name]["reason"] = reason or "forced"
+                running[pool.submit(run_command, name, stages[name])] = name
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                returncode, seconds = future.result()
+                stage = stages[name]
+                if returncode == 0:
+                    report[name] = {"Stage": name, "Action": "ran", "Reason": stage["reason"], "Seconds": seconds}
+                    state["stages"][name] = {
+                        "inputs": stage["inputs_hash"],
+                        "input_files": {str(path): file_hash(path, state) for path in stage["inputs"]},
+                        "outputs": {str(path): file_hash(path, state) for path in stage["outputs"]},
+                    }
+                else:
+                    report[name] = {"Stage": name, "Action": "failed", "Reason": f"exit code {returncode}",
+                                    "Seconds": seconds}
+                    state["stages"].pop(name, None)
+                save_state(state, state_file)
+
+    save_state(state, state_file)
+    return [report[name] for name in selected]
+
+
+def log_report(report: list, seconds: float) -> None:
+    """Log the run report as a table and write it to REPORT_FILE."""
+    width = max(len(row["Stage"]) for row in report)
+    lines = [f"{'Stage':<{width}}  {'Action':<7}  {'Seconds':>8}  Reason"]
+    lines += [f"{row['Stage']:<{width}}  {row['Action']:<7}  {row['Seconds']:>8.2f}  {row['Reason']}" for row in report]
+    counts = {action: sum(row["Action"] == action for row in report) for action in ["ran", "reused", "failed", "blocked"]}
+    summary = ", ".join(f"{count} {action}" for action, count in counts.items() if count)
+    logger.info(f"Pipeline finished in {seconds:.2f}s ({summary}):\n" + "\n".join(lines))
+
+    path = PROJECT_ROOT.joinpath(REPORT_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"seconds": seconds, "stages": report}, indent=2))
+
+
+def main():
+    """Main function for running the pipeline."""
+    parser = argparse.ArgumentParser(description="Run the pipeline stages whose inputs changed.")
+    parser.add_argument("targets", nargs="*", help="Stages to bring up to date (default: all).")
+    parser.add_argument("--force", nargs="*", default=None,
+                        help="Run these stages even if fresh (no names: the targets; 'all': every stage).")
+    parser.add_argument("--jobs", type=int, default=None, help="Maximum stages running at once.")
+    parser.add_argument("--list", action="store_true", help="List the stages and their dependencies and exit.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile the stages that run and merge their hottest functions into one report.")
+    args = parser.parse_args()
+
+    if args.list:
+        stages = build_stages()
+        for name, deps in upstream_stages(stages).items():
+            print(f"{name:<36} <- {', '.join(deps) or '(raw data)'}")
+        return
+
+    force = args.force
+    if force is not None and not force:
+        force = args.targets or ["all"]
+
+    if args.profile:
+        # Inherited by the stage processes; each run gets its own directory
+        profiles = enable_profiling(DEFAULT_PROFILE_DIR.joinpath(time.strftime("%Y%m%d-%H%M%S")))
+
+    start = time.perf_counter()
+    report = run_pipeline(args.targets, force, args.jobs)
+    log_report(report, time.perf_counter() - start)
+    if args.profile:
+        write_profile_report(sorted(PROJECT_ROOT.joinpath(profiles).glob("*.prof")),
+                             PROJECT_ROOT.joinpath(profiles, "top_functions.txt"))
+    if any(row["Action"] in ("failed", "blocked") for row in report):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
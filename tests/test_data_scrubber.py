@@ -104,6 +104,15 @@ class TestDataScrubber(unittest.TestCase):
         self.assertIsInstance(summary_stats, pd.DataFrame, "Summary statistics should return a DataFrame")
         self.assertIn('Score', summary_stats.columns, "Score should be included in the summary statistics")
 
+    def test_parse_percent_column(self):
+        """Test parse_percent_column method for text percentages."""
+        scrubber = DataScrubber(pd.DataFrame({'Discount': ['5%', ' 10 %', '0', '12.5%', None, 'n/a']}))
+        df_parsed = scrubber.parse_percent_column('Discount')
+        self.assertEqual(df_parsed['Discount'].iloc[:4].tolist(), [5, 10, 0, 12.5], "Percentages not parsed correctly")
+        self.assertEqual(df_parsed['Discount'].isna().sum(), 2, "Missing and invalid values should become NaN")
+        with self.assertRaises(ValueError):
+            scrubber.parse_percent_column('Missing')
+
 
 # Run the tests with verbosity=2 for detailed output
 if __name__ == "__main__":
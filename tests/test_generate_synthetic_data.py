@@ -0,0 +1,70 @@
+import unittest
+import pathlib
+import sys
+import tempfile
+from unittest import mock
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+import scripts.generate_synthetic_data as generator  # noqa: E402
+
+RAW_DATA_DIR = PROJECT_ROOT.joinpath("data", "raw")
+FILES = ["customers_data.csv", "products_data.csv", "sales_data.csv"]
+
+
+def generate(output_dir: pathlib.Path, *args) -> dict:
+    options = generator.parse_args(
+        ["--customers", "300", "--products", "20", "--sales", "5000", "--duplicate-rate", "0.05",
+         "--null-rate", "0.02", "--output-dir", str(output_dir), *args]
+    )
+    # Small blocks, so the test also covers appending block after block
+    with mock.patch.object(generator, "GENERATION_BLOCK_ROWS", 1000):
+        return generator.generate(options)
+
+
+class TestGenerateSyntheticData(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = pathlib.Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_schema_as_raw_files(self):
+        generate(self.output_dir)
+        for file_name in FILES:
+            with open(RAW_DATA_DIR.joinpath(file_name)) as raw, open(self.output_dir.joinpath(file_name)) as synthetic:
+                self.assertEqual(synthetic.readline(), raw.readline())
+
+    def test_same_seed_same_files(self):
+        generate(self.output_dir.joinpath("first"))
+        generate(self.output_dir.joinpath("second"))
+        generate(self.output_dir.joinpath("other"), "--seed", "1")
+        for file_name in FILES:
+            first = self.output_dir.joinpath("first", file_name).read_bytes()
+            self.assertEqual(first, self.output_dir.joinpath("second", file_name).read_bytes())
+        self.assertNotEqual(first, self.output_dir.joinpath("other", "sales_data.csv").read_bytes())
+
+    def test_raw_quirks(self):
+        written = generate(self.output_dir)
+        sales = pd.read_csv(self.output_dir.joinpath("sales_data.csv"), dtype=str)
+        self.assertEqual(len(sales), written["sales_data.csv"])
+        self.assertEqual(sales.drop_duplicates()["TransactionID"].nunique(), 5000)
+        self.assertGreater(sales.duplicated().sum(), 0)
+        self.assertGreater(sales["PaymentType"].isna().sum(), 0)
+        # data_prep fills blanks in some columns only; the others never have any
+        self.assertEqual(sales["SaleAmount"].isna().sum(), 0)
+        products = pd.read_csv(self.output_dir.joinpath("products_data.csv"))
+        self.assertEqual(products.isna().sum().sum(), 0)
+        self.assertTrue(sales["SaleDate"].str.fullmatch(r"[1-9]\d?/[1-9]\d?/2024").all())
+        self.assertTrue(sales["DiscountPercent"].dropna().str.fullmatch(r"\d+%").all())
+        self.assertTrue(pd.to_datetime(sales["SaleDate"], format="%m/%d/%Y").is_monotonic_increasing)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import pathlib
+import sys
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.instrumentation import collect_stages, stage, stage_summary, summarize_stages, timed  # noqa: E402
+
+
+@timed("dedupe {label}")
+def dedupe(df: pd.DataFrame, label: str) -> pd.DataFrame:
+    return df.drop_duplicates()
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_records_rows_and_times(self):
+        df = pd.DataFrame({"a": [1, 1, 2]})
+        with collect_stages() as records:
+            dedupe(df, label="sales")
+            with stage("count", rows_in=3) as timing:
+                timing.rows_out = 1
+        summary = stage_summary(records).set_index("Stage")
+        self.assertEqual(list(summary.index), ["dedupe sales", "count"])
+        self.assertEqual(summary.loc["dedupe sales", "Rows In"], 3)
+        self.assertEqual(summary.loc["dedupe sales", "Rows Out"], 2)
+        self.assertTrue((summary["Seconds"] >= 0).all() and (summary["CPU Seconds"] >= 0).all())
+
+    def test_summary_kept_when_run_fails(self):
+        @summarize_stages("failing run")
+        def run():
+            with stage("ok"):
+                pass
+            with stage("broken"):
+                raise ValueError("boom")
+
+        with collect_stages() as records:
+            with self.assertRaises(ValueError):
+                run()
+        self.assertEqual([(record.name, record.status) for record in records], [("ok", "ok"), ("broken", "failed")])
+
+    def test_nothing_kept_outside_collect_stages(self):
+        with collect_stages() as records:
+            pass
+        with stage("unrecorded"):
+            pass
+        self.assertEqual(records, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import pathlib
+import sys
+from unittest import mock
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.lazy_import import EAGER_IMPORTS_ENV_VAR, LazyModule, lazy_import  # noqa: E402
+
+# A small standard-library module nothing else in the test suite imports
+MODULE = "wave"
+
+
+class TestLazyImport(unittest.TestCase):
+
+    def setUp(self):
+        sys.modules.pop(MODULE, None)
+
+    def test_imports_on_first_attribute_access(self):
+        module = lazy_import(MODULE)
+        self.assertIsInstance(module, LazyModule)
+        self.assertNotIn(MODULE, sys.modules)
+        self.assertTrue(callable(module.open))
+        self.assertIn(MODULE, sys.modules)
+        self.assertTrue(module.is_loaded)
+
+    def test_returns_imported_module(self):
+        module = lazy_import("json")
+        self.assertIs(module, sys.modules["json"])
+
+    def test_eager_imports(self):
+        with mock.patch.dict("os.environ", {EAGER_IMPORTS_ENV_VAR: "1"}):
+            module = lazy_import(MODULE)
+        self.assertIs(module, sys.modules[MODULE])
+
+
+if __name__ == "__main__":
+    unittest.main()
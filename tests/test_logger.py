@@ -0,0 +1,45 @@
+import unittest
+import pathlib
+import sys
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.logger import logger, log_dataframe_preview  # noqa: E402
+
+
+class CountingFrame(pd.DataFrame):
+    """DataFrame counting how often its preview is built."""
+
+    previews = 0
+
+    def head(self, n: int = 5):
+        CountingFrame.previews += 1
+        return super().head(n)
+
+
+class TestLogger(unittest.TestCase):
+
+    def setUp(self):
+        CountingFrame.previews = 0
+
+    def test_preview_not_formatted_below_sink_level(self):
+        log_dataframe_preview(CountingFrame({"a": range(10)}), "preview")
+        self.assertEqual(CountingFrame.previews, 0)
+
+    def test_preview_formatted_when_level_enabled(self):
+        messages = []
+        sink = logger.add(messages.append, level="DEBUG", format="{message}")
+        try:
+            log_dataframe_preview(CountingFrame({"a": range(10)}), "preview", rows=2)
+        finally:
+            logger.remove(sink)
+        self.assertEqual(CountingFrame.previews, 1)
+        self.assertEqual([line.strip() for line in messages[0].splitlines()], ["preview:", "a", "0  0", "1  1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
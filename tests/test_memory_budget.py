@@ -0,0 +1,59 @@
+import os
+import unittest
+import pathlib
+import sys
+import tempfile
+from unittest import mock
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.memory_budget import (  # noqa: E402
+    MEMORY_BUDGET_ENV_VAR,
+    SpillDirectory,
+    chunk_rows_for_budget,
+    estimate_csv_frame_bytes,
+    memory_budget_bytes,
+)
+
+
+class TestMemoryBudget(unittest.TestCase):
+
+    def test_budget_from_argument_or_environment(self):
+        with mock.patch.dict(os.environ, {MEMORY_BUDGET_ENV_VAR: "64"}):
+            self.assertEqual(memory_budget_bytes(), 64 * 2**20)
+            self.assertEqual(memory_budget_bytes(2), 2 * 2**20)
+        with mock.patch.dict(os.environ, {MEMORY_BUDGET_ENV_VAR: ""}):
+            self.assertIsNone(memory_budget_bytes())
+
+    def test_estimate_close_to_loaded_size(self):
+        df = pd.DataFrame({"id": range(5000), "name": [f"customer {i}" for i in range(5000)]})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp, "data.csv")
+            df.to_csv(path, index=False)
+            estimate, bytes_per_row = estimate_csv_frame_bytes(path, sample_rows=500)
+        actual = df.memory_usage(deep=True, index=False).sum()
+        # The first rows have shorter IDs than the rest, so the estimate is a little high
+        self.assertAlmostEqual(estimate / actual, 1.0, delta=0.2)
+        self.assertGreater(bytes_per_row, 0)
+
+    def test_chunk_rows_fit_budget(self):
+        self.assertEqual(chunk_rows_for_budget(100.0, 10_000_000, working_set_factor=2.0), 50_000)
+        self.assertEqual(chunk_rows_for_budget(100.0, 1_000), 1_000)  # never below MIN_CHUNK_ROWS
+
+    def test_spilled_partitions_read_back_in_order(self):
+        with SpillDirectory("test") as spill:
+            spill.write(1, pd.DataFrame({"a": [1]}))
+            spill.write(0, pd.DataFrame({"a": [2]}))
+            spill.write(1, pd.DataFrame({"a": [3]}))
+            self.assertEqual(spill.partitions(), [0, 1])
+            self.assertEqual([df["a"].tolist() for df in spill.read(1)], [[1], [3]])
+            path = spill.path
+        self.assertFalse(path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import pathlib
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_bitmap_index import BitmapIndex, refresh_index  # noqa: E402
+
+rng = np.random.default_rng(7)
+sales_df = pd.DataFrame({
+    "Region": rng.choice(["East", "West", "North", "South"], 203),
+    "Month": rng.integers(1, 13, 203),
+    "ProductID": rng.integers(101, 111, 203),
+    "StoreID": rng.choice(["401", "402", None], 203),
+    "SaleAmount": rng.random(203),
+})
+
+
+class TestOlapBitmapIndex(unittest.TestCase):
+
+    def test_filter_matches_boolean_masks(self):
+        index = BitmapIndex.build(sales_df)
+        self.assertEqual(index.columns, ["Region", "ProductID", "Month", "StoreID"])
+        predicates = {"Region": "East", "Month": [1, 2, 3], "ProductID": [105, 106]}
+        expected = sales_df[
+            (sales_df["Region"] == "East") & sales_df["Month"].isin([1, 2, 3]) & sales_df["ProductID"].isin([105, 106])
+        ]
+        pd.testing.assert_frame_equal(index.filter(sales_df, predicates), expected)
+        self.assertEqual(index.count({"StoreID": "401"}), (sales_df["StoreID"] == "401").sum())
+        self.assertEqual(len(index.filter(sales_df, {"Region": "Nowhere"})), 0)
+        with self.assertRaises(ValueError):
+            index.query({"CustomerID": 1001})
+
+    def test_append_matches_build(self):
+        index = BitmapIndex.build(sales_df.iloc[:61])  # not a multiple of 8 rows
+        index.append(sales_df.iloc[61:])
+        rebuilt = BitmapIndex.build(sales_df)
+        for column in rebuilt.columns:
+            self.assertEqual(set(index.values(column)), set(rebuilt.values(column)))
+            for value in rebuilt.values(column):
+                np.testing.assert_array_equal(index.rows(column, value), rebuilt.rows(column, value))
+
+    def test_rare_values_stored_as_row_positions(self):
+        many_products = pd.DataFrame({"ProductID": np.arange(4000) % 500, "Region": np.repeat(["East", "West"], 2000)})
+        index = BitmapIndex.build(many_products)
+        # 500 rare products take 8 rows x 4 bytes each; the two regions a packed bit per row
+        self.assertEqual(index.nbytes(), 4000 * 4 + 2 * 500)
+        predicates = {"ProductID": [3, 499], "Region": "West"}
+        expected = many_products[many_products["ProductID"].isin([3, 499]) & (many_products["Region"] == "West")]
+        pd.testing.assert_frame_equal(index.filter(many_products, predicates), expected)
+        self.assertEqual(index.count({"Region": ["East", "West"]}), 4000)
+
+        # A common value ORed with rare ones, within a column
+        mixed = many_products.assign(ProductID=np.where(np.arange(4000) < 1000, 0, many_products["ProductID"]))
+        index = BitmapIndex.build(mixed)
+        expected = mixed[mixed["ProductID"].isin([0, 499]) & (mixed["Region"] == "West")]
+        pd.testing.assert_frame_equal(index.filter(mixed, {"ProductID": [0, 499], "Region": "West"}), expected)
+
+    def test_refresh_indexes_appended_rows_and_rebuilds_changed_data(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp, "index.npz")
+            refresh_index(path, sales_df.iloc[:100])
+            loaded = BitmapIndex.load(path)
+            self.assertEqual(loaded.n_rows, 100)
+
+            refreshed = refresh_index(path, sales_df)
+            self.assertEqual(refreshed.n_rows, len(sales_df))
+            pd.testing.assert_frame_equal(
+                BitmapIndex.load(path).filter(sales_df, {"Region": "West"}), sales_df[sales_df["Region"] == "West"]
+            )
+
+            changed = sales_df.assign(Region="East")
+            rebuilt = refresh_index(path, changed)
+            self.assertEqual(rebuilt.values("Region"), ["East"])
+
+
+if __name__ == "__main__":
+    unittest.main()
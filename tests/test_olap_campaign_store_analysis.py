@@ -0,0 +1,51 @@
+import unittest
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_campaign_store_analysis import discount_report  # noqa: E402
+
+rng = np.random.default_rng(5)
+gross = rng.integers(10, 500, 120).astype(float)
+discounts = gross * rng.choice([0, 5, 10], 120) / 100
+cube = pd.DataFrame({
+    "CampaignID": rng.integers(0, 3, 120),
+    "StoreID": rng.choice([401, 402, 403], 120),
+    "PaymentType": rng.choice(["Cash", "CreditCard"], 120),
+    "SaleAmount_sum": gross,
+    "SaleAmount_mean": gross,
+    "DiscountAmount_sum": discounts,
+    "NetSaleAmount_sum": gross - discounts,
+    "TransactionID_count": 1,
+})
+
+
+class TestOlapCampaignStoreAnalysis(unittest.TestCase):
+
+    def test_report_by_campaign(self):
+        report = discount_report(cube, ["CampaignID"])
+        self.assertEqual(report["CampaignID"].tolist(), [0, 1, 2])
+        expected = cube.groupby("CampaignID")["DiscountAmount_sum"].sum()
+        np.testing.assert_allclose(report["Discounts"], expected)
+        np.testing.assert_allclose(report["GrossSales"] - report["Discounts"], report["NetSales"])
+        np.testing.assert_allclose(report["DiscountRatePct"], expected.to_numpy() / report["GrossSales"] * 100)
+        self.assertEqual(report["TransactionCount"].sum(), len(cube))
+
+    def test_report_by_store_and_payment_type(self):
+        report = discount_report(cube, ["StoreID", "PaymentType"])
+        self.assertEqual(len(report), cube.groupby(["StoreID", "PaymentType"]).ngroups)
+        self.assertAlmostEqual(report["NetSales"].sum(), cube["NetSaleAmount_sum"].sum())
+
+    def test_cube_without_discount_measures(self):
+        with self.assertRaises(ValueError):
+            discount_report(cube.drop(columns=["NetSaleAmount_sum"]), ["CampaignID"])
+
+
+if __name__ == "__main__":
+    unittest.main()
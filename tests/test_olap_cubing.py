@@ -0,0 +1,207 @@
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import (  # noqa: E402
+    add_dimension_attributes,
+    add_discount_measures,
+    create_olap_cube,
+    create_olap_cube_in_dw,
+    create_olap_cube_parallel,
+    create_olap_cube_spilled,
+    prepare_sales_for_cube,
+    sql_joins,
+)
+from scripts.olap.olap_sampling import build_sample_query  # noqa: E402
+from scripts.olap.olap_sketches import add_distinct_sketches  # noqa: E402
+from scripts.olap.olap_numpy_engine import aggregate_dense, create_olap_cube_numpy, linearize_cells  # noqa: E402
+
+DIMENSIONS = ["Month", "Region", "ProductID", "CustomerID"]
+METRICS = {"SaleAmount": ["sum", "mean"], "TransactionID": "count"}
+
+# Sales rows already merged with the customer Region
+sales_df = pd.DataFrame({
+    "TransactionID": [1, 2, 3, 4, 5, 6],
+    "CustomerID": [1001, 1002, 1001, 1003, 1002, 1001],
+    "ProductID": [101, 102, 101, 103, 102, 103],
+    "SaleAmount": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0],
+    "Month": [1, 1, 1, 2, 2, 2],
+    "Region": ["East", "West", "East", "North", "West", "East"],
+})
+
+products_df = pd.DataFrame({
+    "ProductID": [101, 102, 103],
+    "ProductName": ["laptop", "hoodie", "cable"],
+    "Category": ["Electronics", "Clothing", "Electronics"],
+})
+
+customers_df = pd.DataFrame({
+    "CustomerID": [1001, 1002, 1003],
+    "PreferredContactMethod": ["Mail", "Phone", "Text"],
+})
+
+
+class TestOlapCubing(unittest.TestCase):
+
+    def test_create_olap_cube(self):
+        cube = create_olap_cube(sales_df, DIMENSIONS, METRICS)
+        self.assertEqual(len(cube), 5, "Cube should have one row per distinct cell")
+        self.assertEqual(cube["SaleAmount_sum"].sum(), sales_df["SaleAmount"].sum(), "Cube total should match sales total")
+        self.assertEqual(cube["TransactionIDs"].map(len).sum(), len(sales_df), "Every transaction should be traceable")
+
+    def test_create_olap_cube_with_attributes(self):
+        attributes = ["ProductName", "Category", "PreferredContactMethod"]
+        enriched = add_dimension_attributes(sales_df, attributes, customers_df, products_df)
+        cube = create_olap_cube(enriched, DIMENSIONS, METRICS, attributes)
+        self.assertEqual(cube.columns.tolist()[:7], DIMENSIONS + attributes, "Attributes should follow the dimensions")
+        self.assertIsInstance(cube["ProductName"].dtype, pd.CategoricalDtype, "Attributes should be dictionary-encoded")
+        laptop_rows = cube[cube["ProductID"] == 101]
+        self.assertTrue((laptop_rows["ProductName"] == "laptop").all(), "Attribute values do not match their key")
+
+    def test_add_dimension_attributes_skips_present_columns(self):
+        enriched = add_dimension_attributes(sales_df, ["ProductName"], products_df=products_df)
+        again = add_dimension_attributes(enriched, ["ProductName"])
+        self.assertEqual(len(again.columns), len(enriched.columns), "Present attributes should not be joined again")
+        with self.assertRaises(ValueError):
+            add_dimension_attributes(sales_df, ["ProductName"])
+
+    def test_create_olap_cube_in_dw_matches_pandas(self):
+        customers = customers_df.assign(Region=["East", "West", "North"])
+        warehouse_sales = sales_df.drop(columns=["Month", "Region"]).assign(
+            SaleDate=["2024-01-06", "2024-01-16", "2024-01-16", "2024-02-09", "2024-02-24", "2024-02-27"]
+        )
+        dimensions = ["DayOfWeek", "Month", "Region", "ProductID", "CustomerID"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = pathlib.Path(tmp_dir).joinpath("test.db")
+            with sqlite3.connect(db_path) as conn:
+                warehouse_sales.to_sql("sales", conn, index=False)
+                customers.to_sql("customer", conn, index=False)
+                products_df.to_sql("product", conn, index=False)
+            pushed_down = create_olap_cube_in_dw(db_path, dimensions, METRICS, ["ProductName"])
+
+        prepared = prepare_sales_for_cube(warehouse_sales, customers, products_df, ["ProductName"])
+        expected = create_olap_cube(prepared, dimensions, METRICS, ["ProductName"])
+        pd.testing.assert_frame_equal(pushed_down, expected, check_dtype=False, check_categorical=False)
+
+    def test_discount_measures_in_dw_match_pandas(self):
+        warehouse_sales = sales_df.drop(columns=["Month", "Region"]).assign(
+            SaleDate="2024-01-06", DiscountPercent=["5%", "10", None, "0%", "15%", "20%"]
+        )
+        prepared = add_discount_measures(warehouse_sales)
+        self.assertEqual(prepared["DiscountPercent"].tolist(), [5, 10, 0, 0, 15, 20])
+        pd.testing.assert_series_equal(
+            prepared["DiscountAmount"] + prepared["NetSaleAmount"], prepared["SaleAmount"], check_names=False
+        )
+
+        metrics = {"SaleAmount": "sum", "DiscountAmount": "sum", "NetSaleAmount": "sum"}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = pathlib.Path(tmp_dir).joinpath("test.db")
+            with sqlite3.connect(db_path) as conn:
+                warehouse_sales.to_sql("sales", conn, index=False)
+            pushed_down = create_olap_cube_in_dw(db_path, ["ProductID"], metrics)
+        expected = create_olap_cube(prepared, ["ProductID"], metrics)
+        pd.testing.assert_frame_equal(pushed_down, expected, check_dtype=False)
+
+    def test_sql_joins_shared_by_cube_and_sample_queries(self):
+        self.assertEqual(sql_joins(["Month", "ProductID", "SaleAmount"]), "")
+        joins = sql_joins(["Region", "ProductName"])
+        self.assertIn("JOIN customer c", joins)
+        self.assertIn("JOIN product p", joins)
+        self.assertIn(joins, build_sample_query(["Month"], {"SaleAmount": "sum"}, ["ProductName"]))
+        with self.assertRaises(ValueError):
+            sql_joins(["Planet"])
+
+    def test_create_olap_cube_parallel_matches_single_process(self):
+        expected = create_olap_cube(sales_df, DIMENSIONS, METRICS)
+        for partition_by in [None, "CustomerID"]:
+            parallel = create_olap_cube_parallel(sales_df, DIMENSIONS, METRICS, workers=2, partition_by=partition_by)
+            pd.testing.assert_frame_equal(parallel, expected, check_dtype=False)
+
+    def test_create_olap_cube_spilled_matches_in_memory(self):
+        customers = customers_df.assign(Region=["East", "West", "North"])
+        warehouse_sales = sales_df.drop(columns=["Month", "Region"]).assign(
+            SaleDate=["2024-01-06", "2024-01-16", "2024-01-16", "2024-02-09", "2024-02-24", "2024-02-27"]
+        )
+        dimensions = ["Month", "Region", "ProductID", "CustomerID"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = pathlib.Path(tmp_dir).joinpath("test.db")
+            with sqlite3.connect(db_path) as conn:
+                warehouse_sales.to_sql("sales", conn, index=False)
+            spilled = create_olap_cube_spilled(
+                db_path, customers, products_df, dimensions, METRICS, ["ProductName"],
+                chunk_rows=2, partitions=3, distinct_columns=["CustomerID"],
+            )
+
+        prepared = prepare_sales_for_cube(warehouse_sales, customers, products_df, ["ProductName"])
+        expected = create_olap_cube(prepared, dimensions, METRICS, ["ProductName"])
+        expected = add_distinct_sketches(expected, prepared, dimensions, ["CustomerID"])
+        pd.testing.assert_frame_equal(spilled, expected, check_dtype=False, check_categorical=False)
+
+    def test_create_olap_cube_spilled_with_mixed_chunk_dtypes(self):
+        # Chunks read CampaignID as int64, as object (with 'Unknown') or as float64 (with a NULL)
+        campaigns = [2, 2, 1, 2, 2, "Unknown", 1, 2, 2, None, 1, 2]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = pathlib.Path(tmp_dir).joinpath("test.db")
+            with sqlite3.connect(db_path) as conn:
+                conn.execute(
+                    "CREATE TABLE sales (TransactionID INTEGER, SaleDate TEXT, CustomerID INTEGER, "
+                    "ProductID INTEGER, CampaignID INTEGER, SaleAmount REAL)"
+                )
+                conn.executemany(
+                    "INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?)",
+                    [(i, "2024-02-09", 1001, 101, campaign, 10.0) for i, campaign in enumerate(campaigns)],
+                )
+            spilled = create_olap_cube_spilled(
+                db_path, customers_df.assign(Region="East"), products_df, ["Month", "CampaignID"], METRICS,
+                chunk_rows=4, partitions=3,
+            )
+
+        self.assertFalse(spilled.duplicated(["Month", "CampaignID"]).any(), "Each cell should appear once")
+        self.assertEqual(spilled["TransactionID_count"].sum(), len(campaigns) - 1, "NULL campaigns are not cells")
+        self.assertEqual(len(spilled), 3, "Campaigns 1, 2 and Unknown")
+
+    def test_create_olap_cube_numpy_matches_pandas(self):
+        enriched = add_dimension_attributes(sales_df, ["ProductName"], products_df=products_df)
+        expected = create_olap_cube(enriched, DIMENSIONS, METRICS, ["ProductName"])
+        for dense_limit in [10_000, 0]:  # dense and sparse cell layouts
+            cube = create_olap_cube_numpy(enriched, DIMENSIONS, METRICS, ["ProductName"], dense_limit=dense_limit)
+            pd.testing.assert_frame_equal(cube, expected, check_dtype=False)
+
+    def test_create_olap_cube_numpy_beyond_64_bit_cell_space(self):
+        # Ten dimensions of 300 values each: 300**10 cells, far past int64
+        rng = np.random.default_rng(7)
+        rows = 5000
+        wide = pd.DataFrame({f"D{i}": rng.integers(0, 300, rows) for i in range(10)})
+        wide["D0"] = wide["D0"] % 3  # some cells hold several rows
+        wide["D1"] = wide["D1"] % 2
+        for i in range(2, 10):
+            wide.loc[wide.index % 7 != 0, f"D{i}"] = 0
+        wide = wide.assign(TransactionID=np.arange(rows), SaleAmount=rng.random(rows))
+        dimensions = [f"D{i}" for i in range(10)]
+        with self.assertRaises(ValueError):
+            linearize_cells([wide[dim].to_numpy() for dim in dimensions], (300,) * 10)
+
+        cube = create_olap_cube_numpy(wide, dimensions, METRICS)
+        expected = create_olap_cube(wide, dimensions, METRICS)
+        self.assertLess(len(cube), rows, "Some cells should hold several rows")
+        pd.testing.assert_frame_equal(cube, expected, check_dtype=False)
+
+    def test_aggregate_dense(self):
+        dense, uniques = aggregate_dense(sales_df, ["Month", "Region"], "SaleAmount")
+        self.assertEqual(dense.shape, (2, 3), "Dense array should be shaped by the dimension cardinalities")
+        self.assertEqual(dense.sum(), sales_df["SaleAmount"].sum(), "Dense array total should match sales total")
+        self.assertEqual(list(uniques[1]), ["East", "North", "West"], "Axis labels should be sorted")
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
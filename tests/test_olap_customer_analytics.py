@@ -0,0 +1,100 @@
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_customer_analytics import (  # noqa: E402
+    compute_rfm,
+    quantile_scores,
+    update_customer_state,
+)
+
+rng = np.random.default_rng(5)
+sales = pd.DataFrame({
+    "TransactionID": np.arange(1, 301),
+    "CustomerID": rng.integers(1000, 1040, 300),
+    "SaleAmount": rng.integers(5, 500, 300).astype(float),
+    "SaleDate": pd.Series(pd.date_range("2024-01-01", periods=300, freq="D")).dt.strftime("%Y-%m-%d"),
+})
+
+
+class TestOlapCustomerAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = pathlib.Path(self.tmp.name).joinpath("smart_sales.db")
+        self.state_file = pathlib.Path(self.tmp.name).joinpath("state.pkl")
+        self.write_sales(sales.iloc[:200], "replace")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_sales(self, rows: pd.DataFrame, if_exists: str = "append"):
+        conn = sqlite3.connect(self.db_path)
+        rows.to_sql("sales", conn, if_exists=if_exists, index=False)
+        conn.close()
+
+    def test_state_matches_groupby(self):
+        customers = update_customer_state(self.db_path, self.state_file)["customers"]
+        expected = sales.iloc[:200].groupby("CustomerID").agg(
+            Frequency=("TransactionID", "count"), Monetary=("SaleAmount", "sum"), LastPurchase=("SaleDate", "max")
+        )
+        customers = customers.set_index("CustomerID")
+        np.testing.assert_array_equal(customers["Frequency"], expected["Frequency"])
+        np.testing.assert_allclose(customers["Monetary"], expected["Monetary"])
+        self.assertEqual(customers["LastPurchase"].dt.strftime("%Y-%m-%d").tolist(), expected["LastPurchase"].tolist())
+
+    def test_incremental_update_matches_full_rebuild(self):
+        update_customer_state(self.db_path, self.state_file)
+        self.write_sales(sales.iloc[200:])
+        incremental = update_customer_state(self.db_path, self.state_file)
+        full = update_customer_state(self.db_path, self.state_file, full=True)
+        self.assertEqual(incremental["watermark"], 300)
+        self.assertEqual(incremental["sales_rows"], 300)
+        pd.testing.assert_frame_equal(incremental["customers"], full["customers"])
+
+    def test_changed_history_rebuilds_state(self):
+        update_customer_state(self.db_path, self.state_file)
+        # Reload the warehouse with only part of the history, as a rebuild with fewer rows would
+        self.write_sales(sales.iloc[:150], "replace")
+        state = update_customer_state(self.db_path, self.state_file)
+        self.assertEqual(state["sales_rows"], 150)
+        self.assertEqual(state["customers"]["Frequency"].sum(), 150)
+
+    def test_reload_with_same_row_count_rebuilds_state(self):
+        update_customer_state(self.db_path, self.state_file)
+        # etl_to_dw.py reloads every row; here with the same rows but other amounts and customers
+        reloaded = sales.iloc[:200].assign(
+            SaleAmount=sales["SaleAmount"].iloc[:200] + 1, CustomerID=sales["CustomerID"].iloc[:200][::-1].to_numpy()
+        )
+        self.write_sales(reloaded, "replace")
+        state = update_customer_state(self.db_path, self.state_file)
+        full = update_customer_state(self.db_path, self.state_file, full=True)
+        self.assertEqual(state["sales_rows"], 200)
+        pd.testing.assert_frame_equal(state["customers"], full["customers"])
+        np.testing.assert_allclose(state["customers"]["Monetary"].sum(), reloaded["SaleAmount"].sum())
+
+    def test_rfm_scores_and_segments(self):
+        rfm = compute_rfm(update_customer_state(self.db_path, self.state_file)["customers"])
+        for column in ["RScore", "FScore", "MScore"]:
+            self.assertTrue(rfm[column].between(1, 5).all())
+        self.assertEqual(rfm.loc[rfm["RecencyDays"].idxmin(), "RScore"], 5)
+        np.testing.assert_allclose(rfm["AverageBasket"], rfm["Monetary"] / rfm["Frequency"])
+        self.assertFalse((rfm["Segment"] == "Other").any())
+
+    def test_quantile_scores_ties(self):
+        scores = quantile_scores(pd.Series([1, 1, 1, 1, 2, 3, 4, 5, 6, 7]))
+        self.assertEqual(len(set(scores[:4])), 1)
+        self.assertEqual(scores[-1], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
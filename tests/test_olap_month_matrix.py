@@ -0,0 +1,59 @@
+import unittest
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_goal_sales_by_month import analyze_sales_by_month  # noqa: E402
+from scripts.olap.olap_month_matrix import build_month_matrix, month_runs  # noqa: E402
+
+rng = np.random.default_rng(3)
+cube = pd.DataFrame({
+    "Month": rng.integers(1, 13, 300),
+    "ProductID": rng.integers(101, 109, 300),
+    "SaleAmount_sum": rng.integers(1, 500, 300).astype(float),
+    "TransactionID_count": rng.integers(1, 4, 300),
+})
+
+
+class TestOlapMonthMatrix(unittest.TestCase):
+
+    def test_month_runs(self):
+        self.assertEqual(month_runs([10, 3, 4, 5, 4]), [(3, 5), (10, 10)])
+        with self.assertRaises(ValueError):
+            month_runs([0, 13])
+
+    def test_month_rows_match_groupby(self):
+        matrix = build_month_matrix(cube, "ProductID")
+        expected = (
+            cube[cube["Month"].isin([3, 10])]
+            .groupby(["Month", "ProductID"])[["SaleAmount_sum", "TransactionID_count"]].sum().reset_index()
+        )
+        pd.testing.assert_frame_equal(matrix.month_rows([10, 3]), expected)
+
+    def test_window_totals_match_groupby(self):
+        matrix = build_month_matrix(cube, "ProductID")
+        months = [1, 2, 3, 7, 11, 12]
+        expected = (
+            cube[cube["Month"].isin(months)]
+            .groupby("ProductID")[["SaleAmount_sum", "TransactionID_count"]].sum().reset_index()
+        )
+        pd.testing.assert_frame_equal(matrix.window_totals(months), expected)
+
+    def test_month_totals_match_groupby(self):
+        matrix = build_month_matrix(cube[cube["Month"] != 5], "ProductID")
+        expected = cube[cube["Month"].isin([4, 6])].groupby("Month", as_index=False)["SaleAmount_sum"].sum()
+        pd.testing.assert_frame_equal(matrix.month_totals([6, 5, 4]), expected)
+
+        by_month = analyze_sales_by_month(cube, months=[4, 6])
+        with_matrix = analyze_sales_by_month(cube, months=[4, 6], month_matrix=build_month_matrix(cube, "ProductID"))
+        pd.testing.assert_frame_equal(by_month, with_matrix)
+
+
+if __name__ == "__main__":
+    unittest.main()
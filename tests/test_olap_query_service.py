@@ -0,0 +1,118 @@
+import unittest
+import asyncio
+import json
+import os
+import pathlib
+import sys
+import tempfile
+from http import HTTPStatus
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_query_service import OlapQueryService, QueryError, filter_rows, parse_query  # noqa: E402
+
+result = pd.DataFrame({
+    "Month": [1, 2, 3, 3],
+    "Region": ["East", "West", "East", "West"],
+    "TotalSales": [10.0, 20.0, 30.0, 40.0],
+})
+
+
+class TestOlapQueryService(unittest.TestCase):
+
+    def test_parse_query_splits_commas(self):
+        params = parse_query("slow_months=3,10&Region=East&Region=West")
+        self.assertEqual(params, {"slow_months": ["3", "10"], "Region": ["East", "West"]})
+
+    def test_filter_rows(self):
+        filtered = filter_rows(result, {"Month": ["3"], "limit": ["1"]})
+        self.assertEqual(filtered["TotalSales"].tolist(), [30.0], "Should filter on the text of integer columns")
+        with self.assertRaises(ValueError):
+            filter_rows(result, {"Product": ["hat"]})
+
+
+    def test_filter_on_unknown_column_is_a_query_error(self):
+        with self.assertRaises(QueryError):
+            filter_rows(result, {"Product": ["hat"]})
+
+
+# A cube carrying every dimension attribute, so workers load no dimension tables
+cube = pd.DataFrame({
+    "DayOfWeek": ["Monday", "Tuesday", "Monday", "Friday"],
+    "Month": [1, 2, 3, 3],
+    "Region": ["East", "West", "East", "West"],
+    "ProductID": [101, 102, 101, 103],
+    "ProductName": ["Laptop", "Hat", "Laptop", "Jacket"],
+    "Category": ["Electronics", "Clothing", "Electronics", "Clothing"],
+    "StoreSection": ["A", "B", "A", "B"],
+    "CustomerID": [1001, 1002, 1003, 1001],
+    "PreferredContactMethod": ["Email", "Phone", "Email", "Email"],
+    "SaleAmount_sum": [10.0, 20.0, 30.0, 40.0],
+    "SaleAmount_mean": [10.0, 20.0, 30.0, 40.0],
+    "TransactionID_count": [1, 1, 1, 1],
+})
+
+
+class TestOlapQueryServiceEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cube_file = pathlib.Path(self.tmp.name, "cube.csv")
+        cube.to_csv(self.cube_file, index=False)
+        self.service = OlapQueryService(self.cube_file, workers=1, poll_interval=0)
+
+    def tearDown(self):
+        self.service.executor.shutdown()
+        self.tmp.cleanup()
+
+    def get(self, target: str) -> tuple:
+        status, body = asyncio.run(self.service.dispatch("GET", target))
+        return status, json.loads(body) if isinstance(body, str) else body
+
+    def test_dispatch_runs_analyses_and_filters(self):
+        status, body = self.get("/sales_by_month?months=3")
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual(body["rows"], [{"Month": 3, "TotalSales": 70.0}])
+
+        status, body = self.get("/rollup?by=Region&Region=West")
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual([row["SaleAmount_sum"] for row in body["rows"]], [60.0])
+
+        status, body = self.get("/")
+        self.assertIn("sales_by_day", body["analyses"])
+
+    def test_status_codes(self):
+        self.assertEqual(self.get("/nowhere")[0], HTTPStatus.NOT_FOUND)
+        self.assertEqual(asyncio.run(self.service.dispatch("POST", "/sales_by_day"))[0], HTTPStatus.METHOD_NOT_ALLOWED)
+        # Malformed values are rejected before dispatch; unknown columns by the worker
+        self.assertEqual(self.get("/sales_by_month?months=13")[0], HTTPStatus.BAD_REQUEST)
+        self.assertEqual(self.get("/sales_by_month?months=march")[0], HTTPStatus.BAD_REQUEST)
+        self.assertEqual(self.get("/sales_by_day?limit=-1")[0], HTTPStatus.BAD_REQUEST)
+        self.assertEqual(self.get("/sales_by_day?Product=hat")[0], HTTPStatus.BAD_REQUEST)
+        self.assertEqual(self.get("/rollup?by=Planet")[0], HTTPStatus.BAD_REQUEST)
+
+    def test_reloads_changed_cube(self):
+        self.assertEqual(self.get("/sales_by_day?DayOfWeek=Friday")[1]["rows"][0]["TotalSales"], 40.0)
+        self.assertFalse(self.service.check_cube())
+
+        cube.assign(SaleAmount_sum=cube["SaleAmount_sum"] * 2).to_csv(self.cube_file, index=False)
+        stat = self.cube_file.stat()
+        os.utime(self.cube_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertTrue(self.service.check_cube())
+        status, body = self.get("/sales_by_day?DayOfWeek=Friday")
+        self.assertEqual(body["version"], 2)
+        self.assertEqual(body["rows"][0]["TotalSales"], 80.0)
+
+        # An analysis failing on the data (months outside 1-12) is a server error, not a bad request
+        cube.assign(Month=13).to_csv(self.cube_file, index=False)
+        os.utime(self.cube_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000))
+        self.assertTrue(self.service.check_cube())
+        self.assertEqual(self.get("/sales_by_month")[0], HTTPStatus.INTERNAL_SERVER_ERROR)
+
+
+if __name__ == "__main__":
+    unittest.main()
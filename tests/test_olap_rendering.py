@@ -0,0 +1,43 @@
+import unittest
+import pathlib
+import sys
+import tempfile
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_rendering import render_chart  # noqa: E402
+
+
+def plot_bars(fig, ax, data, color="skyblue"):
+    ax.bar(data["Month"], data["TotalSales"], color=color)
+
+
+class TestOlapRendering(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_path = pathlib.Path(self.tmp_dir.name).joinpath("chart.png")
+        self.data = pd.DataFrame({"Month": [1, 2, 3], "TotalSales": [10.0, 20.0, 15.0]})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_render_chart_writes_png(self):
+        self.assertTrue(render_chart(plot_bars, self.data, self.output_path))
+        self.assertTrue(self.output_path.read_bytes().startswith(b"\x89PNG"), "Chart should be saved as a PNG")
+
+    def test_render_chart_skips_unchanged_inputs(self):
+        render_chart(plot_bars, self.data, self.output_path)
+        self.assertFalse(render_chart(plot_bars, self.data, self.output_path), "Unchanged chart should be skipped")
+        self.assertTrue(render_chart(plot_bars, self.data, self.output_path, color="red"), "New options should re-render")
+        changed = self.data.assign(TotalSales=[10.0, 20.0, 16.0])
+        self.assertTrue(render_chart(plot_bars, changed, self.output_path), "New data should re-render")
+        self.assertTrue(render_chart(plot_bars, changed, self.output_path, force=True), "force should re-render")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import json
+import os
+import pathlib
+import sys
+import tempfile
+from unittest import mock
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap import olap_goal_top_product_by_day, olap_report_runner, olap_underperforming_products  # noqa: E402
+from scripts.olap.olap_report_runner import ANALYSES, cached_result, run_reports  # noqa: E402
+from scripts.olap.olap_result_cache import ResultCache  # noqa: E402
+
+cube = pd.DataFrame({
+    "Year": [2024, 2024, 2024, 2024],
+    "Quarter": [1, 1, 2, 2],
+    "Month": [1, 2, 4, 5],
+    "DayOfWeek": ["Monday", "Monday", "Tuesday", "Tuesday"],
+    "CustomerID": [1001, 1002, 1001, 1003],
+    "ProductID": [101, 102, 101, 101],
+    "ProductName": ["laptop", "hoodie", "laptop", "laptop"],
+    "Category": ["Electronics", "Clothing", "Electronics", "Electronics"],
+    "SaleAmount_sum": [10.0, 20.0, 30.0, 40.0],
+    "SaleAmount_mean": [10.0, 20.0, 15.0, 40.0],
+    "TransactionID_count": [1, 1, 2, 1],
+})
+
+
+def failing_analysis(data: dict) -> None:
+    raise KeyError("SaleAmount_sum")
+
+
+class TestOlapReportRunner(unittest.TestCase):
+
+    def setUp(self):
+        # The analyses write to data/... relative to the working directory
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        pathlib.Path("data", "results").mkdir(parents=True)
+        self.cube_file = pathlib.Path("cube.csv")
+        cube.to_csv(self.cube_file, index=False)
+        self.data = {"cube": cube, "products": None, "customers": None, "files": {"cube": self.cube_file}}
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_run_reports_on_in_memory_cube(self):
+        names = ["sales_by_quarter", "customer_average_transaction_size", "top_product_by_day"]
+        timings = run_reports(self.data, names, True)
+        self.assertEqual(timings["Status"].tolist(), ["ok", "ok", "ok"])
+        quarters = pd.read_csv("data/results/sales_by_quarter.csv")
+        self.assertEqual(quarters["SaleAmount_sum"].tolist(), [30.0, 70.0])
+        averages = pd.read_csv("data/results/customer_average_transaction_size.csv")
+        self.assertEqual(averages["AverageTransactionSize"].tolist(), [40.0 / 3, 20.0, 40.0])
+        top_products = pd.read_csv("data/results/top_product_by_weekday.csv")
+        self.assertEqual(top_products["ProductName"].tolist(), ["hoodie", "laptop"])
+        self.assertEqual(top_products["TotalSales"].tolist(), [20.0, 70.0])
+
+        workload = pathlib.Path("data", "olap_cubing_outputs", "query_workload.jsonl").read_text().splitlines()
+        self.assertEqual(
+            [json.loads(line)["dimensions"] for line in workload],
+            [["Year", "Quarter"], ["CustomerID"], ["DayOfWeek", "ProductID"]],
+        )
+
+        with self.assertRaises(ValueError):
+            run_reports(self.data, ["no_such_analysis"])
+
+    def test_failed_analysis_reported_and_exit_code(self):
+        with mock.patch.dict(ANALYSES, {"broken": (failing_analysis, [])}):
+            timings = run_reports(self.data, ["broken", "sales_by_quarter"])
+            self.assertEqual(timings["Status"].tolist(), ["failed", "ok"])
+
+            with mock.patch.object(olap_report_runner, "load_report_data", return_value=self.data), \
+                    mock.patch.object(sys, "argv", ["olap_report_runner.py", "--no-cache", "broken"]):
+                with self.assertRaises(SystemExit) as exit_info:
+                    olap_report_runner.main()
+        self.assertEqual(exit_info.exception.code, 1)
+
+    def test_cached_result(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return cube
+
+        self.data["cache"] = ResultCache(pathlib.Path("cache"))
+        for _ in range(2):
+            result = cached_result(self.data, "cube_copy", ["cube"], compute, module=olap_report_runner)
+        pd.testing.assert_frame_equal(result, cube)
+        self.assertEqual(len(calls), 1, "Second call should be served from the cache")
+
+        self.data["cache"] = None
+        cached_result(self.data, "cube_copy", ["cube"], compute)
+        self.assertEqual(len(calls), 2, "Without a cache every call computes")
+
+    def test_product_file_not_an_input_when_cube_has_product_attributes(self):
+        # No products file exists; the cube already carries ProductName and Category
+        cube_file = pathlib.Path("data", "olap_cubing_outputs", "multidimensional_olap_cube.csv")
+        cube_file.parent.mkdir(parents=True)
+        cube.to_csv(cube_file, index=False)
+        olap_goal_top_product_by_day.main()
+        olap_underperforming_products.main()
+        self.assertTrue(pathlib.Path("data", "results", "top_product_by_weekday.csv").exists())
+
+        # The runner's key leaves the unloaded products file out too, so it hits the script's entry
+        data = dict(self.data, cache=ResultCache(), files={"cube": cube_file, "products": pathlib.Path("missing.csv")})
+        cached = cached_result(
+            data, "top_product_by_weekday", ["cube", "products"], failing_analysis, module=olap_goal_top_product_by_day
+        )
+        self.assertEqual(cached["ProductName"].tolist(), ["hoodie", "laptop"])
+
+
+if __name__ == "__main__":
+    unittest.main()
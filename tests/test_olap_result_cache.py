@@ -0,0 +1,83 @@
+import unittest
+import importlib.util
+import os
+import pathlib
+import sys
+import tempfile
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_result_cache import ResultCache  # noqa: E402
+
+
+class TestOlapResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = pathlib.Path(self.tmp_dir.name)
+        self.cube_file = self.tmp_path.joinpath("cube.csv")
+        self.cube_file.write_text("Month,SaleAmount_sum\n3,10.0\n10,20.0\n")
+        self.cache = ResultCache(self.tmp_path.joinpath("cache"))
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def compute(self):
+        self.calls += 1
+        return pd.read_csv(self.cube_file)
+
+    def test_hit_skips_compute(self):
+        first = self.cache.get_or_compute("sales", [self.cube_file], self.compute, {"slow_months": [3]})
+        second = self.cache.get_or_compute("sales", [self.cube_file], self.compute, {"slow_months": [3]})
+        self.assertEqual(self.calls, 1, "Second call should be served from the cache")
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_key_changes_with_params_and_content(self):
+        self.cache.get_or_compute("sales", [self.cube_file], self.compute, {"slow_months": [3]})
+        self.cache.get_or_compute("sales", [self.cube_file], self.compute, {"slow_months": [10]})
+        self.assertEqual(self.calls, 2, "Different parameters should miss")
+
+        self.cube_file.write_text("Month,SaleAmount_sum\n3,11.0\n10,20.0\n")
+        result = self.cache.get_or_compute("sales", [self.cube_file], self.compute, {"slow_months": [3]})
+        self.assertEqual(self.calls, 3, "Changed input contents should miss")
+        self.assertEqual(result["SaleAmount_sum"].iloc[0], 11.0)
+
+    def test_missing_input_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.cache.get_or_compute("sales", [self.cube_file, self.tmp_path.joinpath("gone.csv")], self.compute)
+        self.assertEqual(self.calls, 0)
+
+    def test_key_changes_with_analysis_code(self):
+        module_file = self.tmp_path.joinpath("analysis.py")
+        module_file.write_text("VERSION = 1\n")
+        spec = importlib.util.spec_from_file_location("analysis", module_file)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        self.cache.get_or_compute("sales", [self.cube_file], self.compute, code=module)
+        self.cache.get_or_compute("sales", [self.cube_file], self.compute, code=module)
+        self.assertEqual(self.calls, 1)
+        module_file.write_text("VERSION = 2  # changed analysis\n")
+        self.cache.get_or_compute("sales", [self.cube_file], self.compute, code=module)
+        self.assertEqual(self.calls, 2, "Changed analysis code should miss")
+
+    def test_evicts_least_recently_used(self):
+        frame = pd.DataFrame({"Value": range(100)})
+        self.cache.put("old", frame)
+        self.cache.put("new", frame)
+        entry_size = self.cache.cache_dir.joinpath("old.pkl").stat().st_size
+        os.utime(self.cache.cache_dir.joinpath("old.pkl"), ns=(0, 0))
+
+        self.cache.max_bytes = entry_size
+        self.cache.evict()
+        self.assertIsNone(self.cache.get("old"), "Least recently used result should be evicted")
+        self.assertIsNotNone(self.cache.get("new"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import pathlib
+import sqlite3
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import create_olap_cube_in_dw, rollup_cube  # noqa: E402
+from scripts.olap.olap_sampling import (  # noqa: E402
+    add_confidence_intervals,
+    choose_sample_rates,
+    create_olap_cube_approximate,
+)
+
+DIMENSIONS = ["Month", "Region", "ProductID"]
+METRICS = {"SaleAmount": ["sum", "mean"], "TransactionID": "count"}
+
+
+class TestOlapSampling(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.db_path = pathlib.Path(cls.tmp.name).joinpath("smart_sales.db")
+        rng = np.random.default_rng(2)
+        rows = 40_000
+        conn = sqlite3.connect(cls.db_path)
+        pd.DataFrame({
+            "CustomerID": np.arange(1, 101),
+            "Region": rng.choice(["East", "West", "North", "South"], 100),
+        }).to_sql("customer", conn, index=False)
+        pd.DataFrame({
+            "TransactionID": np.arange(1, rows + 1),
+            "CustomerID": rng.integers(1, 101, rows),
+            "ProductID": rng.integers(101, 106, rows),
+            "SaleAmount": rng.gamma(2.0, 50.0, rows).round(2),
+            "SaleDate": pd.Series(pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 366, rows), unit="D"))
+            .dt.strftime("%Y-%m-%d"),
+        }).to_sql("sales", conn, index=False)
+        conn.close()
+        cls.exact = create_olap_cube_in_dw(cls.db_path, DIMENSIONS, METRICS).drop(columns="TransactionIDs")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_tight_bound_reads_everything_exactly(self):
+        cube = create_olap_cube_approximate(self.db_path, DIMENSIONS, METRICS, error_bound=1e-9)
+        pd.testing.assert_frame_equal(cube[self.exact.columns], self.exact, check_dtype=False)
+        self.assertEqual(cube["SaleAmount_sum_var"].abs().max(), 0)
+
+    def test_sample_rates_follow_error_bound(self):
+        stats = pd.DataFrame({"Rows": [10, 1000, 1000], "Total": [100.0, 1e5, 1e5], "SumSquares": [2e3, 2e7, 2e7]})
+        loose = choose_sample_rates(stats, error_bound=0.10)["Rate"].to_numpy()
+        tight = choose_sample_rates(stats, error_bound=0.02)["Rate"].to_numpy()
+        self.assertEqual(loose[0], 1.0)  # too few rows to sample
+        self.assertTrue((loose[1:] < tight[1:]).all())
+        self.assertTrue((loose[1:] < 1).all())
+
+    def test_estimates_within_intervals(self):
+        cube = create_olap_cube_approximate(self.db_path, DIMENSIONS, METRICS, error_bound=0.05, seed=1)
+        self.assertGreater(cube["SaleAmount_sum_var"].sum(), 0)
+        exact = rollup_cube(self.exact, ["Region", "Month"]).set_index(["Region", "Month"])["SaleAmount_sum"]
+        approx = add_confidence_intervals(rollup_cube(cube, ["Region", "Month"])).set_index(["Region", "Month"])
+        covered = (approx["SaleAmount_sum_low"] <= exact) & (exact <= approx["SaleAmount_sum_high"])
+        # 95% intervals over 48 strata: allow a few misses
+        self.assertGreaterEqual(covered.mean(), 0.85)
+        relative_half_width = (approx["SaleAmount_sum_high"] - approx["SaleAmount_sum"]) / approx["SaleAmount_sum"]
+        self.assertLess(relative_half_width.max(), 0.07)
+
+    def test_same_seed_same_sample(self):
+        first = create_olap_cube_approximate(self.db_path, DIMENSIONS, METRICS, error_bound=0.1, seed=7)
+        second = create_olap_cube_approximate(self.db_path, DIMENSIONS, METRICS, error_bound=0.1, seed=7)
+        pd.testing.assert_frame_equal(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
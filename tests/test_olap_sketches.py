@@ -0,0 +1,76 @@
+import base64
+import unittest
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import create_olap_cube, rollup_cube  # noqa: E402
+from scripts.olap.olap_sketches import (  # noqa: E402
+    DENSE_FORMAT,
+    SPARSE_FORMAT,
+    add_distinct_counts,
+    add_distinct_sketches,
+    decode_sketch,
+    estimate_distinct,
+    hash_values,
+    merge_sketch_groups,
+    sketch_groups,
+)
+
+rng = np.random.default_rng(9)
+sales = pd.DataFrame({
+    "Region": rng.choice(["East", "West", "North"], 5000),
+    "Month": rng.integers(1, 13, 5000),
+    "CustomerID": rng.integers(1000, 1400, 5000),
+    "SaleAmount": rng.integers(1, 500, 5000).astype(float),
+    "TransactionID": np.arange(5000),
+})
+
+
+def one_sketch(values) -> str:
+    return sketch_groups(np.zeros(len(values), dtype=np.int64), 1, values)[0]
+
+
+class TestOlapSketches(unittest.TestCase):
+
+    def test_estimates_within_error(self):
+        for n in [5, 300, 50_000]:
+            values = rng.choice(10**12, n, replace=False)
+            self.assertAlmostEqual(estimate_distinct([one_sketch(values)])[0] / n, 1, delta=0.05)
+
+    def test_sparse_and_dense_round_trip(self):
+        small, large = one_sketch(np.arange(10)), one_sketch(np.arange(100_000))
+        self.assertLess(len(small), 64)
+        for sketch, expected_format in [(small, SPARSE_FORMAT), (large, DENSE_FORMAT)]:
+            self.assertEqual(base64.b64decode(sketch)[0], expected_format)
+            precision, index, rank = decode_sketch(sketch)
+            self.assertTrue((np.diff(index) > 0).all() and (rank > 0).all())
+
+    def test_merge_equals_sketch_of_union(self):
+        first, second = one_sketch(np.arange(0, 3000)), one_sketch(np.arange(2000, 6000))
+        self.assertEqual(merge_sketch_groups(np.array([0, 0]), 1, [first, second])[0], one_sketch(np.arange(6000)))
+
+    def test_hash_ignores_value_type(self):
+        expected = hash_values([1001, 1002])
+        for values in [["1001", "1002"], [1001.0, 1002.0], pd.Series([1001, 1002], dtype="category")]:
+            np.testing.assert_array_equal(hash_values(values), expected)
+
+    def test_rollup_merges_sketches(self):
+        dimensions = ["Region", "Month", "CustomerID"]
+        cube = create_olap_cube(sales, dimensions, {"SaleAmount": "sum", "TransactionID": "count"})
+        cube = add_distinct_sketches(cube, sales, dimensions, ["CustomerID"])
+        self.assertNotIn("CustomerID_hll", rollup_cube(cube, ["Region"]).columns)
+        rolled = add_distinct_counts(rollup_cube(cube, ["Region"], sketches=True))
+        exact = sales.groupby("Region")["CustomerID"].nunique()
+        estimated = rolled.set_index("Region")["CustomerID_distinct"]
+        np.testing.assert_allclose(estimated[exact.index], exact, rtol=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
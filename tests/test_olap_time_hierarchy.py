@@ -0,0 +1,62 @@
+import unittest
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import add_time_dimensions  # noqa: E402
+from scripts.olap.olap_time_hierarchy import rollup_time, year_over_year  # noqa: E402
+
+rng = np.random.default_rng(11)
+days = pd.Series(pd.date_range("2023-01-01", "2024-12-31", freq="D")).sample(400, random_state=11)
+day_cube = pd.DataFrame({
+    "Day": days.dt.strftime("%Y-%m-%d").to_numpy(),
+    "Region": rng.choice(["East", "West"], 400),
+    "SaleAmount_sum": rng.integers(1, 500, 400).astype(float),
+    "TransactionID_count": rng.integers(1, 4, 400),
+})
+
+
+class TestOlapTimeHierarchy(unittest.TestCase):
+
+    def test_quarter_rollup_from_day_matches_groupby(self):
+        expected = (
+            add_time_dimensions(day_cube, "Day")
+            .groupby(["Year", "Quarter", "Region"])[["SaleAmount_sum", "TransactionID_count"]].sum().reset_index()
+        )
+        result = rollup_time(day_cube, "Quarter", ["Region"])
+        pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+
+    def test_quarter_from_month_grain(self):
+        month_cube = rollup_time(day_cube, "Month")
+        quarters = rollup_time(month_cube, "Quarter")
+        self.assertEqual(len(quarters), 8)
+        self.assertAlmostEqual(quarters["SaleAmount_sum"].sum(), day_cube["SaleAmount_sum"].sum())
+        with self.assertRaises(ValueError):
+            rollup_time(month_cube, "ISOWeek")
+
+    def test_iso_week_rollup(self):
+        weeks = rollup_time(day_cube, "ISOWeek")
+        self.assertEqual(list(weeks.columns[:2]), ["ISOYear", "ISOWeek"])
+        # 2023-01-01 is a Sunday, so it belongs to ISO week 52 of 2022
+        new_year = rollup_time(pd.DataFrame({"Day": ["2023-01-01"], "SaleAmount_sum": [1.0]}), "ISOWeek")
+        self.assertEqual(new_year[["ISOYear", "ISOWeek"]].iloc[0].tolist(), [2022, 52])
+        self.assertEqual(weeks["TransactionID_count"].sum(), day_cube["TransactionID_count"].sum())
+
+    def test_year_over_year(self):
+        quarters = rollup_time(day_cube, "Quarter").set_index(["Year", "Quarter"])["SaleAmount_sum"]
+        yoy = year_over_year(day_cube, "Quarter").set_index(["Year", "Quarter"])
+        self.assertTrue(yoy.loc[2023, "PriorYear"].isna().all())
+        self.assertAlmostEqual(yoy.loc[(2024, 2), "PriorYear"], quarters[(2023, 2)])
+        self.assertAlmostEqual(
+            yoy.loc[(2024, 2), "YoYGrowthPct"], (quarters[(2024, 2)] / quarters[(2023, 2)] - 1) * 100
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import pathlib
+import sys
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_topk import extremes_per_group, top_k_per_group  # noqa: E402
+
+rng = np.random.default_rng(7)
+sales = pd.DataFrame({
+    "Region": rng.choice(["East", "North", "South", "West"], 500),
+    "Month": rng.integers(1, 13, 500),
+    # Few distinct values so that ties are common
+    "SaleAmount_sum": rng.integers(0, 20, 500).astype(float),
+})
+
+
+class TestOlapTopK(unittest.TestCase):
+
+    def test_top_k_matches_stable_sort(self):
+        for k in (1, 3):
+            expected = (
+                sales.sort_values(["Region", "Month", "SaleAmount_sum"], ascending=[True, True, False], kind="stable")
+                .groupby(["Region", "Month"]).head(k)
+            )
+            result = top_k_per_group(sales, ["Region", "Month"], "SaleAmount_sum", k=k)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_extremes_match_sorted_first_rows(self):
+        bottom, top = extremes_per_group(sales, ["Region"], "SaleAmount_sum", k=2)
+        expected_bottom = sales.sort_values(["Region", "SaleAmount_sum"], kind="stable").groupby("Region").head(2)
+        expected_top = (
+            sales.sort_values(["Region", "SaleAmount_sum"], ascending=[True, False], kind="stable")
+            .groupby("Region").head(2)
+        )
+        pd.testing.assert_frame_equal(bottom, expected_bottom)
+        pd.testing.assert_frame_equal(top, expected_top)
+
+    def test_missing_values_are_skipped(self):
+        data = pd.DataFrame({"Region": ["East", "East", "West"], "SaleAmount_sum": [np.nan, 5.0, np.nan]})
+        result = top_k_per_group(data, ["Region"], "SaleAmount_sum", k=2)
+        self.assertEqual(result.index.tolist(), [1], "Rows with missing values should never be selected")
+
+
+if __name__ == "__main__":
+    unittest.main()
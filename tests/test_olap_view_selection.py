@@ -0,0 +1,132 @@
+import unittest
+import pathlib
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.olap.olap_cubing import add_time_dimensions, create_olap_cube, cube_dimensions, rollup_cube  # noqa: E402
+from scripts.olap.olap_report_runner import ANALYSES  # noqa: E402
+from scripts.olap.olap_view_selection import (  # noqa: E402
+    DECLARED_WORKLOAD,
+    answer_query,
+    build_lattice,
+    cube_base_dimensions,
+    estimate_cuboid_sizes,
+    load_recorded_workload,
+    materialize_views,
+    record_query,
+    select_views,
+    workload_dimensions,
+)
+
+DIMENSIONS = ["Month", "Region", "ProductID"]
+
+# A small base cuboid with a row per (Month, Region, ProductID) cell
+base_cube = pd.DataFrame({
+    "Month": [1, 1, 1, 2, 2, 3, 3, 3],
+    "Region": ["East", "West", "East", "East", "West", "West", "West", "East"],
+    "ProductID": [101, 101, 102, 101, 102, 101, 102, 103],
+    "SaleAmount_sum": [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0, 80.0],
+    "SaleAmount_mean": [5.0, 20.0, 15.0, 40.0, 25.0, 60.0, 35.0, 80.0],
+    "TransactionID_count": [2, 1, 2, 1, 2, 1, 2, 1],
+})
+
+# A cube with the production layout, built from random sales
+rng = np.random.default_rng(3)
+sales_df = add_time_dimensions(pd.DataFrame({
+    "SaleDate": pd.to_datetime("2023-01-01") + pd.to_timedelta(rng.integers(0, 730, 300), unit="D"),
+    "Region": rng.choice(["East", "West"], 300),
+    "ProductID": rng.integers(101, 104, 300),
+    "CustomerID": rng.integers(1001, 1006, 300),
+    "CampaignID": rng.integers(0, 3, 300),
+    "PaymentType": rng.choice(["Cash", "CreditCard"], 300),
+    "StoreID": rng.integers(401, 403, 300),
+    "SaleAmount": rng.random(300),
+    "TransactionID": np.arange(300),
+}), "SaleDate")
+sales_df["DayOfWeek"] = sales_df["SaleDate"].dt.day_name()
+full_cube = create_olap_cube(
+    sales_df, cube_dimensions(), {"SaleAmount": ["sum", "mean"], "TransactionID": "count"}
+).drop(columns="TransactionIDs")
+
+
+class TestOlapViewSelection(unittest.TestCase):
+
+    def test_build_lattice(self):
+        lattice = build_lattice(DIMENSIONS)
+        self.assertEqual(len(lattice), 8, "Lattice should contain every subset of the dimensions")
+        self.assertEqual(lattice[0], tuple(DIMENSIONS), "Base cuboid should come first")
+
+    def test_rollup_cube_matches_groupby(self):
+        rolled = rollup_cube(base_cube, ["Month"])
+        expected = base_cube.groupby("Month")["SaleAmount_sum"].sum().tolist()
+        self.assertEqual(rolled["SaleAmount_sum"].tolist(), expected, "Rolled-up sums are incorrect")
+        self.assertAlmostEqual(rolled.loc[0, "SaleAmount_mean"], 60.0 / 5, msg="Mean should be recomputed from sum/count")
+
+    def test_select_views_respects_budget(self):
+        sizes = estimate_cuboid_sizes(base_cube, DIMENSIONS)
+        workload = [(("Month",), 5), (("Region",), 1)]
+        selection = select_views(sizes, workload, budget_rows=3, base_dimensions=DIMENSIONS)
+        self.assertLessEqual(selection["rows_used"], 3, "Selected cuboids exceed the storage budget")
+        self.assertIn(("Month",), selection["selected"], "Most beneficial cuboid was not selected")
+        self.assertGreater(selection["speedup"], 1.0, "Selecting views should reduce workload cost")
+
+    def test_answer_query_from_materialized_views(self):
+        sizes = estimate_cuboid_sizes(base_cube, DIMENSIONS)
+        selection = select_views(sizes, [(("Month", "Region"), 1)], budget_rows=10, base_dimensions=DIMENSIONS)
+        views = materialize_views(base_cube, selection["selected"], DIMENSIONS)
+        answer = answer_query(views, ["Region"])
+        self.assertEqual(answer["SaleAmount_sum"].sum(), base_cube["SaleAmount_sum"].sum(), "Totals should be preserved")
+
+
+    def test_select_views_for_workload_recorded_by_runner(self):
+        base_dimensions = cube_base_dimensions(full_cube)
+        self.assertEqual(base_dimensions, cube_dimensions())
+        with tempfile.TemporaryDirectory() as tmp:
+            workload_file = pathlib.Path(tmp, "query_workload.jsonl")
+            for _, queries in ANALYSES.values():
+                for query in queries:
+                    record_query(query, workload_file)
+            workload = load_recorded_workload(workload_file, base_dimensions)
+        self.assertIn((("Year", "Quarter"), 1), workload)
+
+        candidates = workload_dimensions(workload, base_dimensions)
+        sizes = estimate_cuboid_sizes(full_cube, base_dimensions, candidate_dimensions=candidates)
+        self.assertEqual(sizes[tuple(base_dimensions)], len(full_cube))
+        selection = select_views(sizes, workload, len(full_cube), base_dimensions)
+        views = materialize_views(full_cube, selection["selected"], base_dimensions)
+        for query, _ in workload:
+            answer = answer_query(views, query)
+            self.assertFalse(answer.duplicated(list(query)).any(), f"Answer to {query} has repeated cells")
+            expected = sales_df.groupby(list(query))["SaleAmount"].sum().to_numpy()
+            np.testing.assert_allclose(answer.sort_values(list(query))["SaleAmount_sum"], expected)
+
+
+    def test_campaign_and_store_queries_answered_from_selected_views(self):
+        base_dimensions = cube_base_dimensions(full_cube)
+        queries = [("CampaignID",), ("StoreID", "PaymentType")]
+        self.assertIn((("CampaignID",), 1), DECLARED_WORKLOAD)
+        self.assertIn((("PaymentType", "StoreID"), 1), DECLARED_WORKLOAD)
+        workload = [(query, 1) for query in queries]
+        sizes = estimate_cuboid_sizes(
+            full_cube, base_dimensions, candidate_dimensions=workload_dimensions(workload, base_dimensions)
+        )
+        selection = select_views(sizes, workload, budget_rows=10, base_dimensions=base_dimensions)
+        self.assertIn(("CampaignID",), selection["selected"])
+        self.assertIn(("PaymentType", "StoreID"), selection["selected"])
+        views = materialize_views(full_cube, selection["selected"], base_dimensions)
+        for query in queries:
+            answer = answer_query(views, query)
+            expected = sales_df.groupby(sorted(query, key=base_dimensions.index))["SaleAmount"].sum().to_numpy()
+            np.testing.assert_allclose(answer["SaleAmount_sum"], expected)
+
+
+# Run the tests with verbosity=2 for detailed output
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
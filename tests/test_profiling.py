@@ -0,0 +1,51 @@
+import os
+import unittest
+import pathlib
+import sys
+import tempfile
+from unittest import mock
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from utils.instrumentation import stage, summarize_stages  # noqa: E402
+from utils.profiling import PROFILE_ENV_VAR, profile_report, written_profiles  # noqa: E402
+
+
+def busy_loop() -> int:
+    return sum(i * i for i in range(20_000))
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_no_profiles_when_off(self):
+        before = len(written_profiles())
+        with mock.patch.dict(os.environ, {PROFILE_ENV_VAR: "0"}):
+            with stage("unprofiled"):
+                busy_loop()
+        self.assertEqual(len(written_profiles()), before)
+
+    def test_outer_stages_profiled_and_merged(self):
+        @summarize_stages("profiled run")
+        def run():
+            with stage("outer: step"):
+                with stage("inner"):
+                    busy_loop()
+            with stage("second"):
+                busy_loop()
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, {PROFILE_ENV_VAR: tmp}):
+            before = len(written_profiles())
+            run()
+            profiles = written_profiles()[before:]
+            # The inner stage is part of the outer stage's profile
+            self.assertEqual([path.name.split("-")[0] for path in profiles], ["outer_step", "second"])
+            report = pathlib.Path(tmp, "profiled run_top_functions.txt").read_text()
+            self.assertIn("busy_loop", report)
+            self.assertIn("busy_loop", profile_report(profiles[:1], top=5))
+
+
+if __name__ == "__main__":
+    unittest.main()
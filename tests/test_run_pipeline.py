@@ -0,0 +1,90 @@
+import unittest
+import pathlib
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from scripts.run_pipeline import (  # noqa: E402
+    ANALYSES, PREPARED_DATA_DIR, RESULTS_DIR, build_stages, file_hash, select_stages, stale_reason, upstream_stages
+)
+
+
+def run_stage(stage: dict, workspace: pathlib.Path) -> None:
+    """Run a stage's command in workspace, which stands in for the project root's data directory."""
+    script, *args = stage["command"]
+    for output in stage["outputs"]:
+        # The checkout has these directories; some stages expect them to exist
+        workspace.joinpath(output).parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run([sys.executable, str(PROJECT_ROOT.joinpath(script)), *args], cwd=workspace, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class TestRunPipeline(unittest.TestCase):
+
+    def test_dependencies_follow_declared_files(self):
+        upstream = upstream_stages(build_stages())
+        self.assertEqual(upstream["data_prep"], [])
+        self.assertEqual(upstream["etl_to_dw"], ["data_prep"])
+        self.assertIn("olap_cubing", upstream["sales_by_month"])
+        self.assertEqual(upstream["customer_rfm"], ["etl_to_dw"])
+
+    def test_selects_targets_with_their_upstream_stages(self):
+        stages = build_stages()
+        self.assertEqual(select_stages(stages, ["customer_rfm"]), ["data_prep", "etl_to_dw", "customer_rfm"])
+        self.assertEqual(select_stages(stages, []), list(stages))
+        with self.assertRaises(ValueError):
+            select_stages(stages, ["no_such_stage"])
+
+    def test_stage_is_stale_until_recorded_and_after_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source, output = pathlib.Path(tmp, "in.csv"), pathlib.Path(tmp, "out.csv")
+            source.write_text("a,b\n1,2\n")
+            output.write_text("done")
+            stage = {"command": [source], "inputs": [source], "outputs": [output]}
+            state = {"stages": {}, "files": {}}
+
+            reason, inputs_hash = stale_reason("copy", stage, state)
+            self.assertEqual(reason, "no previous run")
+            state["stages"]["copy"] = {
+                "inputs": inputs_hash,
+                "input_files": {str(source): file_hash(source, state)},
+                "outputs": {str(output): file_hash(output, state)},
+            }
+            self.assertIsNone(stale_reason("copy", stage, state)[0])
+
+            output.unlink()
+            self.assertTrue(stale_reason("copy", stage, state)[0].startswith("output missing"))
+            output.write_text("done")
+            source.write_text("a,b\n1,3\n")
+            self.assertEqual(stale_reason("copy", stage, state)[0], f"inputs changed: {source}")
+
+    def test_stages_write_exactly_their_declared_outputs(self):
+        stages = build_stages()
+        with tempfile.TemporaryDirectory() as tmp:
+            workspace = pathlib.Path(tmp)
+            # data_prep writes under the project root, so start from its prepared files
+            shutil.copytree(PROJECT_ROOT.joinpath(PREPARED_DATA_DIR), workspace.joinpath(PREPARED_DATA_DIR))
+            for name in ["etl_to_dw", "olap_cubing"]:
+                run_stage(stages[name], workspace)
+                for output in stages[name]["outputs"]:
+                    self.assertTrue(workspace.joinpath(output).exists(), f"{name} did not write {output}")
+
+            results_dir = workspace.joinpath(RESULTS_DIR)
+            for name in ANALYSES:
+                shutil.rmtree(results_dir, ignore_errors=True)
+                run_stage(stages[name], workspace)
+                # Skip render_chart's hidden .sha256 files next to each chart
+                written = sorted(
+                    path.relative_to(workspace) for path in results_dir.iterdir() if not path.name.startswith(".")
+                )
+                self.assertEqual(written, sorted(stages[name]["outputs"]), f"{name} outputs are not all declared")
+
+
+if __name__ == "__main__":
+    unittest.main()
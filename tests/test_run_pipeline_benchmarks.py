@@ -0,0 +1,36 @@
+import unittest
+import pathlib
+import sys
+
+# For local imports, temporarily add project root to Python sys.path
+PROJECT_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from benchmarks.run_pipeline_benchmarks import compare_with_baseline  # noqa: E402
+
+
+def result(stage: str, wall: float, rss: float) -> dict:
+    return {"scale": 10_000, "stage": stage, "wall_seconds": wall, "cpu_seconds": wall, "peak_rss_mib": rss}
+
+
+class TestRunPipelineBenchmarks(unittest.TestCase):
+
+    def test_flags_regressions_above_threshold(self):
+        baseline = [result("data_prep", 10.0, 100.0), result("etl_to_dw", 10.0, 100.0),
+                    result("olap_cubing", 10.0, 100.0), result("analysis", 0.1, 100.0)]
+        current = [result("data_prep", 10.5, 100.0), result("etl_to_dw", 12.0, 100.0),
+                   result("olap_cubing", 9.0, 150.0), result("analysis", 0.2, 100.0)]
+        comparison = compare_with_baseline(current, baseline, threshold=0.10).set_index("stage")
+        self.assertFalse(comparison.loc["data_prep", "Regression"])  # 5% slower: within threshold
+        self.assertTrue(comparison.loc["etl_to_dw", "Regression"])  # 20% slower
+        self.assertTrue(comparison.loc["olap_cubing", "Regression"])  # 50% more memory
+        self.assertFalse(comparison.loc["analysis", "Regression"])  # twice as slow, but only by 0.1s
+
+    def test_ignores_stages_missing_from_baseline(self):
+        comparison = compare_with_baseline([result("data_prep", 1.0, 1.0)], [result("analysis", 1.0, 1.0)], 0.1)
+        self.assertTrue(comparison.empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Content Hashing Helpers
+File: utils/content_hash.py
+
+Stable content hashes for files, DataFrames and parameters. Used to skip work
+whose inputs have not changed since the last run.
+"""
+
+from __future__ import annotations
+
+# Imports from Python Standard Library
+import hashlib
+import json
+import pathlib
+
+# Imports from local modules (pandas is only loaded to hash a DataFrame)
+from utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+# Read files in 1 MB blocks so large inputs are never fully loaded
+CHUNK_SIZE: int = 1 << 20
+
+
+def hash_file(file_path: pathlib.Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as handle:
+        for block in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_dataframe(df: pd.DataFrame) -> str:
+    """Return a SHA-256 hex digest of a DataFrame's columns, index and values."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in df.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def hash_values(*parts) -> str:
+    """Return a SHA-256 hex digest of JSON-serializable values (e.g. names and parameters)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
@@ -0,0 +1,235 @@
+"""
+Stage Instrumentation
+File: utils/instrumentation.py
+
+Measures pipeline stages (read, clean, dedupe, outlier filter, save, insert,
+cube build, render) and reports them as structured log events.
+
+For each stage it records wall time, CPU time, the growth of the process's
+peak resident memory while the stage ran, and the rows going in and out.
+Every finished stage is logged through utils.logger with the measurements
+bound as extra fields (logger.bind), so a structured sink can pick them up
+as data rather than text.
+
+Stages are measured with the stage() context manager or the timed()
+decorator. Inside a collect_stages() block the records are also kept, and
+log_stage_summary() prints them as one table at the end of a run; the
+summarize_stages() decorator does both for a whole entry point:
+
+    @timed("save {file_name}")
+    def save(df, file_name): ...
+
+    @summarize_stages("data_prep")
+    def main():
+        with stage("sales: dedupe", rows_in=len(df)) as timing:
+            df = df.drop_duplicates()
+            timing.rows_out = len(df)
+        save(df, "sales.csv")
+
+With SMART_STORE_PROFILE set, each stage is also profiled (see utils/profiling.py).
+
+Peak memory comes from resource.getrusage, which only moves when the process
+reaches a new high, so a stage that stays below an earlier peak reports 0.
+The resource module does not exist on Windows; memory is not reported there.
+"""
+
+from __future__ import annotations
+
+# Imports from Python Standard Library
+import contextlib
+import functools
+import inspect
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Imports from local modules (pandas is only loaded to build a summary table)
+from utils.lazy_import import is_imported, lazy_import
+from utils.logger import logger
+from utils.profiling import profile_dir, profile_stage, write_profile_report, written_profiles
+
+pd = lazy_import("pandas")
+
+# Collectors of the active collect_stages() blocks (innermost last)
+_collectors: list = []
+
+
+def peak_rss_mib() -> float:
+    """Peak resident set size of this process so far, in MiB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _row_count(value) -> int:
+    """Number of rows of a DataFrame or Series result, else None."""
+    # Nothing can be a DataFrame before pandas is imported
+    if not is_imported("pandas"):
+        return None
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+class StageTiming:
+    """Measurements of one stage; rows_in and rows_out may be set while it runs."""
+
+    def __init__(self, name: str, rows_in: int = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.status = "ok"
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_rss_delta_mib = None
+
+    def as_dict(self) -> dict:
+        rows = self.rows_out if self.rows_out is not None else self.rows_in
+        return {
+            "Stage": self.name,
+            "Status": self.status,
+            "Seconds": self.wall_seconds,
+            "CPU Seconds": self.cpu_seconds,
+            "Peak RSS +MiB": self.peak_rss_delta_mib,
+            "Rows In": self.rows_in,
+            "Rows Out": self.rows_out,
+            "Rows/s": rows / self.wall_seconds if rows is not None and self.wall_seconds else None,
+        }
+
+
+@contextlib.contextmanager
+def stage(name: str, rows_in: int = None):
+    """
+    Measure the enclosed block as one stage.
+
+    Args:
+        name (str): Stage name, e.g. "sales: dedupe".
+        rows_in (int, optional): Rows going into the stage.
+
+    Yields:
+        StageTiming: Set its rows_out (or rows_in) inside the block.
+    """
+    timing = StageTiming(name, rows_in)
+    rss_before = peak_rss_mib()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        with profile_stage(name):
+            yield timing
+    except Exception:
+        timing.status = "failed"
+        raise
+    finally:
+        timing.wall_seconds = time.perf_counter() - wall_start
+        timing.cpu_seconds = time.process_time() - cpu_start
+        if rss_before is not None:
+            timing.peak_rss_delta_mib = peak_rss_mib() - rss_before
+        for records in _collectors:
+            records.append(timing)
+        fields = {key: value for key, value in vars(timing).items() if key != "name"}
+        logger.bind(event="stage", stage=name, **fields).info(
+            f"Stage '{name}' {timing.status} in {timing.wall_seconds:.3f}s "
+            f"(cpu {timing.cpu_seconds:.3f}s, rows {timing.rows_in} -> {timing.rows_out})"
+        )
+
+
+def timed(name: str = None):
+    """
+    Decorator measuring every call of a function as a stage.
+
+    Rows in are counted from the first DataFrame argument, rows out from a
+    DataFrame or Series result.
+
+    Args:
+        name (str, optional): Stage name (default: the function name). May refer
+            to the function's arguments, e.g. "read {file_name}".
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stage_name = name or func.__name__
+            if "{" in stage_name:
+                stage_name = stage_name.format(**signature.bind(*args, **kwargs).arguments)
+            frames = [arg for arg in list(args) + list(kwargs.values()) if _row_count(arg) is not None]
+            with stage(stage_name, rows_in=len(frames[0]) if frames else None) as timing:
+                result = func(*args, **kwargs)
+                timing.rows_out = _row_count(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def collect_stages():
+    """
+    Keep the records of every stage finished inside the block (nested blocks included).
+
+    Yields:
+        list: The StageTiming records, in the order the stages finished.
+    """
+    records = []
+    _collectors.append(records)
+    try:
+        yield records
+    finally:
+        _collectors.remove(records)
+
+
+def summarize_stages(title: str):
+    """
+    Decorator collecting the stages run by a function and logging their summary
+    table when it returns (or fails). With profiling on, the profiles of those
+    stages are also merged into <profile dir>/<title>_top_functions.txt.
+
+    Args:
+        title (str): Title of the summary, e.g. the script name.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            first_profile = len(written_profiles())
+            with collect_stages() as records:
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    log_stage_summary(records, title)
+                    if profile_dir() is not None:
+                        write_profile_report(
+                            written_profiles()[first_profile:], profile_dir().joinpath(f"{title}_top_functions.txt")
+                        )
+
+        return wrapper
+
+    return decorator
+
+
+def stage_summary(records: list) -> pd.DataFrame:
+    """Return the stage records as a table, one row per stage."""
+    return pd.DataFrame([record.as_dict() for record in records], columns=list(StageTiming("").as_dict()))
+
+
+def log_stage_summary(records: list, title: str) -> pd.DataFrame:
+    """
+    Log the stage records of a run as one table.
+
+    Returns:
+        pd.DataFrame: The summary table.
+    """
+    summary = stage_summary(records)
+    if summary.empty:
+        return summary
+    formats = {"Seconds": "{:.3f}", "CPU Seconds": "{:.3f}", "Peak RSS +MiB": "{:.1f}",
+               "Rows In": "{:,.0f}", "Rows Out": "{:,.0f}", "Rows/s": "{:,.0f}"}
+    table = summary.to_string(
+        index=False, na_rep="-", formatters={column: fmt.format for column, fmt in formats.items()}
+    )
+    logger.info(f"{title} stage summary:\n{table}")
+    return summary
@@ -0,0 +1,80 @@
+"""
+Lazy Imports
+File: utils/lazy_import.py
+
+Defers importing heavy libraries (pandas, matplotlib, seaborn) until they are
+first used, so short jobs and tools that only need a path constant do not pay
+for them at startup. Importing matplotlib.figure costs about half a second and
+pandas about as much again, often more than the work of a short job.
+
+    pd = lazy_import("pandas")            # nothing imported yet
+    mpl_figure = lazy_import("matplotlib.figure")
+    ...
+    df = pd.read_csv(path)                # pandas is imported here
+
+A module that is already imported is returned as is. Otherwise a LazyModule
+stands in for it and imports it on the first attribute access. Modules using a
+lazy import need `from __future__ import annotations`; otherwise annotations
+like `df: pd.DataFrame` are evaluated when the module loads and trigger the
+import straight away.
+
+Set SMART_STORE_EAGER_IMPORTS=1 to import everything immediately (to compare
+startup times, or to surface a missing dependency at startup).
+"""
+
+# Imports from Python Standard Library
+import importlib
+import os
+import sys
+
+EAGER_IMPORTS_ENV_VAR: str = "SMART_STORE_EAGER_IMPORTS"
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self.__name__ = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self.__name__)
+        return self._module
+
+    @property
+    def is_loaded(self) -> bool:
+        """True once the real module has been imported."""
+        return self._module is not None
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self) -> list:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str):
+    """
+    Return a module, importing it only when it is first used.
+
+    Args:
+        name (str): Dotted module name, e.g. "pandas" or "matplotlib.figure".
+
+    Returns:
+        The module if it is already imported (or eager imports are enabled), else a LazyModule.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if os.environ.get(EAGER_IMPORTS_ENV_VAR, "").lower() in ("1", "true", "yes"):
+        return importlib.import_module(name)
+    return LazyModule(name)
+
+
+def is_imported(name: str) -> bool:
+    """True if a module has really been imported (a lazy stand-in that was never used does not count)."""
+    return name in sys.modules
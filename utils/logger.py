@@ -9,10 +9,19 @@ Logging is an essential way to track events and issues during execution.
 Features:
 - Logs information, warnings, and errors to a designated log file.
 - Ensures the log directory exists.
+- Writes to the file from a background thread (enqueue=True), so a slow disk
+  never holds up the code that logs.
+- Optionally also writes every record, with its bound extra fields, as one
+  JSON object per line to logs/project_log.jsonl (set SMART_STORE_LOG_JSON=1).
+- Drops records below SMART_STORE_LOG_LEVEL (default INFO) on every sink, so
+  lazily logged DEBUG messages such as DataFrame previews are never formatted
+  unless asked for (SMART_STORE_LOG_LEVEL=DEBUG).
 """
 
 # Imports from Python Standard Library
+import os
 import pathlib
+import sys
 
 # Imports from external packages
 from loguru import logger
@@ -25,6 +34,15 @@ LOG_FOLDER: pathlib.Path = pathlib.Path("logs")
 
 # Set the name of the log file
 LOG_FILE: pathlib.Path = LOG_FOLDER.joinpath("project_log.log")
+JSON_LOG_FILE: pathlib.Path = LOG_FOLDER.joinpath("project_log.jsonl")
+
+# Environment variables controlling the sinks
+LOG_LEVEL_ENV_VAR: str = "SMART_STORE_LOG_LEVEL"
+LOG_JSON_ENV_VAR: str = "SMART_STORE_LOG_JSON"
+LOG_LEVEL: str = os.environ.get(LOG_LEVEL_ENV_VAR, "INFO").upper()
+
+# Rows shown by log_dataframe_preview()
+PREVIEW_ROWS: int = 5
 
 # Ensure the log folder exists or create it
 try:
@@ -33,10 +51,15 @@ try:
 except Exception as e:
     logger.error(f"Error creating log folder: {e}")
 
-# Configure Loguru to write to the log file
+# Configure Loguru to write to the console and, from a background thread, to the log file(s)
 try:
-    logger.add(LOG_FILE, level="INFO")
+    logger.remove()
+    logger.add(sys.stderr, level=LOG_LEVEL)
+    logger.add(LOG_FILE, level=LOG_LEVEL, enqueue=True)
     logger.info(f"Logging to file: {LOG_FILE}")
+    if os.environ.get(LOG_JSON_ENV_VAR, "").lower() in ("1", "true", "yes"):
+        logger.add(JSON_LOG_FILE, level=LOG_LEVEL, enqueue=True, serialize=True)
+        logger.info(f"Logging JSON lines to file: {JSON_LOG_FILE}")
 except Exception as e:
     logger.error(f"Error configuring logger to write to file: {e}")
 
@@ -46,6 +69,19 @@ def get_log_file_path() -> pathlib.Path:
     return LOG_FILE
 
 
+def log_dataframe_preview(df, title: str, rows: int = PREVIEW_ROWS, level: str = "DEBUG") -> None:
+    """
+    Log the first rows of a DataFrame, formatting them only if a sink accepts the level.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to preview.
+        title (str): Text logged before the preview.
+        rows (int): Number of rows shown.
+        level (str): Log level (DEBUG by default, so previews are dropped unless asked for).
+    """
+    logger.opt(lazy=True, depth=1).log(level, "{}:\n{}", lambda: title, lambda: df.head(rows).to_string())
+
+
 def log_example() -> None:
     """Example logging function to demonstrate logging behavior."""
     try:
@@ -0,0 +1,144 @@
+"""
+Memory Budget
+File: utils/memory_budget.py
+
+Lets the memory-hungry stages (etl_to_dw, olap_cubing) finish within a memory
+cap instead of being OOM-killed on large inputs.
+
+A stage estimates its working set from a sample of its input before loading
+it. While the estimate fits the budget, the stage runs as before. Otherwise
+it processes its input in chunks sized to fit, and spills intermediate
+partitions it has to keep (such as partial cubes) to temporary pickle files
+through a SpillDirectory.
+
+The budget is given in MiB with --memory-budget or the SMART_STORE_MEMORY_BUDGET_MB
+environment variable; without either there is no budget. Estimates come from
+DataFrame.memory_usage(deep=True) of a sample, so they cover the data itself
+but not pandas' temporary copies; the stages multiply them by a working set
+factor for that.
+"""
+
+from __future__ import annotations
+
+# Imports from Python Standard Library
+import itertools
+import os
+import pathlib
+import shutil
+import tempfile
+
+# Imports from local modules
+from utils.lazy_import import lazy_import
+from utils.logger import logger
+
+pd = lazy_import("pandas")
+
+MEMORY_BUDGET_ENV_VAR: str = "SMART_STORE_MEMORY_BUDGET_MB"
+SPILL_DIR_ENV_VAR: str = "SMART_STORE_SPILL_DIR"
+SAMPLE_ROWS: int = 10_000
+MIN_CHUNK_ROWS: int = 1_000
+
+
+def memory_budget_bytes(budget_mib: float = None) -> int:
+    """
+    Return the memory budget in bytes.
+
+    Args:
+        budget_mib (float, optional): Budget in MiB (default: SMART_STORE_MEMORY_BUDGET_MB).
+
+    Returns:
+        int: The budget in bytes, or None if there is no budget.
+    """
+    if budget_mib is None:
+        value = os.environ.get(MEMORY_BUDGET_ENV_VAR, "")
+        budget_mib = float(value) if value else None
+    if budget_mib is None or budget_mib <= 0:
+        return None
+    return int(budget_mib * 1024 * 1024)
+
+
+def frame_bytes_per_row(df: pd.DataFrame) -> float:
+    """Average in-memory size of one row of a DataFrame, strings included."""
+    if df.empty:
+        return 0.0
+    return df.memory_usage(deep=True, index=False).sum() / len(df)
+
+
+def estimate_csv_frame_bytes(path: pathlib.Path, sample_rows: int = SAMPLE_ROWS) -> tuple:
+    """
+    Estimate the memory needed to load a CSV file with pandas, from its first rows.
+
+    Args:
+        path (pathlib.Path): The CSV file.
+        sample_rows (int): Rows to sample.
+
+    Returns:
+        tuple: (estimated bytes of the whole DataFrame, estimated bytes per row).
+    """
+    path = pathlib.Path(path)
+    with path.open("rb") as file:
+        header = file.readline()
+        sample = list(itertools.islice(file, sample_rows))
+    if not sample:
+        return 0, 0.0
+    disk_bytes_per_row = sum(len(line) for line in sample) / len(sample)
+    estimated_rows = (path.stat().st_size - len(header)) / disk_bytes_per_row
+    bytes_per_row = frame_bytes_per_row(pd.read_csv(path, nrows=sample_rows))
+    return int(estimated_rows * bytes_per_row), bytes_per_row
+
+
+def chunk_rows_for_budget(bytes_per_row: float, budget: int, working_set_factor: float = 1.0) -> int:
+    """Rows per chunk so that a chunk's working set stays within the budget."""
+    if bytes_per_row <= 0:
+        return MIN_CHUNK_ROWS
+    return max(MIN_CHUNK_ROWS, int(budget / (bytes_per_row * working_set_factor)))
+
+
+class SpillDirectory:
+    """
+    Temporary directory holding DataFrames spilled to disk, grouped in numbered partitions.
+
+    Use it as a context manager; the files are deleted on exit.
+
+        with SpillDirectory("cube") as spill:
+            for chunk in chunks:
+                spill.write(partition, partial)
+            for partition in spill.partitions():
+                frames = list(spill.read(partition))
+    """
+
+    def __init__(self, prefix: str = "spill", directory: pathlib.Path = None):
+        self.prefix = prefix
+        self.parent = directory or os.environ.get(SPILL_DIR_ENV_VAR) or None
+        self.path = None
+        self.bytes_written = 0
+        self._files: dict = {}
+
+    def __enter__(self) -> "SpillDirectory":
+        if self.parent:
+            pathlib.Path(self.parent).mkdir(parents=True, exist_ok=True)
+        self.path = pathlib.Path(tempfile.mkdtemp(prefix=f"{self.prefix}-", dir=self.parent))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+        if self.bytes_written:
+            logger.info(f"Spilled {self.bytes_written / 2**20:.1f} MiB to {self.path} (now removed)")
+
+    def write(self, partition: int, df: pd.DataFrame) -> pathlib.Path:
+        """Append a DataFrame to a partition on disk."""
+        files = self._files.setdefault(partition, [])
+        path = self.path.joinpath(f"{self.prefix}-{partition:04d}-{len(files):05d}.pkl")
+        df.to_pickle(path)
+        files.append(path)
+        self.bytes_written += path.stat().st_size
+        return path
+
+    def partitions(self) -> list:
+        """The partitions written so far, in order."""
+        return sorted(self._files)
+
+    def read(self, partition: int):
+        """Yield the DataFrames of a partition in the order they were written."""
+        for path in self._files.get(partition, []):
+            yield pd.read_pickle(path)
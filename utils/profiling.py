@@ -0,0 +1,166 @@
+"""
+Stage Profiling
+File: utils/profiling.py
+
+Opt-in cProfile profiles of the pipeline stages, to find out which call
+(a pandas operation in DataScrubber, the cube group-by, the sales inserts)
+is responsible when a run slows down.
+
+Profiling is switched on with the SMART_STORE_PROFILE environment variable,
+which child processes inherit, or with the --profile flag of
+scripts/run_pipeline.py, olap_cubing.py and olap_report_runner.py:
+
+    SMART_STORE_PROFILE=1 python scripts/data_prep.py       # into data/profiles
+    SMART_STORE_PROFILE=data/profiles/slow-night python scripts/etl_to_dw.py
+    python scripts/run_pipeline.py --force --profile
+
+While it is on, every stage measured by utils.instrumentation (stage() and
+@timed) is profiled and its profile written to <profile dir>/<stage>-<pid>-<n>.prof,
+readable with pstats or snakeviz. A stage running inside another stage is part
+of the outer stage's profile; a Python thread can only run one profiler at a
+time. When an entry point decorated with @summarize_stages finishes, the
+profiles it wrote are merged into <title>_top_functions.txt, and
+run_pipeline.py --profile merges those of all its stages into
+top_functions.txt.
+
+cProfile is deterministic: it records every call, which slows pure-Python
+code down noticeably but shows exact call counts. It adds nothing when
+profiling is off.
+"""
+
+# Imports from Python Standard Library
+import contextlib
+import io
+import os
+import pathlib
+import re
+import threading
+
+# Imports from local modules
+from utils.logger import logger
+
+PROFILE_ENV_VAR: str = "SMART_STORE_PROFILE"
+DEFAULT_PROFILE_DIR: pathlib.Path = pathlib.Path("data").joinpath("profiles")
+REPORT_TOP_FUNCTIONS: int = 30
+
+# Profile files written by this process, in order
+_written: list = []
+# Per-thread flag: is a stage of this thread already being profiled?
+_state = threading.local()
+
+
+def enable_profiling(directory: pathlib.Path = None) -> pathlib.Path:
+    """
+    Turn profiling on for this process and the processes it starts.
+
+    Args:
+        directory (pathlib.Path, optional): Where to write the profiles (default: data/profiles).
+
+    Returns:
+        pathlib.Path: The profile directory.
+    """
+    directory = pathlib.Path(directory or DEFAULT_PROFILE_DIR)
+    os.environ[PROFILE_ENV_VAR] = str(directory)
+    return directory
+
+
+def profile_dir() -> pathlib.Path:
+    """The profile directory, or None if profiling is off."""
+    value = os.environ.get(PROFILE_ENV_VAR, "")
+    if value.lower() in ("", "0", "false", "no"):
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return DEFAULT_PROFILE_DIR
+    return pathlib.Path(value)
+
+
+def _file_name(name: str) -> str:
+    """Turn a stage name such as 'render data/results/x.png' into a file name."""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_")[:80] or "stage"
+    return f"{slug}-{os.getpid()}-{len(_written) + 1}.prof"
+
+
+@contextlib.contextmanager
+def profile_stage(name: str):
+    """
+    Profile the enclosed block if profiling is on and no outer stage is being profiled.
+
+    Args:
+        name (str): Stage name, used for the profile file name.
+    """
+    directory = profile_dir()
+    if directory is None or getattr(_state, "active", False):
+        yield
+        return
+
+    # Loaded only when profiling is on
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # another profiler is already running
+        yield
+        return
+    _state.active = True
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _state.active = False
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory.joinpath(_file_name(name))
+        profiler.dump_stats(path)
+        _written.append(path)
+        logger.debug(f"Profile of stage '{name}' written to {path}")
+
+
+def written_profiles() -> list:
+    """The profile files written by this process so far."""
+    return list(_written)
+
+
+def profile_report(paths: list, top: int = REPORT_TOP_FUNCTIONS) -> str:
+    """
+    Merge profiles into one report of the most expensive functions.
+
+    Args:
+        paths (list): .prof files to merge.
+        top (int): Functions to list in each ranking.
+
+    Returns:
+        str: Time per profile, then the top functions by own time and by cumulative time.
+    """
+    import pstats
+
+    paths = [pathlib.Path(path) for path in paths]
+    stream = io.StringIO()
+    seconds = {path: pstats.Stats(str(path)).total_tt for path in paths}
+    stream.write("Profiles, slowest first (seconds of profiled time):\n")
+    for path in sorted(paths, key=seconds.get, reverse=True):
+        stream.write(f"  {seconds[path]:10.3f}  {path.name}\n")
+
+    merged = pstats.Stats(*[str(path) for path in paths], stream=stream)
+    merged.strip_dirs()
+    # The profiles are already listed above; do not repeat every file name in each ranking
+    merged.files = []
+    for sort_key, title in [("tottime", "own time"), ("cumulative", "cumulative time")]:
+        stream.write(f"\nTop {top} functions by {title}:\n")
+        merged.sort_stats(sort_key).print_stats(top)
+    return stream.getvalue()
+
+
+def write_profile_report(paths: list, output_path: pathlib.Path, top: int = REPORT_TOP_FUNCTIONS) -> pathlib.Path:
+    """
+    Write the merged report of some profiles (see profile_report) to a text file.
+
+    Returns:
+        pathlib.Path: The report file, or None if there were no profiles.
+    """
+    if not paths:
+        return None
+    output_path = pathlib.Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(profile_report(paths, top))
+    logger.info(f"Merged {len(paths)} profiles into {output_path}")
+    return output_path